@@ -0,0 +1,112 @@
+"""Embedding throughput and latency: EmbeddingBatcher versus encoding directly on the event loop.
+
+Usage: PYTHONPATH=src python benchmarks/embedding_batcher_throughput.py [--concurrency 1 8 32 128]
+       [--requests 512] [--encode-ms 8] [--per-text-ms 0.4] [--model all-MiniLM-L6-v2]
+
+``concurrency`` callers each embed unique texts back to back until ``requests`` embeddings are
+done. Two variants are compared:
+- direct: ``encode([text])`` called on the event loop, as memory injection and extraction used to
+- batcher: ``EmbeddingBatcher.embed``, which merges concurrent calls into one encode on a worker thread
+
+The default encoder is a stub. It costs ``encode-ms`` per call plus ``per-text-ms`` per text and
+sleeps without holding the GIL, as torch does. ``--model`` uses a real SentenceTransformer
+instead. The script reports embeddings/s, p50 and p99 latency, and the worst event-loop stall
+seen by a 1 ms ticker.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from ai_companion.modules.memory.long_term.embedding_batcher import EmbeddingBatcher
+
+
+def stub_encoder(encode_seconds: float, per_text_seconds: float, dim: int = 384):
+    def encode(texts: list[str]) -> list[list[float]]:
+        time.sleep(encode_seconds + per_text_seconds * len(texts))
+        return [[0.0] * dim for _ in texts]
+
+    return encode
+
+
+def model_encoder(name: str):
+    from sentence_transformers import SentenceTransformer
+
+    model = SentenceTransformer(name)
+    return lambda texts: model.encode(texts).tolist()
+
+
+async def measure_loop_lag(stop: asyncio.Event) -> float:
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(0.001)
+        worst = max(worst, time.perf_counter() - started - 0.001)
+    return worst
+
+
+async def run(embed, concurrency: int, requests: int) -> tuple[list[float], float, float]:
+    latencies: list[float] = []
+    counter = iter(range(requests))
+
+    async def caller():
+        for i in counter:
+            # Timed from when the caller is ready, so waiting behind a blocked loop counts
+            started = time.perf_counter()
+            await asyncio.sleep(0)
+            await embed(f"memory number {i} about something the user said")
+            latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(measure_loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return latencies, elapsed, await lag
+
+
+def summarize(name: str, latencies: list[float], elapsed: float, lag: float) -> str:
+    ordered = sorted(latencies)
+    p99 = ordered[int(0.99 * (len(ordered) - 1))]
+    return (
+        f"  {name:8} {len(latencies) / elapsed:8.1f} embeddings/s  p50 {1000 * statistics.median(ordered):7.1f} ms  "
+        f"p99 {1000 * p99:7.1f} ms  worst loop stall {1000 * lag:6.1f} ms"
+    )
+
+
+async def benchmark(encode, levels: list[int], requests: int, max_batch_size: int, max_wait_ms: float):
+    async def direct(text: str) -> list[float]:
+        return encode([text])[0]
+
+    batcher = EmbeddingBatcher(encode, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    for concurrency in levels:
+        print(f"concurrency {concurrency}")
+        print(summarize("direct", *await run(direct, concurrency, requests)))
+        print(summarize("batcher", *await run(batcher.embed, concurrency, requests)))
+    await batcher.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=512)
+    parser.add_argument("--encode-ms", type=float, default=8)
+    parser.add_argument("--per-text-ms", type=float, default=0.4)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=0)
+    parser.add_argument("--model", help="SentenceTransformer model name; default is the stub encoder")
+    args = parser.parse_args()
+
+    if args.model:
+        encode = model_encoder(args.model)
+        print(f"encoder: {args.model}")
+    else:
+        encode = stub_encoder(args.encode_ms / 1000, args.per_text_ms / 1000)
+        print(f"encoder: stub, {args.encode_ms} ms per call + {args.per_text_ms} ms per text")
+    asyncio.run(benchmark(encode, args.concurrency, args.requests, args.max_batch_size, args.max_wait_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+"""Voice-turn latency and TLS handshakes: the shared Graph API client versus a new httpx.AsyncClient per call.
+
+Usage: PYTHONPATH=src python benchmarks/graph_api_client_pooling.py [--concurrency 1 10 50] [--turns 3]
+       [--rtt-ms 40] [--server-ms 20] [--media-kb 200] [--http1]
+
+A local TLS stand-in for graph.facebook.com runs in its own thread with a self-signed
+certificate, speaking HTTP/2 or HTTP/1.1 as negotiated by ALPN (``--http1`` offers HTTP/1.1 only).
+Media download URLs point at ``localhost`` instead of ``127.0.0.1``, so they are a second origin,
+like Meta's media CDN. The server simulates a network with ``rtt-ms`` of round-trip time: each
+response waits one RTT plus ``server-ms``, and a new connection adds two RTTs (TCP plus a TLS 1.3
+handshake) before its first response.
+
+Each voice turn does what the WhatsApp handler does for a voice note: metadata GET, media
+download, media upload and message send. ``concurrency`` users run ``turns`` turns each. Two
+variants are compared:
+- per call: a new ``httpx.AsyncClient`` for each request, as the handlers used to do
+- shared: ``download_media`` and ``send_response``, which go through ``graph_api_request``
+
+The script reports median and p95 turn latency and the TLS handshakes the server accepted.
+"""
+
+import argparse
+import asyncio
+import datetime
+import ipaddress
+import json
+import os
+import ssl
+import statistics
+import tempfile
+import threading
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+import h11
+import httpx
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+             "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "benchmark")
+
+from ai_companion.interfaces.whatsapp import graph_api, whatsapp_response  # noqa: E402
+
+
+def write_certificate(directory: str) -> tuple[str, str]:
+    key = ec.generate_private_key(ec.SECP256R1())
+    subject = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "graph-api-stand-in")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(subject)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(days=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(
+            x509.SubjectAlternativeName([x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))]),
+            critical=False,
+        )
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path, key_path = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(cert_path, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()))
+    return cert_path, key_path
+
+
+class GraphAPIStandIn:
+    def __init__(self, cert_path: str, key_path: str, rtt: float, server_seconds: float, media_bytes: int, http1: bool):
+        self.rtt = rtt
+        self.server_seconds = server_seconds
+        self.media = os.urandom(media_bytes)
+        self.handshakes = 0
+        self.ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        self.ssl_context.load_cert_chain(cert_path, key_path)
+        self.ssl_context.set_alpn_protocols(["http/1.1"] if http1 else ["h2", "http/1.1"])
+        self.port = None
+
+    async def respond(self, method: str, path: str, ready_at: float) -> tuple[int, bytes, str]:
+        loop = asyncio.get_running_loop()
+        await asyncio.sleep(max(0.0, ready_at - loop.time()) + self.rtt + self.server_seconds)
+        if path.startswith("/media/"):
+            return 200, self.media, "audio/ogg"
+        if method == "GET":
+            media_id = path.rsplit("/", 1)[-1]
+            body = {"url": f"https://localhost:{self.port}/media/{media_id}", "id": media_id}
+        elif path.endswith("/media"):
+            body = {"id": "uploaded-media"}
+        else:
+            body = {"messaging_product": "whatsapp", "messages": [{"id": "wamid.benchmark"}]}
+        return 200, json.dumps(body).encode(), "application/json"
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.handshakes += 1
+        # The TCP and TLS handshakes each cost a round trip before the first response
+        ready_at = asyncio.get_running_loop().time() + 2 * self.rtt
+        try:
+            if writer.get_extra_info("ssl_object").selected_alpn_protocol() == "h2":
+                await self.serve_h2(reader, writer, ready_at)
+            else:
+                await self.serve_h11(reader, writer, ready_at)
+        except (ConnectionError, ssl.SSLError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_h11(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, ready_at: float):
+        conn = h11.Connection(h11.SERVER)
+        while True:
+            event = conn.next_event()
+            if event is h11.NEED_DATA:
+                conn.receive_data(await reader.read(65536))
+            elif isinstance(event, h11.Request):
+                method, path = event.method.decode(), event.target.decode()
+            elif isinstance(event, h11.EndOfMessage):
+                status, body, content_type = await self.respond(method, path, ready_at)
+                headers = [("content-type", content_type), ("content-length", str(len(body)))]
+                writer.write(conn.send(h11.Response(status_code=status, headers=headers)))
+                writer.write(conn.send(h11.Data(data=body)) + conn.send(h11.EndOfMessage()))
+                await writer.drain()
+                if conn.our_state is h11.MUST_CLOSE:
+                    return
+                conn.start_next_cycle()
+            elif isinstance(event, h11.ConnectionClosed):
+                return
+
+    async def serve_h2(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, ready_at: float):
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        requests: dict[int, dict] = {}
+        window_updated = asyncio.Event()
+
+        async def reply(stream_id: int, headers: dict):
+            status, body, content_type = await self.respond(headers[":method"], headers[":path"], ready_at)
+            conn.send_headers(stream_id, [(":status", str(status)), ("content-type", content_type),
+                                          ("content-length", str(len(body)))])
+            while body:
+                window = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size)
+                if window <= 0:
+                    window_updated.clear()
+                    await window_updated.wait()
+                    continue
+                conn.send_data(stream_id, body[:window])
+                body = body[window:]
+                writer.write(conn.data_to_send())
+            conn.end_stream(stream_id)
+            writer.write(conn.data_to_send())
+
+        tasks = set()
+        while data := await reader.read(65536):
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    requests[event.stream_id] = dict(event.headers)
+                elif isinstance(event, h2.events.DataReceived):
+                    conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    task = asyncio.create_task(reply(event.stream_id, requests.pop(event.stream_id)))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+                elif isinstance(event, h2.events.WindowUpdated):
+                    window_updated.set()
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+    def serve(self) -> str:
+        started = threading.Event()
+
+        async def run():
+            server = await asyncio.start_server(self.handle, "127.0.0.1", 0, ssl=self.ssl_context)
+            self.port = server.sockets[0].getsockname()[1]
+            started.set()
+            await server.serve_forever()
+
+        threading.Thread(target=asyncio.run, args=(run(),), daemon=True).start()
+        started.wait()
+        return f"https://127.0.0.1:{self.port}/v21.0"
+
+
+async def per_call_voice_turn(base_url: str, user: str, audio: bytes):
+    headers = {"Authorization": "Bearer benchmark"}
+    async with httpx.AsyncClient() as client:
+        metadata = (await client.get(f"{base_url}/media-{user}", headers=headers)).json()
+    async with httpx.AsyncClient() as client:
+        (await client.get(metadata["url"], headers=headers)).raise_for_status()
+    async with httpx.AsyncClient() as client:
+        files = {"file": ("response.mp3", audio, "audio/mpeg")}
+        data = {"messaging_product": "whatsapp", "type": "audio/mpeg"}
+        media_id = (await client.post(f"{base_url}/phone/media", headers=headers, files=files, data=data)).json()["id"]
+    async with httpx.AsyncClient() as client:
+        json_data = {"messaging_product": "whatsapp", "to": user, "type": "audio", "audio": {"id": media_id}}
+        (await client.post(f"{base_url}/phone/messages", headers=headers, json=json_data)).raise_for_status()
+
+
+async def shared_voice_turn(base_url: str, user: str, audio: bytes):
+    await whatsapp_response.download_media(f"media-{user}")
+    if not await whatsapp_response.send_response(user, "hello", "audio", audio):
+        raise RuntimeError("send failed")
+
+
+async def run(turn, server: GraphAPIStandIn, base_url: str, concurrency: int, turns: int, audio: bytes):
+    latencies: list[float] = []
+
+    async def user(i: int):
+        for _ in range(turns):
+            started = time.perf_counter()
+            await turn(base_url, f"user-{i}", audio)
+            latencies.append(time.perf_counter() - started)
+
+    handshakes = server.handshakes
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return latencies, server.handshakes - handshakes, time.perf_counter() - started
+
+
+def summarize(name: str, latencies: list[float], handshakes: int, elapsed: float) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    return (
+        f"  {name:9} median {1000 * statistics.median(ordered):7.1f} ms  p95 {1000 * p95:7.1f} ms  "
+        f"{handshakes:4} TLS handshakes  {len(latencies) / elapsed:6.1f} turns/s"
+    )
+
+
+async def benchmark(server: GraphAPIStandIn, base_url: str, levels: list[int], turns: int, audio: bytes):
+    for concurrency in levels:
+        print(f"{concurrency} concurrent users x {turns} voice turns")
+        print(summarize("per call", *await run(per_call_voice_turn, server, base_url, concurrency, turns, audio)))
+        print(summarize("shared", *await run(shared_voice_turn, server, base_url, concurrency, turns, audio)))
+        # Each level starts cold, as after a deploy
+        await graph_api.close_graph_api_client()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--rtt-ms", type=float, default=40)
+    parser.add_argument("--server-ms", type=float, default=20)
+    parser.add_argument("--media-kb", type=int, default=200)
+    parser.add_argument("--http1", action="store_true", help="offer only HTTP/1.1 over ALPN")
+    args = parser.parse_args()
+
+    cert_path, key_path = write_certificate(tempfile.mkdtemp(prefix="graph-api-tls-"))
+    # Both the per-call clients and the shared client trust the stand-in through httpx's trust_env
+    os.environ["SSL_CERT_FILE"] = cert_path
+    server = GraphAPIStandIn(cert_path, key_path, args.rtt_ms / 1000, args.server_ms / 1000, args.media_kb * 1024, args.http1)
+    base_url = server.serve()
+    graph_api.GRAPH_API_URL = base_url
+    whatsapp_response.WHATSAPP_PHONE_NUMBER_ID = "phone"
+
+    print(f"RTT {args.rtt_ms:g} ms, server {args.server_ms:g} ms, {args.media_kb} KB media, "
+          f"{'HTTP/1.1 only' if args.http1 else 'HTTP/2 offered'}")
+    asyncio.run(benchmark(server, base_url, args.concurrency, args.turns, os.urandom(args.media_kb * 1024)))
+
+
+if __name__ == "__main__":
+    main()
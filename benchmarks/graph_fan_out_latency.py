@@ -0,0 +1,150 @@
+"""Time to reply with the pre-response nodes chained one after another versus fanned out from START.
+
+Usage: PYTHONPATH=src python benchmarks/graph_fan_out_latency.py [--turns 10] [--router-ms 250]
+       [--extraction-ms 460] [--retrieval-ms 60] [--reply-ms 600]
+
+The graphs are wired from the real ``router_node``, ``context_injection_node``,
+``memory_injection_node`` and ``conversation_node``. Their models are stubs with fixed delays: the
+router chain takes ``router-ms``, memory retrieval (embedding plus search) ``retrieval-ms`` and the
+character chain ``reply-ms``. Memory extraction, which is no longer a graph node, is a stub node
+of ``extraction-ms``. The local router is switched off so every turn pays for the router call.
+Three topologies are compared:
+- sequential: extraction -> router -> context -> memory -> conversation, the original chain
+- fan-out: the four pre-response nodes branch from START and join before ``select_workflow``
+- current: ``create_workflow_graph()``, the fan-out with extraction enqueued after the reply
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from types import SimpleNamespace
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import END, START, StateGraph
+
+os.environ.setdefault("ROUTER_LOCAL_ENABLED", "false")
+for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+             "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "benchmark")
+
+from ai_companion.graph import nodes  # noqa: E402
+from ai_companion.graph.edges import select_workflow  # noqa: E402
+from ai_companion.graph.graph import create_workflow_graph  # noqa: E402
+from ai_companion.graph.state import AICompanionState  # noqa: E402
+
+
+class Delays:
+    router = 0.25
+    extraction = 0.46
+    retrieval = 0.06
+    reply = 0.6
+
+
+class StubChain:
+    def __init__(self, delay_attr: str, result):
+        self.delay_attr = delay_attr
+        self.result = result
+
+    async def ainvoke(self, inputs, config=None):
+        await asyncio.sleep(getattr(Delays, self.delay_attr))
+        return self.result
+
+
+class StubMemoryManager:
+    async def get_relevant_memories(self, context, user_id=None):
+        await asyncio.sleep(Delays.retrieval)
+        return ["User lives in Lisbon"]
+
+    def format_memories_for_prompt(self, memories):
+        return "\n".join(f"- {memory}" for memory in memories)
+
+
+async def memory_extraction_node(state: AICompanionState) -> dict:
+    await asyncio.sleep(Delays.extraction)
+    return {}
+
+
+PRE_RESPONSE_NODES = {
+    "memory_extraction_node": memory_extraction_node,
+    "router_node": nodes.router_node,
+    "context_injection_node": nodes.context_injection_node,
+    "memory_injection_node": nodes.memory_injection_node,
+}
+
+
+def create_sequential_graph() -> StateGraph:
+    graph_builder = StateGraph(AICompanionState)
+    for name, node in PRE_RESPONSE_NODES.items():
+        graph_builder.add_node(name, node)
+    graph_builder.add_node("conversation_node", nodes.conversation_node)
+
+    chain = [START, *PRE_RESPONSE_NODES, "conversation_node", END]
+    for source, target in zip(chain, chain[1:]):
+        graph_builder.add_edge(source, target)
+    return graph_builder
+
+
+def create_fan_out_graph() -> StateGraph:
+    graph_builder = StateGraph(AICompanionState)
+    for name, node in PRE_RESPONSE_NODES.items():
+        graph_builder.add_node(name, node)
+        graph_builder.add_edge(START, name)
+    graph_builder.add_node("workflow_join_node", nodes.workflow_join_node)
+    graph_builder.add_node("conversation_node", nodes.conversation_node)
+
+    graph_builder.add_edge(list(PRE_RESPONSE_NODES), "workflow_join_node")
+    graph_builder.add_conditional_edges("workflow_join_node", select_workflow, ["conversation_node"])
+    graph_builder.add_edge("conversation_node", END)
+    return graph_builder
+
+
+async def time_turns(graph, turns: int) -> list[float]:
+    latencies = []
+    for turn in range(turns):
+        started = time.perf_counter()
+        state = await graph.ainvoke(
+            {"messages": [HumanMessage(content=f"How was your day? ({turn})")]},
+            {"configurable": {"thread_id": "benchmark-user"}},
+        )
+        latencies.append(time.perf_counter() - started)
+        assert state["messages"][-1].content == "Lovely, thanks for asking!"
+    return latencies
+
+
+async def benchmark(turns: int):
+    nodes.get_router_chain = lambda: StubChain("router", SimpleNamespace(response_type="conversation"))
+    nodes.get_character_response_chain = lambda: StubChain("reply", "Lovely, thanks for asking!")
+    nodes.get_memory_manager = StubMemoryManager
+
+    print(f"router {1000 * Delays.router:.0f} ms, extraction {1000 * Delays.extraction:.0f} ms, "
+          f"retrieval {1000 * Delays.retrieval:.0f} ms, reply {1000 * Delays.reply:.0f} ms; {turns} turns")
+    for name, graph_builder in (
+        ("sequential", create_sequential_graph()),
+        ("fan-out", create_fan_out_graph()),
+        ("current", create_workflow_graph()),
+    ):
+        latencies = sorted(await time_turns(graph_builder.compile(), turns))
+        p95 = latencies[int(0.95 * (len(latencies) - 1))]
+        print(f"  {name:10} median {1000 * statistics.median(latencies):7.1f} ms  p95 {1000 * p95:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--router-ms", type=float, default=250)
+    parser.add_argument("--extraction-ms", type=float, default=460)
+    parser.add_argument("--retrieval-ms", type=float, default=60)
+    parser.add_argument("--reply-ms", type=float, default=600)
+    args = parser.parse_args()
+
+    Delays.router = args.router_ms / 1000
+    Delays.extraction = args.extraction_ms / 1000
+    Delays.retrieval = args.retrieval_ms / 1000
+    Delays.reply = args.reply_ms / 1000
+    asyncio.run(benchmark(args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Per-message overhead of opening a checkpointer and compiling the graph per turn versus GraphRuntime.
+
+Usage: PYTHONPATH=src python benchmarks/graph_runtime_overhead.py [--sessions 1 10 100] [--turns 5] [--node-ms 0]
+
+Both variants run a graph with the workflow's shape: router, context and memory nodes fanned out
+from START, a join node, then the conversation node. The nodes are stubs that wait ``node-ms``
+and return fixed updates, so the numbers isolate checkpointer and compile costs from model
+latency. Each concurrency level runs ``sessions`` conversations at once, each sending ``turns``
+messages in sequence on its own thread id, against a fresh SQLite file. The previous behaviour
+is measured as per turn: ``AsyncSqliteSaver.from_conn_string`` plus ``compile`` for every
+message, as the handlers used to do. Turns that fail with "database is locked" because of
+competing connections are counted, not retried.
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import END, START, StateGraph
+
+for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+             "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "benchmark")
+
+from ai_companion.graph import runtime  # noqa: E402
+from ai_companion.graph.state import AICompanionState  # noqa: E402
+
+NODE_SECONDS = 0.0
+
+
+def stub(update: dict):
+    async def node(state: AICompanionState) -> dict:
+        await asyncio.sleep(NODE_SECONDS)
+        return update
+
+    return node
+
+
+def create_stub_graph() -> StateGraph:
+    graph_builder = StateGraph(AICompanionState)
+    graph_builder.add_node("router_node", stub({"workflow": "conversation"}))
+    graph_builder.add_node("context_injection_node", stub({"current_activity": "", "apply_activity": False}))
+    graph_builder.add_node("memory_injection_node", stub({"memory_context": ""}))
+    graph_builder.add_node("workflow_join_node", stub({}))
+    graph_builder.add_node("conversation_node", stub({"messages": AIMessage(content="hello")}))
+
+    pre_response_nodes = ["router_node", "context_injection_node", "memory_injection_node"]
+    for node in pre_response_nodes:
+        graph_builder.add_edge(START, node)
+    graph_builder.add_edge(pre_response_nodes, "workflow_join_node")
+    graph_builder.add_edge("workflow_join_node", "conversation_node")
+    graph_builder.add_edge("conversation_node", END)
+    return graph_builder
+
+
+STUB_GRAPH_BUILDER = create_stub_graph()
+
+
+async def per_turn(db_path: str, thread_id: str):
+    # The handlers compiled the module-level builder; only the compile itself happened per turn
+    async with AsyncSqliteSaver.from_conn_string(db_path) as short_term_memory:
+        graph = STUB_GRAPH_BUILDER.compile(checkpointer=short_term_memory)
+        await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": thread_id}})
+
+
+def shared_runtime(graph_runtime: runtime.GraphRuntime):
+    async def turn(db_path: str, thread_id: str):
+        graph = await graph_runtime.get_graph()
+        await graph.ainvoke({"messages": [HumanMessage(content="hi")]}, {"configurable": {"thread_id": thread_id}})
+
+    return turn
+
+
+async def run_sessions(turn, db_path: str, sessions: int, turns: int) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    failures = 0
+
+    async def session(i: int):
+        nonlocal failures
+        for _ in range(turns):
+            started = time.perf_counter()
+            try:
+                await turn(db_path, f"session-{i}")
+            except sqlite3.OperationalError:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    return latencies, failures, time.perf_counter() - started
+
+
+def summarize(name: str, latencies: list[float], failures: int, elapsed: float) -> str:
+    ordered = sorted(latencies) or [float("nan")]
+    p99 = ordered[int(0.99 * (len(ordered) - 1))]
+    return (
+        f"  {name:16} median {1000 * statistics.median(ordered):8.2f} ms  p99 {1000 * p99:8.2f} ms  "
+        f"{len(latencies) / elapsed:8.1f} turns/s  {failures:4} failed"
+    )
+
+
+async def benchmark(session_counts: list[int], turns: int):
+    # GraphRuntime compiles create_workflow_graph(); point it at the stub graph instead
+    runtime.create_workflow_graph = lambda: STUB_GRAPH_BUILDER
+
+    for sessions in session_counts:
+        print(f"{sessions} concurrent sessions x {turns} turns")
+        with tempfile.TemporaryDirectory() as path:
+            db_path = os.path.join(path, "per_turn.db")
+            print(summarize("per-turn compile", *await run_sessions(per_turn, db_path, sessions, turns)))
+
+            graph_runtime = runtime.GraphRuntime(os.path.join(path, "runtime.db"))
+            await graph_runtime.start()
+            results = await run_sessions(shared_runtime(graph_runtime), db_path, sessions, turns)
+            await graph_runtime.stop()
+            print(summarize("GraphRuntime", *results))
+
+
+def main():
+    global NODE_SECONDS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--node-ms", type=float, default=0)
+    args = parser.parse_args()
+
+    NODE_SECONDS = args.node_ms / 1000
+    asyncio.run(benchmark(args.sessions, args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Bytes sent and latency of image analysis: full-resolution upload versus downscaling plus the description cache.
+
+Usage: PYTHONPATH=src python benchmarks/image_analysis_corpus.py [--corpus DIR] [--repeat-share 0.3]
+       [--uplink-mbps 50] [--model-ms 800]
+
+A fake Groq chat-completions server stands in for the vision model. It charges the time to
+receive the request at ``uplink-mbps`` plus ``model-ms``, and counts the bytes it receives.
+``--corpus`` analyses every image in a directory. Without it, a sample corpus is generated:
+HD camera photos (4032x3024), standard WhatsApp photos (1600x1200), phone screenshots (PNG)
+and memes that share one template with different captions. A ``repeat-share`` of the
+analyses resend an earlier image unchanged, as forwards do. Two paths are compared:
+- full resolution: base64 of the original bytes on every call, as ``analyze_image`` used to
+- current: ``ImageToText.analyze_image``, which downscales on the worker pool and caches
+  descriptions by digest
+
+The script reports request bytes, model calls, and median and p95 latency overall and per kind
+of image (by file extension for ``--corpus``).
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter
+
+COMPLETION = json.dumps({
+    "id": "chatcmpl-benchmark",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "benchmark",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "A picture."}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}).encode()
+
+PROMPT = "Please describe what you see in this image in the context of our conversation."
+
+
+class FakeVisionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    uplink_bytes_per_second = 50e6 / 8
+    model_seconds = 0.8
+    received = 0
+    calls = 0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        type(self).received += length
+        type(self).calls += 1
+        time.sleep(length / self.uplink_bytes_per_second + self.model_seconds)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeVisionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    # Read by the Groq SDK when ImageToText builds its client
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+                 "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+        os.environ.setdefault(name, "benchmark")
+
+
+def encode(image: Image.Image, format: str, **options) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format, **options)
+    return buffer.getvalue()
+
+
+def photo(size: tuple[int, int], quality: int, rng: random.Random) -> bytes:
+    small = Image.frombytes("RGB", (64, 48), rng.randbytes(64 * 48 * 3)).filter(ImageFilter.GaussianBlur(2))
+    image = small.resize(size, Image.Resampling.BICUBIC)
+    grain = Image.effect_noise(size, 24).convert("RGB")
+    return encode(Image.blend(image, grain, 0.15), "JPEG", quality=quality)
+
+
+def screenshot(rng: random.Random) -> bytes:
+    image = Image.new("RGB", (1080, 2400), "white")
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((0, 0, 1080, 200), fill=(7, 94, 84))
+    for i in range(14):
+        x, y = (40 if i % 2 else 400), 260 + i * 150
+        draw.rounded_rectangle((x, y, x + 640, y + 110), 20, fill=(220, 248, 198) if i % 2 == 0 else (240, 240, 240))
+        draw.text((x + 20, y + 40), " ".join(rng.choice(["ok", "see you", "at", "lunch", "tomorrow", "haha"]) for _ in range(5)), fill="black")
+    return encode(image, "PNG")
+
+
+def meme(template: Image.Image, caption: str) -> bytes:
+    image = template.copy()
+    ImageDraw.Draw(image).text((30, 20), caption, fill="white")
+    return encode(image, "JPEG", quality=90)
+
+
+def sample_corpus(rng: random.Random) -> list[tuple[str, bytes]]:
+    template = Image.open(io.BytesIO(photo((800, 800), 95, rng))).convert("RGB")
+    corpus = [("hd-photo", photo((4032, 3024), 92, rng)) for _ in range(4)]
+    corpus += [("photo", photo((1600, 1200), 80, rng)) for _ in range(4)]
+    corpus += [("screenshot", screenshot(rng)) for _ in range(4)]
+    corpus += [("meme", meme(template, caption))
+               for caption in ["when the code works", "when the code breaks", "monday again", "finally friday"]]
+    return corpus
+
+
+def load_corpus(directory: str) -> list[tuple[str, bytes]]:
+    suffixes = {".jpg", ".jpeg", ".png", ".webp"}
+    return [(path.suffix.lower()[1:], path.read_bytes()) for path in sorted(Path(directory).iterdir()) if path.suffix.lower() in suffixes]
+
+
+async def full_resolution(image_to_text, image_bytes: bytes) -> str:
+    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
+    messages = [{"role": "user", "content": [
+        {"type": "text", "text": PROMPT},
+        {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_base64}"}},
+    ]}]
+    response = await image_to_text.client.chat.completions.create(model="benchmark", messages=messages, max_tokens=1000)
+    return response.choices[0].message.content
+
+
+async def run(name: str, analyze, sequence: list[tuple[str, bytes]]) -> dict[str, list[float]]:
+    FakeVisionHandler.received = 0
+    FakeVisionHandler.calls = 0
+    latencies: dict[str, list[float]] = {}
+    for kind, image_bytes in sequence:
+        started = time.perf_counter()
+        await analyze(image_bytes)
+        latencies.setdefault(kind, []).append(time.perf_counter() - started)
+    everything = sorted(latency for kind in latencies.values() for latency in kind)
+    p95 = everything[int(0.95 * (len(everything) - 1))]
+    print(
+        f"  {name:16} {FakeVisionHandler.received / 1e6:8.2f} MB sent  {FakeVisionHandler.calls:3} model calls  "
+        f"median {1000 * statistics.median(everything):7.0f} ms  p95 {1000 * p95:7.0f} ms  total {sum(everything):6.1f}s"
+    )
+    return latencies
+
+
+async def benchmark(corpus: list[tuple[str, bytes]], repeat_share: float):
+    from ai_companion.modules.image.image_to_text import ImageToText
+
+    rng = random.Random(0)
+    repeats = [rng.choice(corpus) for _ in range(round(len(corpus) * repeat_share / (1 - repeat_share)))]
+    sequence = corpus + repeats
+    rng.shuffle(sequence)
+
+    total = sum(len(image_bytes) for _, image_bytes in sequence)
+    print(f"{len(corpus)} images, {len(sequence)} analyses ({len(repeats)} repeats), {total / 1e6:.2f} MB of originals")
+    baseline = ImageToText()
+    before = await run("full resolution", lambda image_bytes: full_resolution(baseline, image_bytes), sequence)
+    current = ImageToText()
+    after = await run("current", lambda image_bytes: current.analyze_image(image_bytes, PROMPT), sequence)
+
+    print("  median latency by kind")
+    for kind in before:
+        print(f"    {kind:12} {1000 * statistics.median(before[kind]):7.0f} ms -> {1000 * statistics.median(after[kind]):7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", help="directory of images; default is a generated sample corpus")
+    parser.add_argument("--repeat-share", type=float, default=0.3)
+    parser.add_argument("--uplink-mbps", type=float, default=50)
+    parser.add_argument("--model-ms", type=float, default=800)
+    args = parser.parse_args()
+
+    FakeVisionHandler.uplink_bytes_per_second = args.uplink_mbps * 1e6 / 8
+    FakeVisionHandler.model_seconds = args.model_ms / 1000
+    start_server()
+    corpus = load_corpus(args.corpus) if args.corpus else sample_corpus(random.Random(0))
+    asyncio.run(benchmark(corpus, args.repeat_share))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Per-turn cost of building a ChatGroq client versus reusing the process-wide one.
+
+Usage: PYTHONPATH=src python benchmarks/llm_client_reuse.py [--turns 50]
+
+Points the Groq SDK at a local fake chat-completions server and runs the same number of turns
+two ways: constructing a new ChatGroq each turn (the previous behaviour) and calling
+``get_groq_model``, which shares one client and connection pool. Reports:
+- client construction time and bytes allocated per turn (tracemalloc)
+- TCP connections the server accepted
+- total wall time
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+COMPLETION = json.dumps({
+    "id": "chatcmpl-benchmark",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "benchmark",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "hello"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}).encode()
+
+
+class FakeGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    connections = 0
+
+    def setup(self):
+        # One handler instance per accepted TCP connection; keep-alive requests reuse it
+        type(self).connections += 1
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGroqHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    # Read by the Groq SDK and by langchain-groq respectively
+    os.environ["GROQ_BASE_URL"] = base_url
+    os.environ["GROQ_API_BASE"] = base_url
+    for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+                 "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+        os.environ.setdefault(name, "benchmark")
+    return server
+
+
+async def run_turns(name: str, make_model, turns: int):
+    FakeGroqHandler.connections = 0
+    construct_seconds = 0.0
+    allocated = 0
+    started = time.perf_counter()
+    for _ in range(turns):
+        tracemalloc.start()
+        construct_started = time.perf_counter()
+        model = make_model()
+        construct_seconds += time.perf_counter() - construct_started
+        allocated += tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        await model.ainvoke("hi")
+    total = time.perf_counter() - started
+    print(
+        f"{name:18} construct {1e3 * construct_seconds / turns:7.3f} ms/turn  "
+        f"alloc {allocated / turns / 1024:8.1f} KiB/turn  "
+        f"connections {FakeGroqHandler.connections:4}  total {total:6.2f}s"
+    )
+
+
+async def benchmark(turns: int):
+    from langchain_groq import ChatGroq
+
+    from ai_companion.core.llm_registry import close_http_clients, get_groq_model
+    from ai_companion.settings import settings
+
+    def new_client():
+        return ChatGroq(api_key=settings.GROQ_API_KEY, model_name=settings.TEXT_MODEL_NAME, temperature=0.7)
+
+    def shared_client():
+        return get_groq_model(settings.TEXT_MODEL_NAME, 0.7)
+
+    print(f"{turns} turns against a local fake chat-completions server")
+    await run_turns("new per turn", new_client, turns)
+    await run_turns("shared registry", shared_client, turns)
+    await close_http_clients()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    server = start_server()
+    try:
+        asyncio.run(benchmark(args.turns))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Search latency of the local memory backend: exact scan versus the IVF index, with and without a user filter.
+
+Usage: PYTHONPATH=src python benchmarks/local_backend_search.py [--sizes 10000 100000 1000000] [--dim 384]
+       [--users 1000] [--heavy-share 0.2] [--clusters 1000]
+
+Each collection is filled with unit vectors and bulk-loaded straight into the backend's files.
+The vectors are drawn around ``clusters`` random topic centres, at a cosine of about 0.7, so
+they resemble sentence embeddings; queries are drawn the same way. A ``heavy-share`` fraction
+of the rows belongs to one heavy user. The rest is spread over ``users`` typical users. The app always searches with a user id, so the filtered rows are what
+production sees:
+- unfiltered: exact scan versus IVF
+- typical user: the exact scan over their rows that the app takes below ann_threshold
+- heavy user: exact scan over their rows versus IVF candidates kept only if they are theirs
+
+IVF recall@k is measured against the exact scan. ``--clusters 0`` draws uniformly random vectors
+instead. They have no structure for IVF to exploit, so their recall is a pessimistic lower bound.
+The 1M collection needs about 1.5 GB of free disk at dim 384.
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from ai_companion.modules.memory.long_term.local_backend import IVFIndex, LocalBackend
+
+BATCH_SIZE = 50_000
+HEAVY_USER = "heavy-user"
+
+
+def sample_vectors(n: int, centres: np.ndarray | None, dim: int, rng: np.random.Generator) -> np.ndarray:
+    noise = rng.standard_normal((n, dim), dtype=np.float32)
+    if centres is None:
+        vectors = noise
+    else:
+        # Noise with the same norm as the unit centre gives a cosine of about 0.7 to it
+        vectors = centres[rng.integers(0, len(centres), n)] + noise / np.sqrt(dim)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def fill(
+    backend: LocalBackend, size: int, users: int, heavy_share: float, centres: np.ndarray | None, rng: np.random.Generator
+):
+    backend._open()
+    with backend._write_transaction():
+        backend._map_vectors(size)
+        for start in range(0, size, BATCH_SIZE):
+            end = min(size, start + BATCH_SIZE)
+            backend._vectors[start:end] = sample_vectors(end - start, centres, backend.vector_size, rng)
+            heavy = rng.random(end - start) < heavy_share
+            typical = rng.integers(0, users, end - start)
+            backend._db.executemany(
+                "INSERT INTO memories (id, row, payload, user_id) VALUES (?, ?, ?, ?)",
+                (
+                    (f"point-{row}", row, json.dumps({"text": f"memory {row}"}), HEAVY_USER if h else f"user-{u}")
+                    for row, h, u in zip(range(start, end), heavy, typical)
+                ),
+            )
+        backend._vectors.flush()
+
+
+def time_searches(
+    backend: LocalBackend, queries: np.ndarray, top_k: int, user_id: str | None = None
+) -> tuple[list[float], list[list[str]]]:
+    latencies, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        hits = backend._search(query.tolist(), top_k, user_id)
+        latencies.append(time.perf_counter() - started)
+        results.append([payload["text"] for payload, _ in hits])
+    return latencies, results
+
+
+def summarize(latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    return f"median {1000 * statistics.median(ordered):8.2f} ms  p95 {1000 * p95:8.2f} ms"
+
+
+def recall(exact_results: list[list[str]], approx_results: list[list[str]]) -> float:
+    return statistics.mean(
+        len(set(exact) & set(approx)) / len(exact) for exact, approx in zip(exact_results, approx_results)
+    )
+
+
+def run(size: int, dim: int, n_queries: int, top_k: int, probes: int, users: int, heavy_share: float, clusters: int):
+    rng = np.random.default_rng(0)
+    centres = sample_vectors(clusters, None, dim, rng) if clusters else None
+    with tempfile.TemporaryDirectory() as path:
+        backend = LocalBackend(path, vector_size=dim, ann_threshold=size + 1, ann_probes=probes)
+        started = time.perf_counter()
+        fill(backend, size, users, heavy_share, centres, rng)
+        heavy_rows = backend._db.execute("SELECT COUNT(*) FROM memories WHERE user_id = ?", (HEAVY_USER,)).fetchone()[0]
+        typical_rows = backend._db.execute("SELECT COUNT(*) FROM memories WHERE user_id = 'user-0'").fetchone()[0]
+        print(f"\n{size:,} memories (loaded in {time.perf_counter() - started:.1f}s)")
+
+        queries = sample_vectors(n_queries, centres, dim, rng)
+        exact_latencies, exact_results = time_searches(backend, queries, top_k)
+        print(f"  unfiltered exact          {summarize(exact_latencies)}")
+        typical_latencies, _ = time_searches(backend, queries, top_k, "user-0")
+        print(f"  typical user ({typical_rows:>7,} rows)  exact  {summarize(typical_latencies)}")
+        heavy_exact_latencies, heavy_exact_results = time_searches(backend, queries, top_k, HEAVY_USER)
+        print(f"  heavy user   ({heavy_rows:>7,} rows)  exact  {summarize(heavy_exact_latencies)}")
+
+        started = time.perf_counter()
+        backend._ann = IVFIndex.build(np.asarray(backend._vectors[:size]))
+        print(f"  IVF build    {time.perf_counter() - started:.2f}s")
+
+        # Past the threshold both the unfiltered search and the heavy user's filtered search use the index
+        backend.ann_threshold = heavy_rows
+        ivf_latencies, ivf_results = time_searches(backend, queries, top_k)
+        print(f"  unfiltered IVF            {summarize(ivf_latencies)}  recall@{top_k} {recall(exact_results, ivf_results):.3f}")
+        heavy_ivf_latencies, heavy_ivf_results = time_searches(backend, queries, top_k, HEAVY_USER)
+        print(
+            f"  heavy user   ({heavy_rows:>7,} rows)  IVF    {summarize(heavy_ivf_latencies)}  "
+            f"recall@{top_k} {recall(heavy_exact_results, heavy_ivf_results):.3f}"
+        )
+        backend._close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--probes", type=int, default=8)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--heavy-share", type=float, default=0.2)
+    parser.add_argument("--clusters", type=int, default=1000, help="0 for uniformly random vectors")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        run(size, args.dim, args.queries, args.top_k, args.probes, args.users, args.heavy_share, args.clusters)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Reply latency with memory extraction in the graph versus enqueued on the background queue after the reply.
+
+Usage: PYTHONPATH=src python benchmarks/memory_extraction_offload.py [--concurrency 1 10 50] [--turns 5]
+       [--extraction-llm-ms 400] [--store-ms 60] [--router-ms 250] [--retrieval-ms 60] [--reply-ms 600]
+
+All three variants run stub graphs with the workflow's shape and fixed node delays, so the
+numbers show topology, not model speed:
+- first node: extraction runs before routing, as the graph originally did
+- parallel: extraction is one more branch fanned out from START with router, context and memory
+- enqueued: the current graph; ``enqueue_memory_extraction`` is called once the reply is out
+
+Extraction costs ``extraction-llm-ms`` for the analysis call plus ``store-ms`` per stored memory
+for embedding, the similarity search and the upsert. The enqueued variant goes through the
+real extraction queue and batching buffer with a stub memory manager. Each concurrency level runs
+``concurrency`` users sending ``turns`` messages in sequence. The script reports median and p95
+time to reply and, for the queue, how long after the last reply the extraction backlog drained.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+
+for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+             "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "benchmark")
+
+from ai_companion.graph.state import AICompanionState  # noqa: E402
+from ai_companion.modules.memory.long_term import extraction_queue  # noqa: E402
+
+
+class Delays:
+    extraction_llm = 0.4
+    store = 0.06
+    router = 0.25
+    retrieval = 0.06
+    reply = 0.6
+
+
+class StubMemoryManager:
+    def __init__(self):
+        self.extracted = 0
+
+    async def extract_and_store_memories(self, message, user_id=None):
+        await asyncio.sleep(Delays.extraction_llm + Delays.store)
+        self.extracted += 1
+
+    async def extract_and_store_memories_batch(self, messages, user_id=None):
+        await asyncio.sleep(Delays.extraction_llm + Delays.store * len(messages))
+        self.extracted += len(messages)
+
+
+def stub(seconds_attr: str | None, update: dict):
+    async def node(state: AICompanionState) -> dict:
+        if seconds_attr:
+            await asyncio.sleep(getattr(Delays, seconds_attr))
+        return update
+
+    return node
+
+
+async def memory_extraction_node(state: AICompanionState) -> dict:
+    await asyncio.sleep(Delays.extraction_llm + Delays.store)
+    return {}
+
+
+def create_stub_graph(extraction: str | None) -> StateGraph:
+    graph_builder = StateGraph(AICompanionState)
+    graph_builder.add_node("router_node", stub("router", {"workflow": "conversation"}))
+    graph_builder.add_node("context_injection_node", stub(None, {"current_activity": "", "apply_activity": False}))
+    graph_builder.add_node("memory_injection_node", stub("retrieval", {"memory_context": ""}))
+    graph_builder.add_node("workflow_join_node", stub(None, {}))
+    graph_builder.add_node("conversation_node", stub("reply", {"messages": AIMessage(content="hello")}))
+
+    pre_response_nodes = ["router_node", "context_injection_node", "memory_injection_node"]
+    if extraction == "first node":
+        graph_builder.add_node("memory_extraction_node", memory_extraction_node)
+        graph_builder.add_edge(START, "memory_extraction_node")
+        fan_out_from = "memory_extraction_node"
+    else:
+        fan_out_from = START
+        if extraction == "parallel":
+            graph_builder.add_node("memory_extraction_node", memory_extraction_node)
+            pre_response_nodes.append("memory_extraction_node")
+    for node in pre_response_nodes:
+        graph_builder.add_edge(fan_out_from, node)
+    graph_builder.add_edge(pre_response_nodes, "workflow_join_node")
+    graph_builder.add_edge("workflow_join_node", "conversation_node")
+    graph_builder.add_edge("conversation_node", END)
+    return graph_builder
+
+
+async def run_users(graph, enqueue: bool, concurrency: int, turns: int) -> tuple[list[float], float]:
+    latencies: list[float] = []
+
+    async def user(i: int):
+        for turn in range(turns):
+            message = HumanMessage(content=f"I moved to Lisbon last year and started learning guitar ({turn})")
+            started = time.perf_counter()
+            await graph.ainvoke({"messages": [message]})
+            latencies.append(time.perf_counter() - started)
+            if enqueue:
+                extraction_queue.enqueue_memory_extraction(message, user_id=f"user-{i}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+
+def summarize(name: str, latencies: list[float], extra: str = "") -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(0.95 * (len(ordered) - 1))]
+    return f"  {name:10} reply median {1000 * statistics.median(ordered):7.1f} ms  p95 {1000 * p95:7.1f} ms{extra}"
+
+
+async def benchmark(levels: list[int], turns: int):
+    for concurrency in levels:
+        print(f"{concurrency} concurrent users x {turns} turns")
+        for variant in ("first node", "parallel"):
+            graph = create_stub_graph(variant).compile()
+            latencies, _ = await run_users(graph, False, concurrency, turns)
+            print(summarize(variant, latencies))
+
+        memory_manager = StubMemoryManager()
+        extraction_queue.get_memory_manager = lambda: memory_manager
+        extraction_queue.get_memory_extraction_queue.cache_clear()
+        extraction_queue.get_memory_extraction_buffer.cache_clear()
+        await extraction_queue.get_memory_extraction_queue().start()
+        latencies, _ = await run_users(create_stub_graph(None).compile(), True, concurrency, turns)
+        started = time.perf_counter()
+        await extraction_queue.shutdown_memory_extraction()
+        drained = time.perf_counter() - started
+        print(summarize("enqueued", latencies, f"  {memory_manager.extracted} messages extracted {drained:5.2f}s after the last reply"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--extraction-llm-ms", type=float, default=400)
+    parser.add_argument("--store-ms", type=float, default=60)
+    parser.add_argument("--router-ms", type=float, default=250)
+    parser.add_argument("--retrieval-ms", type=float, default=60)
+    parser.add_argument("--reply-ms", type=float, default=600)
+    args = parser.parse_args()
+
+    Delays.extraction_llm = args.extraction_llm_ms / 1000
+    Delays.store = args.store_ms / 1000
+    Delays.router = args.router_ms / 1000
+    Delays.retrieval = args.retrieval_ms / 1000
+    Delays.reply = args.reply_ms / 1000
+    asyncio.run(benchmark(args.concurrency, args.turns))
+
+
+if __name__ == "__main__":
+    main()
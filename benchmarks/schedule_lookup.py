@@ -0,0 +1,44 @@
+"""Lookup cost of the minute-of-week schedule table versus scanning and parsing ranges per call.
+
+Usage: PYTHONPATH=src python benchmarks/schedule_lookup.py [--number 100000]
+"""
+
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from ai_companion.modules.schedules.context_generation import MINUTES_PER_WEEK, ScheduleContextGenerator
+
+WEEK_START = datetime(2024, 1, 1)
+
+
+def scan_ranges(moment: datetime):
+    """The previous lookup: parse every range of the day with strptime until one matches."""
+    current_time = moment.time()
+    for time_range, activity in ScheduleContextGenerator.SCHEDULES[moment.weekday()].items():
+        start_time, end_time = ScheduleContextGenerator.parse_time_range(time_range)
+        if start_time > end_time:
+            if current_time >= start_time or current_time < end_time:
+                return activity
+        elif start_time <= current_time < end_time:
+            return activity
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    moments = [WEEK_START + timedelta(minutes=rng.randrange(MINUTES_PER_WEEK)) for _ in range(1024)]
+
+    for name, lookup in (("table", ScheduleContextGenerator.get_activity_at), ("range scan", scan_ranges)):
+        iterator = iter(moments * (args.number // len(moments) + 1))
+        seconds = min(timeit.repeat(lambda: lookup(next(iterator)), number=args.number // 5, repeat=5))
+        print(f"{name:12} {1e9 * seconds / (args.number // 5):10.0f} ns per lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Transcription latency against voice-note length, with and without parallel segments.
+
+Usage: PYTHONPATH=src python benchmarks/speech_to_text_latency.py [--lengths 10,30,60,120,300]
+       [--base-ms 300] [--ms-per-second 10] [--ffmpeg PATH]
+
+Generates speech-like fixtures: tone bursts separated by short pauses. Each one is run against a
+local fake Groq transcription endpoint. The endpoint answers after ``base-ms`` plus
+``ms-per-second`` for every second of audio it receives. Each fixture is transcribed as one
+upload and with STT_CHUNKING_ENABLED, where the audio is split on pauses and the segments are
+uploaded concurrently. WAV fixtures always run. OGG/Opus fixtures, the WhatsApp voice-note
+format, run when ffmpeg is available to encode them, and they also include the cost of
+decoding before the split.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import threading
+import time
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+
+class FakeTranscriptionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    base_seconds = 0.3
+    seconds_per_audio_second = 0.01
+    uploads = 0
+
+    def do_POST(self):
+        from ai_companion.modules.speech.audio_segments import ogg_duration
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        type(self).uploads += 1
+        duration = 0.0
+        if (start := body.find(b"RIFF")) >= 0:
+            with wave.open(io.BytesIO(body[start:]), "rb") as wav:
+                duration = wav.getnframes() / wav.getframerate()
+        elif (start := body.find(b"OggS")) >= 0:
+            duration = ogg_duration(body[start:]) or 0.0
+        time.sleep(self.base_seconds + self.seconds_per_audio_second * duration)
+
+        payload = json.dumps({"text": f"{duration:.1f} seconds of speech"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTranscriptionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GROQ_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+    for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+                 "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+        os.environ.setdefault(name, "benchmark")
+    return server
+
+
+def speech_like_wav(seconds: float, seed: int = 0) -> bytes:
+    """Voiced bursts of 0.8-3 s separated by 0.2-0.6 s pauses, like a person talking."""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    samples = np.zeros(total, dtype=np.float32)
+    position = 0
+    while position < total:
+        burst = int(rng.uniform(0.8, 3.0) * SAMPLE_RATE)
+        t = np.arange(min(burst, total - position)) / SAMPLE_RATE
+        pitch = rng.uniform(100, 250)
+        samples[position : position + len(t)] = 6000 * np.sin(2 * np.pi * pitch * t) * rng.uniform(0.5, 1.0)
+        position += burst + int(rng.uniform(0.2, 0.6) * SAMPLE_RATE)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def encode_opus(wav_data: bytes, ffmpeg: str) -> bytes:
+    result = subprocess.run(
+        [ffmpeg, "-nostdin", "-loglevel", "error", "-i", "pipe:0", "-c:a", "libopus", "-b:a", "24k", "-f", "ogg", "pipe:1"],
+        input=wav_data,
+        capture_output=True,
+        check=True,
+    )
+    return result.stdout
+
+
+async def time_transcription(speech_to_text, audio_data: bytes, filename: str, repeats: int) -> tuple[float, int]:
+    timings = []
+    for _ in range(repeats):
+        FakeTranscriptionHandler.uploads = 0
+        started = time.perf_counter()
+        await speech_to_text.transcribe(audio_data, filename)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), FakeTranscriptionHandler.uploads
+
+
+async def benchmark(lengths: list[float], repeats: int, ffmpeg: str | None):
+    from ai_companion.modules.speech import SpeechToText
+    from ai_companion.settings import settings
+
+    if ffmpeg:
+        settings.STT_FFMPEG_PATH = ffmpeg
+    speech_to_text = SpeechToText()
+    # Open the pooled connection before timing anything
+    await speech_to_text.transcribe(speech_like_wav(1), "warmup.wav")
+
+    print(
+        f"fake STT: {1000 * FakeTranscriptionHandler.base_seconds:.0f} ms + "
+        f"{1000 * FakeTranscriptionHandler.seconds_per_audio_second:.0f} ms per audio second; "
+        f"segments of {settings.STT_SEGMENT_SECONDS:.0f} s, concurrency {settings.STT_MAX_CONCURRENCY}"
+    )
+    print(f"{'format':6} {'length':>7}  {'single upload':>14}  {'split':>14}  {'uploads':>7}  speedup")
+    for seconds in lengths:
+        wav_data = speech_like_wav(seconds)
+        fixtures = [("wav", wav_data, "audio.wav")]
+        if ffmpeg:
+            fixtures.append(("ogg", encode_opus(wav_data, ffmpeg), "audio.ogg"))
+
+        for name, audio_data, filename in fixtures:
+            settings.STT_CHUNKING_ENABLED = False
+            single, _ = await time_transcription(speech_to_text, audio_data, filename, repeats)
+            settings.STT_CHUNKING_ENABLED = True
+            split, uploads = await time_transcription(speech_to_text, audio_data, filename, repeats)
+            print(
+                f"{name:6} {seconds:6.0f}s  {1000 * single:11.0f} ms  {1000 * split:11.0f} ms  "
+                f"{uploads:7}  {single / split:6.2f}x"
+            )
+
+
+def find_ffmpeg(path: str | None) -> str | None:
+    if path:
+        return shutil.which(path)
+    if found := shutil.which("ffmpeg"):
+        return found
+    try:
+        import imageio_ffmpeg
+
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except ImportError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", default="10,30,60,120,300", help="comma-separated voice-note lengths in seconds")
+    parser.add_argument("--base-ms", type=float, default=300)
+    parser.add_argument("--ms-per-second", type=float, default=10)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--ffmpeg", help="ffmpeg binary for the OGG/Opus fixtures (default: from PATH)")
+    args = parser.parse_args()
+
+    FakeTranscriptionHandler.base_seconds = args.base_ms / 1000
+    FakeTranscriptionHandler.seconds_per_audio_second = args.ms_per_second / 1000
+    ffmpeg = find_ffmpeg(args.ffmpeg)
+    if ffmpeg is None:
+        print("ffmpeg not found: running the WAV fixtures only")
+
+    server = start_server()
+    try:
+        asyncio.run(benchmark([float(x) for x in args.lengths.split(",")], args.repeats, ffmpeg))
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
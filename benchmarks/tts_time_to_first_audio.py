@@ -0,0 +1,122 @@
+"""Time to first audio: TextToSpeech.synthesize_stream versus the buffered synthesize, against a fake streaming TTS server.
+
+Usage: PYTHONPATH=src python benchmarks/tts_time_to_first_audio.py [--chars 60 250 1000] [--first-chunk-ms 150]
+       [--chunk-ms 10] [--chunk-bytes 4096] [--chars-per-second 15]
+
+The fake server stands in for ElevenLabs' ``/v1/text-to-speech/{voice_id}/stream`` endpoint. It
+waits ``first-chunk-ms`` and then sends ``chunk-bytes`` of audio every ``chunk-ms`` using chunked
+transfer encoding. The audio lasts as long as the text takes to speak at ``chars-per-second``,
+at pcm_24000's 48,000 bytes per second. Both methods use a real ``AsyncElevenLabs`` client pointed
+at the server, with the speech cache disabled. The script reports when the first audio bytes
+reach the caller, and when the whole clip has arrived.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("TTS_CACHE_ENABLED", "false")
+for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+             "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "benchmark")
+
+from elevenlabs import AsyncElevenLabs  # noqa: E402
+
+from ai_companion.modules.speech.text_to_speech import TextToSpeech  # noqa: E402
+
+PCM_BYTES_PER_SECOND = 48_000
+
+
+class FakeStreamingTTSHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    first_chunk_seconds = 0.15
+    chunk_seconds = 0.01
+    chunk_bytes = 4096
+    chars_per_second = 15.0
+
+    def do_POST(self):
+        text = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))["text"]
+        remaining = int(len(text) / self.chars_per_second * PCM_BYTES_PER_SECOND)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/pcm")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(self.first_chunk_seconds)
+        while remaining > 0:
+            size = min(self.chunk_bytes, remaining)
+            self.wfile.write(f"{size:x}\r\n".encode() + b"\x00" * size + b"\r\n")
+            self.wfile.flush()
+            remaining -= size
+            if remaining:
+                time.sleep(self.chunk_seconds)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server() -> str:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeStreamingTTSHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def streamed(tts: TextToSpeech, text: str) -> tuple[float, float]:
+    started = time.perf_counter()
+    first_audio = None
+    async for _ in tts.synthesize_stream(text, "pcm_24000"):
+        if first_audio is None:
+            first_audio = time.perf_counter() - started
+    return first_audio, time.perf_counter() - started
+
+
+async def buffered(tts: TextToSpeech, text: str) -> tuple[float, float]:
+    started = time.perf_counter()
+    await tts.synthesize(text, "pcm_24000")
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+async def benchmark(base_url: str, lengths: list[int], repeats: int):
+    tts = TextToSpeech()
+    # TextToSpeech builds its client lazily from settings; point it at the fake server instead
+    tts._client = AsyncElevenLabs(api_key="benchmark", base_url=base_url)
+    await tts.synthesize("Warming up the connection.", "pcm_24000")
+
+    print(f"{'chars':>6}  {'method':17} {'first audio':>12}  {'complete':>10}")
+    for chars in lengths:
+        text = ("That sounds lovely, tell me more about it. " * (chars // 43 + 1))[:chars]
+        results = {
+            "synthesize_stream": [await streamed(tts, text) for _ in range(repeats)],
+            "synthesize": [await buffered(tts, text) for _ in range(repeats)],
+        }
+        for name, timings in results.items():
+            first = statistics.median(t[0] for t in timings)
+            complete = statistics.median(t[1] for t in timings)
+            print(f"{chars:6}  {name:17} {1000 * first:9.0f} ms  {1000 * complete:7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chars", type=int, nargs="+", default=[60, 250, 1000])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--first-chunk-ms", type=float, default=150)
+    parser.add_argument("--chunk-ms", type=float, default=10)
+    parser.add_argument("--chunk-bytes", type=int, default=4096)
+    parser.add_argument("--chars-per-second", type=float, default=15)
+    args = parser.parse_args()
+
+    FakeStreamingTTSHandler.first_chunk_seconds = args.first_chunk_ms / 1000
+    FakeStreamingTTSHandler.chunk_seconds = args.chunk_ms / 1000
+    FakeStreamingTTSHandler.chunk_bytes = args.chunk_bytes
+    FakeStreamingTTSHandler.chars_per_second = args.chars_per_second
+    asyncio.run(benchmark(start_server(), args.chars, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
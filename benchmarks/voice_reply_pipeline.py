@@ -0,0 +1,112 @@
+"""Voice-reply latency: sentence-pipelined TTS versus generating the whole reply before synthesizing it.
+
+Usage: PYTHONPATH=src python benchmarks/voice_reply_pipeline.py [--sentences 2 4 8] [--ttft-ms 300]
+       [--tokens-per-s 80] [--tts-base-ms 250] [--tts-ms-per-char 3]
+
+The LLM stub streams one word per token after ``ttft-ms``, at ``tokens-per-s``. The TTS stub
+answers after ``tts-base-ms`` plus ``tts-ms-per-char`` for each character and handles
+concurrent requests independently, like the ElevenLabs API. Two paths are compared:
+- buffered: collect the full reply, then synthesize it in one call (TTS_PIPELINE_ENABLED=false)
+- pipelined: ``iter_sentences`` plus ``synthesize_in_order``, as audio_node does now
+
+For each reply length the script reports time to first audio, which Chainlit plays as it
+arrives, and time to the complete voice note, which WhatsApp sends in one piece.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+             "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "benchmark")
+
+from ai_companion.modules.speech.speech_pipeline import iter_sentences, synthesize_in_order  # noqa: E402
+
+WORDS = "well I was just thinking about that trip we talked about and honestly it sounds like so much fun".split()
+
+
+def make_reply(sentences: int, rng: random.Random) -> str:
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + rng.choice(".!?")
+        for _ in range(sentences)
+    )
+
+
+class Stubs:
+    def __init__(self, ttft: float, tokens_per_s: float, tts_base: float, tts_per_char: float):
+        self.ttft = ttft
+        self.token_interval = 1 / tokens_per_s
+        self.tts_base = tts_base
+        self.tts_per_char = tts_per_char
+
+    async def tokens(self, reply: str):
+        await asyncio.sleep(self.ttft)
+        for i, word in enumerate(reply.split(" ")):
+            await asyncio.sleep(self.token_interval)
+            yield word if i == 0 else f" {word}"
+
+    async def synthesize(self, text: str) -> bytes:
+        await asyncio.sleep(self.tts_base + self.tts_per_char * len(text))
+        return text.encode()
+
+
+async def buffered(stubs: Stubs, reply: str) -> tuple[float, float]:
+    started = time.perf_counter()
+    text = "".join([token async for token in stubs.tokens(reply)])
+    await stubs.synthesize(text)
+    elapsed = time.perf_counter() - started
+    return elapsed, elapsed
+
+
+async def pipelined(stubs: Stubs, reply: str, min_chars: int, concurrency: int) -> tuple[float, float]:
+    started = time.perf_counter()
+    first_audio = None
+    sentences = iter_sentences(stubs.tokens(reply), min_chars=min_chars)
+    async for _ in synthesize_in_order(sentences, stubs.synthesize, max_concurrency=concurrency):
+        if first_audio is None:
+            first_audio = time.perf_counter() - started
+    return first_audio, time.perf_counter() - started
+
+
+async def benchmark(stubs: Stubs, sentence_counts: list[int], repeats: int, min_chars: int, concurrency: int):
+    rng = random.Random(0)
+    print(f"{'sentences':>9}  {'path':10} {'first audio':>12}  {'complete':>10}")
+    for sentences in sentence_counts:
+        replies = [make_reply(sentences, rng) for _ in range(repeats)]
+        results = {
+            "buffered": [await buffered(stubs, reply) for reply in replies],
+            "pipelined": [await pipelined(stubs, reply, min_chars, concurrency) for reply in replies],
+        }
+        for name, timings in results.items():
+            first = statistics.median(t[0] for t in timings)
+            complete = statistics.median(t[1] for t in timings)
+            print(f"{sentences:9}  {name:10} {1000 * first:9.0f} ms  {1000 * complete:7.0f} ms")
+        first_speedup, complete_speedup = (
+            statistics.median(t[i] for t in results["buffered"]) / statistics.median(t[i] for t in results["pipelined"])
+            for i in (0, 1)
+        )
+        print(f"{'':9}  pipelined: first audio {first_speedup:.2f}x, complete voice note {complete_speedup:.2f}x sooner")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sentences", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--ttft-ms", type=float, default=300)
+    parser.add_argument("--tokens-per-s", type=float, default=80)
+    parser.add_argument("--tts-base-ms", type=float, default=250)
+    parser.add_argument("--tts-ms-per-char", type=float, default=3)
+    parser.add_argument("--min-chars", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=3)
+    args = parser.parse_args()
+
+    stubs = Stubs(args.ttft_ms / 1000, args.tokens_per_s, args.tts_base_ms / 1000, args.tts_ms_per_char / 1000)
+    asyncio.run(benchmark(stubs, args.sentences, args.repeats, args.min_chars, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Throughput of webhook batch processing with a simulated turn latency.
+
+Usage: PYTHONPATH=src python benchmarks/webhook_batch_throughput.py [--senders 20] [--messages 5] [--turn-ms 200]
+
+Builds one synthetic delivery with ``senders`` x ``messages`` text messages spread over several
+entries and changes. It compares three approaches:
+- the old handler, which only processed the first message of a delivery
+- processing every message sequentially
+- fanning the batch out on the per-sender KeyedWorkQueue
+"""
+
+import argparse
+import asyncio
+import time
+
+from ai_companion.core.work_queue import KeyedWorkQueue
+from ai_companion.interfaces.whatsapp.webhook_batch import parse_webhook, queue_messages
+
+
+class NoopDeduplicator:
+    async def claim_many(self, message_ids: list[str]) -> list[bool]:
+        return [True] * len(message_ids)
+
+    async def release_many(self, message_ids: list[str]):
+        pass
+
+
+def build_delivery(senders: int, messages: int, entries: int = 4) -> dict:
+    payload = {"entry": [{"changes": []} for _ in range(entries)]}
+    for i in range(messages):
+        for sender in range(senders):
+            value = {"messages": [{"id": f"{sender}-{i}", "from": str(sender), "type": "text", "text": {"body": "hi"}}]}
+            payload["entry"][(sender + i) % entries]["changes"].append({"value": value})
+    return payload
+
+
+async def benchmark(senders: int, messages: int, turn_seconds: float, workers: int):
+    data = build_delivery(senders, messages)
+    batch, _ = parse_webhook(data)
+
+    async def process(message: dict):
+        await asyncio.sleep(turn_seconds)
+
+    results = {}
+
+    started = time.perf_counter()
+    await process(batch[0])
+    results["first message only"] = (1, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for message in batch:
+        await process(message)
+    results["sequential"] = (len(batch), time.perf_counter() - started)
+
+    queue = KeyedWorkQueue("benchmark", num_workers=workers, max_size=len(batch))
+    started = time.perf_counter()
+    await queue_messages(batch, queue, NoopDeduplicator(), process)
+    await queue.join()
+    results[f"keyed queue ({workers} workers)"] = (len(batch), time.perf_counter() - started)
+    await queue.stop()
+
+    print(f"{len(batch)} messages from {senders} senders, {1000 * turn_seconds:.0f} ms per turn")
+    for name, (processed, seconds) in results.items():
+        print(f"  {name:28} {processed:5} processed in {seconds:7.2f}s  {processed / seconds:8.1f} msg/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--senders", type=int, default=20)
+    parser.add_argument("--messages", type=int, default=5)
+    parser.add_argument("--turn-ms", type=float, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.senders, args.messages, args.turn_ms / 1000, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Load test of the WhatsApp webhook: ack latency, 503 backpressure and replies sent to a fake Graph API.
+
+Usage: PYTHONPATH=src python benchmarks/whatsapp_webhook_load.py [--rates 10 50 200] [--seconds 5]
+       [--senders 50] [--turn-ms 500] [--send-ms 150] [--workers 8] [--queue-size 500]
+
+A fake Graph API runs under uvicorn on a local port in its own thread. It answers message sends
+after ``send-ms`` and records when each reply arrives. The app's ``whatsapp_handler`` is driven
+through an ASGI transport with one text message per delivery, posted at a fixed ``rate`` per
+second from ``senders`` users for ``seconds``. ``process_message`` runs unchanged against a
+stub graph whose conversation node waits ``turn-ms``, and sends its reply through the shared
+Graph API client. Memory extraction is switched off.
+
+Two handlers are compared at each rate:
+- inline: ``process_message`` awaited before the 200, as the handler used to do
+- queued: ``whatsapp_handler``, which acks once the message is on the per-sender queue
+
+The script reports ack latency, deliveries answered 503 because the queue was full (Meta
+redelivers those later), and the time from the webhook to the reply reaching the fake Graph API.
+Replies that answer a different message than their webhook are counted as mismatched; this
+happens when turns of one sender overlap on the same thread.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import statistics
+import tempfile
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request, Response
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+DATA_DIR = tempfile.mkdtemp(prefix="whatsapp-load-")
+os.environ.setdefault("SHORT_TERM_MEMORY_DB_PATH", os.path.join(DATA_DIR, "memory.db"))
+os.environ.setdefault("WHATSAPP_DEDUP_DB_PATH", os.path.join(DATA_DIR, "dedup.db"))
+for name in ("GROQ_API_KEY", "ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID", "TOGETHER_API_KEY", "QDRANT_URL",
+             "QDRANT_API_KEY", "WHATSAPP_PHONE_NUMBER_ID", "WHATSAPP_TOKEN", "WHATSAPP_VERIFY_TOKEN"):
+    os.environ.setdefault(name, "benchmark")
+
+from ai_companion.core.work_queue import KeyedWorkQueue  # noqa: E402
+from ai_companion.graph import runtime  # noqa: E402
+from ai_companion.graph.state import AICompanionState  # noqa: E402
+from ai_companion.interfaces.whatsapp import graph_api, whatsapp_response  # noqa: E402
+from ai_companion.interfaces.whatsapp.webhook_batch import parse_webhook  # noqa: E402
+
+TURN_SECONDS = 0.5
+
+
+class FakeGraphAPI:
+    def __init__(self, send_seconds: float):
+        self.send_seconds = send_seconds
+        self.replied_at: dict[str, float] = {}
+        self.sends = 0
+        self.app = FastAPI()
+        self.app.post("/v21.0/{phone_number_id}/messages")(self.send_message)
+
+    async def send_message(self, request: Request) -> dict:
+        body = await request.json()
+        await asyncio.sleep(self.send_seconds)
+        self.sends += 1
+        self.replied_at[body["text"]["body"]] = time.perf_counter()
+        return {"messaging_product": "whatsapp", "messages": [{"id": f"wamid.{len(self.replied_at)}"}]}
+
+    def serve(self) -> str:
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        server = uvicorn.Server(uvicorn.Config(self.app, log_level="warning"))
+        threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True).start()
+        while not server.started:
+            time.sleep(0.01)
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/v21.0"
+
+
+def create_stub_graph() -> StateGraph:
+    async def conversation_node(state: AICompanionState) -> dict:
+        await asyncio.sleep(TURN_SECONDS)
+        # Echo the message id so the fake Graph API can match the reply to its webhook
+        return {"workflow": "conversation", "messages": AIMessage(content=state["messages"][-1].content)}
+
+    graph_builder = StateGraph(AICompanionState)
+    graph_builder.add_node("conversation_node", conversation_node)
+    graph_builder.add_edge(START, "conversation_node")
+    graph_builder.add_edge("conversation_node", END)
+    return graph_builder
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(whatsapp_response.whatsapp_router)
+
+    @app.post("/inline")
+    async def inline_handler(request: Request) -> Response:
+        messages, _ = parse_webhook(await request.json())
+        for message in messages:
+            await whatsapp_response.process_message(message)
+        return Response(content="Message processed", status_code=200)
+
+    return app
+
+
+def delivery(message_id: str, sender: int) -> dict:
+    message = {"id": message_id, "from": f"sender-{sender}", "type": "text", "text": {"body": message_id}}
+    return {"object": "whatsapp_business_account", "entry": [{"changes": [{"value": {"messages": [message]}}]}]}
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered = sorted(values) or [float("nan")]
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+async def run_load(
+    client: httpx.AsyncClient, path: str, label: str, rate: float, seconds: float, senders: int
+):
+    acks: list[float] = []
+    statuses: dict[int, int] = {}
+    posted_at: dict[str, float] = {}
+
+    async def post(message_id: str, sender: int):
+        started = time.perf_counter()
+        response = await client.post(path, json=delivery(message_id, sender))
+        acks.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if response.status_code == 200:
+            posted_at[message_id] = started
+
+    tasks = []
+    started = time.perf_counter()
+    for i in range(int(rate * seconds)):
+        await asyncio.sleep(max(0.0, started + i / rate - time.perf_counter()))
+        tasks.append(asyncio.create_task(post(f"{label}-{rate}-{i}", i % senders)))
+    await asyncio.gather(*tasks)
+    return acks, statuses, posted_at
+
+
+async def benchmark(rates: list[float], seconds: float, senders: int, send_seconds: float, workers: int, queue_size: int):
+    fake = FakeGraphAPI(send_seconds)
+    graph_api.GRAPH_API_URL = fake.serve()
+    runtime.create_workflow_graph = create_stub_graph
+    whatsapp_response.enqueue_memory_extraction = lambda message, user_id=None: None
+
+    graph_runtime = runtime.get_graph_runtime()
+    await graph_runtime.start()
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=None) as client:
+        for rate in rates:
+            print(f"{rate:g} messages/s for {seconds:g}s from {senders} senders, {1000 * TURN_SECONDS:.0f} ms turns")
+            for label, path in (("inline", "/inline"), ("queued", "/whatsapp_response")):
+                queue = KeyedWorkQueue(f"benchmark-{label}", num_workers=workers, max_size=queue_size, max_retries=0)
+                whatsapp_response.get_message_queue = lambda: queue
+                sends = fake.sends
+                started = time.perf_counter()
+                acks, statuses, posted_at = await run_load(client, path, label, rate, seconds, senders)
+                await queue.join()
+                elapsed = time.perf_counter() - started
+                await queue.stop()
+
+                replies = [fake.replied_at[m] - t for m, t in posted_at.items() if m in fake.replied_at]
+                # A reply echoing another message's id means the turn answered with the wrong state
+                mismatched = fake.sends - sends - len(replies)
+                print(
+                    f"  {label:7} ack p50 {1000 * statistics.median(acks):7.1f} ms  p99 {1000 * percentile(acks, 0.99):7.1f} ms  "
+                    f"503s {statuses.get(503, 0):4}  replies {len(replies):4} ({mismatched:3} mismatched) "
+                    f"p50 {percentile(replies, 0.5):6.2f}s  p99 {percentile(replies, 0.99):6.2f}s  "
+                    f"drained in {elapsed:6.1f}s"
+                )
+    await graph_runtime.stop()
+    await graph_api.close_graph_api_client()
+    whatsapp_response.get_message_deduplicator().close()
+
+
+def main():
+    global TURN_SECONDS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--senders", type=int, default=50)
+    parser.add_argument("--turn-ms", type=float, default=500)
+    parser.add_argument("--send-ms", type=float, default=150)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=500)
+    args = parser.parse_args()
+
+    TURN_SECONDS = args.turn_ms / 1000
+    # Every 503 logs a warning; they are counted instead
+    logging.getLogger("ai_companion.interfaces.whatsapp").setLevel(logging.ERROR)
+    asyncio.run(
+        benchmark(args.rates, args.seconds, args.senders, args.send_ms / 1000, args.workers, args.queue_size)
+    )
+
+
+if __name__ == "__main__":
+    main()
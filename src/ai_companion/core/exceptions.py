@@ -1,4 +1,3 @@
-from exceptions import Exception
 
 class SpeechToTextError(Exception):
     """Exception raised for errors in the speech-to-text conversion process."""
@@ -0,0 +1,66 @@
+from functools import lru_cache
+from typing import Callable, Type
+
+import httpx
+from langchain_groq import ChatGroq
+from pydantic import BaseModel
+
+from ai_companion.settings import settings
+
+# One keep-alive connection pool to the Groq API shared by every chat model in the process
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60)
+HTTP_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Cached factories whose results hold a ChatGroq bound to the shared clients
+_client_bound_caches: list[Callable] = []
+
+
+def clears_with_http_clients(factory: Callable) -> Callable:
+    """Register an ``lru_cache``d factory to be cleared when ``close_http_clients`` runs.
+
+    Anything cached that holds a model from ``get_groq_model`` would otherwise keep using the
+    closed clients after a lifespan restart.
+    """
+    _client_bound_caches.append(factory)
+    return factory
+
+
+@lru_cache()
+def get_http_client() -> httpx.Client:
+    return httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+@lru_cache()
+def get_async_http_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT)
+
+
+@clears_with_http_clients
+@lru_cache(maxsize=None)
+def get_groq_model(model_name: str, temperature: float, max_retries: int = 2) -> ChatGroq:
+    """Return the process-wide ChatGroq client for (model, temperature)."""
+    return ChatGroq(
+        api_key=settings.GROQ_API_KEY,
+        model_name=model_name,
+        temperature=temperature,
+        max_retries=max_retries,
+        http_client=get_http_client(),
+        http_async_client=get_async_http_client(),
+    )
+
+
+@clears_with_http_clients
+@lru_cache(maxsize=None)
+def get_structured_groq_model(model_name: str, temperature: float, schema: Type[BaseModel], max_retries: int = 2):
+    return get_groq_model(model_name, temperature, max_retries).with_structured_output(schema)
+
+
+async def close_http_clients():
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+        get_async_http_client.cache_clear()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
+    for factory in _client_bound_caches:
+        factory.cache_clear()
@@ -165,4 +165,41 @@ Output: {{
 
 Message: {message}
 Output:
-"""
\ No newline at end of file
+"""
+
+MEMORY_BATCH_ANALYSIS_PROMPT = """Extract and format important personal facts about the user from their recent messages.
+Focus on the actual information, not meta-commentary or requests.
+
+Important facts include:
+- Personal details (name, age, location)
+- Professional info (job, education, skills)
+- Preferences (likes, dislikes, favorites)
+- Life circumstances (family, relationships)
+- Significant experiences or achievements
+- Personal goals or aspirations
+
+Rules:
+1. Analyse every numbered message and return exactly one result per message, in the same order
+2. Only extract actual facts, not requests or commentary about remembering things
+3. Convert facts into clear, third-person statements
+4. If a message has no actual facts, mark it as not important
+5. Remove conversational elements and focus on the core information
+
+Example:
+Messages:
+1. Hey, could you remember that I love Star Wars?
+2. Hey, how are you today?
+3. I studied computer science at MIT and I'd love if you could remember that
+
+Output: {{
+    "memories": [
+        {{"is_important": true, "formatted_memory": "Loves Star Wars"}},
+        {{"is_important": false, "formatted_memory": null}},
+        {{"is_important": true, "formatted_memory": "Studied computer science at MIT"}}
+    ]
+}}
+
+Messages:
+{messages}
+Output:
+"""
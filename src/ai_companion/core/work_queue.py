@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Hashable, Optional
+
+Job = Callable[[], Awaitable[None]]
+
+
+class KeyedWorkQueue:
+    """Bounded in-process async work queue with strict ordering per key.
+
+    Jobs sharing a key run one after another in submission order, while jobs for different
+    keys run in parallel across ``num_workers`` workers. Failed jobs are retried with
+    exponential backoff, and ``stop`` drains outstanding work before the workers exit.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        num_workers: int = 4,
+        max_size: int = 1000,
+        max_retries: int = 2,
+        retry_backoff: float = 0.5,
+    ):
+        self.name = name
+        self.num_workers = num_workers
+        self.max_size = max_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.logger = logging.getLogger(f"{__name__}.{name}")
+        self.processed = 0
+        self.failed = 0
+        self.retried = 0
+        self._pending: dict[Hashable, deque[Job]] = {}
+        self._size = 0
+        self._ready: Optional[asyncio.Queue] = None
+        self._not_full: Optional[asyncio.Condition] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._workers: list[asyncio.Task] = []
+        self._closing = False
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def closing(self) -> bool:
+        return self._closing
+
+    def _ensure_started(self):
+        if self._workers:
+            return
+        self._ready = asyncio.Queue()
+        self._not_full = asyncio.Condition()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._closing = False
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-worker-{i}") for i in range(self.num_workers)
+        ]
+
+    async def start(self):
+        self._ensure_started()
+
+    def _enqueue(self, key: Hashable, job: Job):
+        self._size += 1
+        self._idle.clear()
+        if key in self._pending:
+            # A worker owns this key already; it will pick the job up in order
+            self._pending[key].append(job)
+        else:
+            self._pending[key] = deque([job])
+            self._ready.put_nowait(key)
+
+    def submit_nowait(self, key: Hashable, job: Job):
+        """Enqueue ``job`` for ``key``, raising ``asyncio.QueueFull`` when at capacity."""
+        if self._closing:
+            raise RuntimeError(f"{self.name} queue is shutting down")
+        self._ensure_started()
+        if self._size >= self.max_size:
+            raise asyncio.QueueFull
+        self._enqueue(key, job)
+
+    async def submit(self, key: Hashable, job: Job):
+        """Enqueue ``job`` for ``key``, waiting for capacity when the queue is full."""
+        if self._closing:
+            raise RuntimeError(f"{self.name} queue is shutting down")
+        self._ensure_started()
+        async with self._not_full:
+            await self._not_full.wait_for(lambda: self._size < self.max_size)
+            self._enqueue(key, job)
+
+    async def _run_with_retries(self, key: Hashable, job: Job):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await job()
+                self.processed += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.failed += 1
+                    self.logger.error(f"Job for {key} failed after {attempt + 1} attempts: {e}", exc_info=True)
+                    return
+                self.retried += 1
+                self.logger.warning(f"Job for {key} failed, retrying: {e}")
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def _worker(self):
+        while True:
+            key = await self._ready.get()
+            job = self._pending[key].popleft()
+            try:
+                await self._run_with_retries(key, job)
+            finally:
+                if self._pending[key]:
+                    # Requeue instead of looping so other keys get a turn
+                    self._ready.put_nowait(key)
+                else:
+                    del self._pending[key]
+
+                self._size -= 1
+                if self._size == 0:
+                    self._idle.set()
+                async with self._not_full:
+                    self._not_full.notify()
+
+    async def join(self):
+        if self._idle is not None:
+            await self._idle.wait()
+
+    async def stop(self, timeout: Optional[float] = None):
+        """Stop accepting jobs, wait up to ``timeout`` for queued work, then stop the workers."""
+        if not self._workers:
+            return
+
+        self._closing = True
+        try:
+            await asyncio.wait_for(self.join(), timeout)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"Dropping {self._size} jobs still queued after {timeout}s drain")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+        self._size = 0
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "queued": self._size,
+            "processed": self.processed,
+            "failed": self.failed,
+            "retried": self.retried,
+        }
@@ -3,7 +3,7 @@ from langgraph.graph import StateGraph, START, END
 
 from ai_companion.graph.edges import (
     select_workflow,
-    should_summarize_conversation,
+    should_summarize,
 )
 
 from ai_companion.graph.state import AICompanionState
@@ -12,17 +12,16 @@ from ai_companion.graph.nodes import (
     context_injection_node,
     conversation_node,
     image_node,
-    memory_extraction_node,
     memory_injection_node,
     router_node,
     summarize_conversation_node,
+    workflow_join_node,
 )
 
 @lru_cache
 def create_workflow_graph():
     graph_builder = StateGraph(AICompanionState)
 
-    graph_builder.add_node("memory_extraction_node", memory_extraction_node)
     graph_builder.add_node("router_node", router_node)
     graph_builder.add_node("context_injection_node", context_injection_node)
     graph_builder.add_node("memory_injection_node", memory_injection_node)
@@ -30,24 +29,28 @@ def create_workflow_graph():
     graph_builder.add_node("image_node", image_node)
     graph_builder.add_node("audio_node", audio_node)
     graph_builder.add_node("summarize_conversation_node", summarize_conversation_node)
+    graph_builder.add_node("workflow_join_node", workflow_join_node)
 
+    # Routing, context and memory retrieval are independent, so fan them out.
+    # Memory extraction runs off the critical path once the reply has been sent.
+    pre_response_nodes = [
+        "router_node",
+        "context_injection_node",
+        "memory_injection_node",
+    ]
+    for node in pre_response_nodes:
+        graph_builder.add_edge(START, node)
 
-    graph_builder.add_edge(START, "memory_extraction_node")
-
-    # Then determine response type
-    graph_builder.add_edge("memory_extraction_node", "router_node")
-
-    # Then inject both context and memories
-    graph_builder.add_edge("router_node", "context_injection_node")
-    graph_builder.add_edge("context_injection_node", "memory_injection_node")
+    # Wait for every branch before choosing the response node
+    graph_builder.add_edge(pre_response_nodes, "workflow_join_node")
 
     # Then proceed to appropriate response node
-    graph_builder.add_conditional_edges("memory_injection_node", select_workflow)
+    graph_builder.add_conditional_edges("workflow_join_node", select_workflow)
 
     # Check for summarization after any response
-    graph_builder.add_conditional_edges("conversation_node", should_summarize_conversation)
-    graph_builder.add_conditional_edges("image_node", should_summarize_conversation)
-    graph_builder.add_conditional_edges("audio_node", should_summarize_conversation)
+    graph_builder.add_conditional_edges("conversation_node", should_summarize)
+    graph_builder.add_conditional_edges("image_node", should_summarize)
+    graph_builder.add_conditional_edges("audio_node", should_summarize)
     graph_builder.add_edge("summarize_conversation_node", END)
 
     return graph_builder
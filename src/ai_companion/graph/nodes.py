@@ -1,33 +1,40 @@
 from ai_companion.graph.state import AICompanionState
 
 from ai_companion.graph.utils.chains import (get_router_chain, 
-                                             get_character_response_chain)
+                                             get_character_response_chain,
+                                             get_character_token_chain,
+                                             format_summary_context)
+from ai_companion.graph.utils.local_router import get_local_router
+from ai_companion.modules.image.artifact_store import get_image_artifact_store
 from ai_companion.modules.memory.long_term.memory_manager import get_memory_manager
 from ai_companion.modules.schedules.context_generation import ScheduleContextGenerator
 
 from ai_companion.graph.utils.helpers import (get_text_to_image_module, 
                                               get_text_to_speech_module,
-                                              get_chat_model)
+                                              get_chat_model,
+                                              get_user_id,
+                                              remove_asterisk_content)
+from ai_companion.modules.speech.speech_pipeline import iter_sentences, synthesize_in_order
 from ai_companion.settings import settings
 
-import uuid
-import os
+import asyncio
+import logging
+import time
 
 from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage
 from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
 
-async def memory_extraction_node(state: AICompanionState):
-    if not state["messages"]:
-        return {}
-    
-    memory_manager = get_memory_manager()
-    await memory_manager.extract_and_store_memories(state["messages"][-1])
-    return {}
-
+logger = logging.getLogger(__name__)
 
 async def router_node(state: AICompanionState):
+    if settings.ROUTER_LOCAL_ENABLED:
+        workflow = await get_local_router().route(state["messages"][-1].content)
+        if workflow is not None:
+            return {"workflow": workflow}
+
     chain = get_router_chain()
-    result = await chain.ainvoke(messages=state["messages"][-settings.ROUTER_MESSAGES_TO_ANALYZE :])
+    result = await chain.ainvoke({"messages": state["messages"][-settings.ROUTER_MESSAGES_TO_ANALYZE :]})
     return {"workflow": result.response_type}
 
 def context_injection_node(state: AICompanionState):
@@ -39,23 +46,28 @@ def context_injection_node(state: AICompanionState):
         apply_activity = False
     return {"apply_activity": apply_activity, "current_activity": schedule}
 
-async def memory_injection_node(state: AICompanionState):
+async def memory_injection_node(state: AICompanionState, config: RunnableConfig):
     if not state["messages"]:
         return {}
     
     recent_context = "".join(m.content for m in state["messages"][-3:])
     memory_manager = get_memory_manager()
-    memories = memory_manager.get_relevant_memories(recent_context)
+    memories = await memory_manager.get_relevant_memories(recent_context, user_id=get_user_id(config))
     memory_context = memory_manager.format_memories_for_prompt(memories)
     return {"memory_context": memory_context}
 
+def workflow_join_node(state: AICompanionState):
+    # Each pre-response branch writes its own state keys, so the join has nothing to merge
+    return {}
+
 async def conversation_node(state: AICompanionState, config: RunnableConfig):
     current_activity = ScheduleContextGenerator().get_current_activity()
     memory_context = state.get("memory_context", "")
-    chain = get_character_response_chain(state.get("summary", ""))
+    chain = get_character_response_chain()
 
     result = await chain.ainvoke({"memory_context": memory_context,
                             "current_activity": current_activity,
+                            "summary_context": format_summary_context(state.get("summary", "")),
                             "messages": state["messages"]},
                             config)
     
@@ -65,44 +77,96 @@ async def image_node(state:AICompanionState, config: RunnableConfig):
     current_activity = ScheduleContextGenerator().get_current_activity()
     memory_context = state.get("memory_context", "")
 
-    chain = get_character_response_chain(state.get("summary", ""))
+    chain = get_character_response_chain()
     text_to_image_module = get_text_to_image_module()
 
+    started = time.perf_counter()
     scenario = await text_to_image_module.create_scenario(state["messages"][-5:])
-    os.makedirs("generated_images", exist_ok=True)
-    image_path = f"generated_images/{str(uuid.uuid4)}.png"
-    await text_to_image_module.generate_image(scenario.image_prompt, image_path)
+    scenario_seconds = time.perf_counter() - started
 
     scenario_message = HumanMessage(content=f"<image attached by Ava generated from prompt: {scenario.image_prompt}>")
-    updated_messages = state["messages"] + scenario_message
-
-    response = await chain.ainvoke({
-        "messages": updated_messages,
-        "current_activity": current_activity,
-        "memory_context": memory_context
-        },
-        config
+    updated_messages = state["messages"] + [scenario_message]
+
+    async def timed(coro):
+        stage_started = time.perf_counter()
+        result = await coro
+        return result, time.perf_counter() - stage_started
+
+    # The caption only needs the scenario prompt, not the image bytes, so both run at once
+    (image_data, image_seconds), (response, caption_seconds) = await asyncio.gather(
+        timed(text_to_image_module.generate_image(scenario.image_prompt)),
+        timed(chain.ainvoke({
+            "messages": updated_messages,
+            "current_activity": current_activity,
+            "memory_context": memory_context,
+            "summary_context": format_summary_context(state.get("summary", ""))
+            },
+            config
+        )),
     )
+    logger.info(
+        f"Image turn: scenario {scenario_seconds:.2f}s, image {image_seconds:.2f}s, "
+        f"caption {caption_seconds:.2f}s, total {time.perf_counter() - started:.2f}s"
+    )
+
+    # The bytes go to the interface as a custom stream event so they never land in the checkpoint
+    get_stream_writer()({"image": image_data})
 
-    return {"messages": AIMessage(content = response), "image_path":image_path}
+    image_path = ""
+    if settings.IMAGE_STORE_ENABLED:
+        image_path = await get_image_artifact_store().put(image_data)
+
+    return {"messages": AIMessage(content = response), "image_path": image_path}
 
 async def audio_node(state: AICompanionState, config: RunnableConfig):
     current_activity = ScheduleContextGenerator().get_current_activity()
     memory_context = state.get("memory_context", "")
-
-    chain = get_character_response_chain(state.get("summary", ""))
     text_to_speech_module = get_text_to_speech_module()
+    # Interfaces that play speech progressively (Chainlit) receive PCM segments as custom stream events
+    stream_audio = config.get("configurable", {}).get("stream_audio", False)
 
-    response = await chain.ainvoke({
+    inputs = {
         "messages": state["messages"],
         "memory_context": memory_context,
-        "current_activity": current_activity
-        },
-        config
-    )    
-
-    output_audio = await text_to_speech_module.synthesize(response)
-    return {"messages": AIMessage(content=response), "audio_buffer":output_audio}
+        "current_activity": current_activity,
+        "summary_context": format_summary_context(state.get("summary", ""))
+    }
+
+    if not settings.TTS_PIPELINE_ENABLED:
+        chain = get_character_response_chain()
+        response = await chain.ainvoke(inputs, config)
+        if stream_audio:
+            return {"messages": AIMessage(content=response), "audio_buffer": b""}
+
+        output_audio = await text_to_speech_module.synthesize(response)
+        return {"messages": AIMessage(content=response), "audio_buffer":output_audio}
+
+    # Send each finished sentence to TTS while the rest of the reply is still generating
+    spoken_sentences = []
+
+    async def sentences():
+        tokens = get_character_token_chain().astream(inputs, config)
+        async for sentence in iter_sentences(tokens, min_chars=settings.TTS_PIPELINE_MIN_SENTENCE_CHARS):
+            sentence = remove_asterisk_content(sentence)
+            if sentence:
+                spoken_sentences.append(sentence)
+                yield sentence
+
+    output_format = settings.TTS_STREAM_OUTPUT_FORMAT if stream_audio else None
+    write = get_stream_writer() if stream_audio else None
+    segments = []
+    async for segment in synthesize_in_order(
+        sentences(),
+        lambda sentence: text_to_speech_module.synthesize(sentence, output_format),
+        max_concurrency=settings.TTS_PIPELINE_CONCURRENCY,
+    ):
+        if write is not None:
+            write({"audio_chunk": segment})
+        else:
+            segments.append(segment)
+
+    response = " ".join(spoken_sentences)
+    return {"messages": AIMessage(content=response), "audio_buffer": b"".join(segments)}
 
 
 async def summarize_conversation_node(state: AICompanionState):
@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from functools import lru_cache
+from typing import Optional
+
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph.state import CompiledStateGraph
+
+from ai_companion.graph.graph import create_workflow_graph
+from ai_companion.settings import settings
+
+
+class GraphRuntime:
+    """Owns the app-lifetime checkpointer and the compiled workflow graph."""
+
+    def __init__(self, db_path: str = settings.SHORT_TERM_MEMORY_DB_PATH):
+        self.db_path = db_path
+        self.logger = logging.getLogger(__name__)
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._checkpointer: Optional[AsyncSqliteSaver] = None
+        self._graph: Optional[CompiledStateGraph] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def graph(self) -> CompiledStateGraph:
+        if self._graph is None:
+            raise RuntimeError("Graph runtime has not been started")
+        return self._graph
+
+    async def start(self) -> CompiledStateGraph:
+        async with self._lock:
+            if self._graph is not None:
+                return self._graph
+
+            exit_stack = AsyncExitStack()
+            try:
+                checkpointer = await exit_stack.enter_async_context(
+                    AsyncSqliteSaver.from_conn_string(self.db_path)
+                )
+                await checkpointer.setup()
+                graph = create_workflow_graph().compile(checkpointer=checkpointer)
+            except Exception:
+                await exit_stack.aclose()
+                raise
+
+            self._exit_stack = exit_stack
+            self._checkpointer = checkpointer
+            self._graph = graph
+            self.logger.info(f"Graph runtime started with checkpointer at {self.db_path}")
+            return graph
+
+    async def get_graph(self) -> CompiledStateGraph:
+        if self._graph is None:
+            return await self.start()
+        return self._graph
+
+    async def stop(self):
+        async with self._lock:
+            if self._exit_stack is None:
+                return
+
+            exit_stack = self._exit_stack
+            self._exit_stack = None
+            self._checkpointer = None
+            self._graph = None
+            await exit_stack.aclose()
+            self.logger.info("Graph runtime stopped")
+
+
+@lru_cache()
+def get_graph_runtime() -> GraphRuntime:
+    return GraphRuntime()
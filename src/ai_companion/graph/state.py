@@ -1,6 +1,6 @@
-from langgraph.graph import MessageState
+from langgraph.graph import MessagesState
 
-class AICompanionState(MessageState):
+class AICompanionState(MessagesState):
     summary: str
     workflow: str
     audio_buffer: bytes
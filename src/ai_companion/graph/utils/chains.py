@@ -1,6 +1,11 @@
+from functools import lru_cache
+
 from pydantic import BaseModel, Field
+from ai_companion.core.llm_registry import clears_with_http_clients
 from ai_companion.graph.utils.helpers import get_chat_model, AsteriskRemovalParser
 from ai_companion.core.prompts import ROUTER_PROMPT, CHARACTER_CARD_PROMPT
+from ai_companion.settings import settings
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 
 class RouterResponse(BaseModel):
@@ -8,8 +13,13 @@ class RouterResponse(BaseModel):
         ..., description="Type of response, e.g., 'text', 'image', 'audio' to give to the user"
     )
 
+@clears_with_http_clients
+@lru_cache()
 def get_router_chain():
-    model = get_chat_model(temperature=0.3).with_structured_output(RouterResponse)
+    # Only ambiguous media requests reach the LLM router, so the small model is enough
+    model = get_chat_model(temperature=0.3, model_name=settings.SMALL_TEXT_MODEL_NAME).with_structured_output(
+        RouterResponse
+    )
 
     prompt = ChatPromptTemplate.from_messages([
         ('system', ROUTER_PROMPT), MessagesPlaceholder(variable_name="messages")
@@ -17,18 +27,32 @@ def get_router_chain():
     return prompt | model
 
 
-def get_character_response_chain(summary: str = ""):
-    model = get_chat_model()
-    system_message = CHARACTER_CARD_PROMPT
+def format_summary_context(summary: str = "") -> str:
+    if not summary:
+        return ""
+    return f"\n\nSummary of conversation earlier between Ava and the user: {summary}"
+
 
-    if summary:
-        system_message += f"\n\nSummary of conversation earlier between Ava and the user: {summary}"
+def get_character_prompt():
+    # The summary is a prompt variable rather than baked into the template, so one chain serves every turn
+    system_message = CHARACTER_CARD_PROMPT + "{summary_context}"
 
-    prompt = ChatPromptTemplate.from_messages(
+    return ChatPromptTemplate.from_messages(
         [
             ("system", system_message),
             MessagesPlaceholder(variable_name="messages"),
         ]
     )
 
-    return prompt | model | AsteriskRemovalParser()
\ No newline at end of file
+
+@clears_with_http_clients
+@lru_cache()
+def get_character_response_chain():
+    return get_character_prompt() | get_chat_model() | AsteriskRemovalParser()
+
+
+@clears_with_http_clients
+@lru_cache()
+def get_character_token_chain():
+    """Character chain that streams raw text tokens; callers clean asterisks per sentence."""
+    return get_character_prompt() | get_chat_model() | StrOutputParser()
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""Compare the local router with the LLM router on a labelled sample.
+
+Reports how often the local router decides on its own, how often it agrees with the LLM router
+and with the labels, and the latency saved by skipping the LLM call.
+
+Usage: python -m ai_companion.graph.utils.evaluate_router [--sample sample.jsonl]
+
+The sample file holds one {"text": ..., "label": "conversation" | "image" | "audio"} per line;
+without it a small built-in sample is used.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+from statistics import mean
+
+from langchain_core.messages import HumanMessage
+
+from ai_companion.graph.utils.chains import get_router_chain
+from ai_companion.graph.utils.local_router import get_local_router
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SAMPLE = [
+    ("Hey, how was your day?", "conversation"),
+    ("I just got back from the gym, so tired", "conversation"),
+    ("What are you working on right now?", "conversation"),
+    ("My sister is visiting this weekend", "conversation"),
+    ("Do you like jazz?", "conversation"),
+    ("I took a great picture of the sunset yesterday", "conversation"),
+    ("My voice is gone after that concert", "conversation"),
+    ("I listened to a podcast about octopuses", "conversation"),
+    ("look at my cat\n[Image Analysis: A ginger cat sleeping on a sofa]", "conversation"),
+    ("\n[Image Analysis: A plate of pasta with basil on a wooden table]", "conversation"),
+    ("Send me a picture of your workspace", "image"),
+    ("Can I see a selfie?", "image"),
+    ("Show me what the view from your window looks like", "image"),
+    ("Draw me a dragon reading a book", "image"),
+    ("Send a photo of your lunch", "image"),
+    ("Send me a voice message", "audio"),
+    ("I want to hear your voice", "audio"),
+    ("Can you record a voice note saying good morning?", "audio"),
+    ("Say that again but in an audio", "audio"),
+    ("Speak to me, I miss your voice", "audio"),
+]
+
+
+def load_sample(path: str | None) -> list[tuple[str, str]]:
+    if path is None:
+        return DEFAULT_SAMPLE
+    with open(path) as f:
+        return [(row["text"], row["label"]) for row in map(json.loads, f) if row]
+
+
+async def evaluate(sample: list[tuple[str, str]]) -> dict:
+    local_router = get_local_router()
+    chain = get_router_chain()
+
+    rows = []
+    for text, label in sample:
+        started = time.perf_counter()
+        local_route = await local_router.route(text)
+        local_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        result = await chain.ainvoke({"messages": [HumanMessage(content=text)]})
+        llm_seconds = time.perf_counter() - started
+
+        rows.append((label, local_route, result.response_type, local_seconds, llm_seconds))
+        if local_route is not None and local_route != result.response_type:
+            logger.info(f"Disagreement on {text!r}: local={local_route} llm={result.response_type} label={label}")
+
+    decided = [row for row in rows if row[1] is not None]
+    # What the router node would return: the local route when confident, the LLM route otherwise
+    combined = [local or llm for _, local, llm, _, _ in rows]
+    return {
+        "messages": len(rows),
+        "local_coverage": len(decided) / len(rows),
+        "local_llm_agreement": mean(local == llm for _, local, llm, _, _ in decided) if decided else 0.0,
+        "local_accuracy": mean(local == label for label, local, _, _, _ in decided) if decided else 0.0,
+        "llm_accuracy": mean(llm == label for label, _, llm, _, _ in rows),
+        "combined_accuracy": mean(route == row[0] for route, row in zip(combined, rows)),
+        "mean_local_ms": 1000 * mean(row[3] for row in rows),
+        "mean_llm_ms": 1000 * mean(row[4] for row in rows),
+        "mean_saved_ms_per_message": 1000 * sum(llm - local for _, _, _, local, llm in decided) / len(rows),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the local router against the LLM router")
+    parser.add_argument("--sample", help="JSONL file of labelled messages")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    report = asyncio.run(evaluate(load_sample(args.sample)))
+    for metric, value in report.items():
+        logger.info(f"{metric}: {value:.3f}" if isinstance(value, float) else f"{metric}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,43 @@
 import re
+from functools import lru_cache
+from typing import Optional
 
 from langchain_core.output_parsers import StrOutputParser
-from langchain_groq import ChatGroq
+from langchain_core.runnables import RunnableConfig
 
+from ai_companion.core.llm_registry import clears_with_http_clients, get_groq_model
 from ai_companion.modules.image.image_to_text import ImageToText
 from ai_companion.modules.image.text_to_image import TextToImage
 from ai_companion.modules.speech import TextToSpeech
 from ai_companion.settings import settings
 
 
-def get_chat_model(temperature: float = 0.7):
-    return ChatGroq(
-        api_key=settings.GROQ_API_KEY,
-        model_name=settings.TEXT_MODEL_NAME,
-        temperature=temperature,
-    )
+def get_chat_model(temperature: float = 0.7, model_name: str = settings.TEXT_MODEL_NAME):
+    return get_groq_model(model_name, temperature)
 
 
+@lru_cache()
 def get_text_to_speech_module():
     return TextToSpeech()
 
 
+@clears_with_http_clients
+@lru_cache()
 def get_text_to_image_module():
     return TextToImage()
 
 
+@lru_cache()
 def get_image_to_text_module():
     return ImageToText()
 
 
+def get_user_id(config: RunnableConfig) -> Optional[str]:
+    """Long-term memories are partitioned by the conversation thread id."""
+    thread_id = config.get("configurable", {}).get("thread_id")
+    return str(thread_id) if thread_id is not None else None
+
+
 def remove_asterisk_content(text: str) -> str:
     """Remove content between asterisks from the text."""
     return re.sub(r"\*.*?\*", "", text).strip()
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from ai_companion.modules.memory.long_term.vector_store import VectorStore, get_vector_store
+from ai_companion.settings import settings
+
+MEDIA_PATTERN = re.compile(
+    r"\b(pic|pics|picture|pictures|photo|photos|image|images|selfie|selfies|draw|drawing|paint|show me|see you"
+    r"|look like|voice|voices|audio|hear|listen|speak|say it|say that|voice note|voice message|record)\b",
+    re.IGNORECASE,
+)
+
+# Interfaces append the vision model's description of inbound photos; it says nothing about the reply type
+IMAGE_ANALYSIS_PATTERN = re.compile(r"\s*\[Image Analysis:.*\Z", re.DOTALL)
+
+ROUTE_EXAMPLES = {
+    "image": [
+        "Send me a picture of what you're doing",
+        "Can I see a photo of your view right now?",
+        "Show me a selfie",
+        "Draw me a picture of a cat in space",
+        "What does your desk look like? Send a pic",
+    ],
+    "audio": [
+        "Send me a voice message",
+        "I want to hear your voice",
+        "Can you say that in an audio?",
+        "Record a voice note for me",
+        "Speak to me, please",
+    ],
+    "conversation": [
+        "I took a nice picture at the beach yesterday",
+        "My voice is sore from singing all night",
+        "I listened to a great podcast today",
+        "That photo exhibition sounds cool",
+        "I can't hear anything at this concert lol",
+    ],
+}
+
+
+class LocalRouter:
+    """Decides the response type locally when the answer is obvious.
+
+    Messages that never mention images or voice are plain conversation. Messages that do are
+    matched against example centroids with the memory embedding model; when the best route
+    does not win by ``ROUTER_CONFIDENCE_MARGIN`` the caller should fall back to the LLM router.
+    """
+
+    def __init__(self, vector_store: Optional[VectorStore] = None):
+        self.vector_store = vector_store or get_vector_store()
+        self.logger = logging.getLogger(__name__)
+        self.counters: Counter = Counter()
+        self._centroids: Optional[dict[str, np.ndarray]] = None
+        self._centroids_lock = asyncio.Lock()
+
+    async def _centroid(self, examples: list[str]) -> np.ndarray:
+        embeddings = np.asarray(await asyncio.gather(*(self.vector_store.aembed(e) for e in examples)))
+        centroid = embeddings.mean(axis=0)
+        return centroid / np.linalg.norm(centroid)
+
+    async def _get_centroids(self) -> dict[str, np.ndarray]:
+        if self._centroids is None:
+            async with self._centroids_lock:
+                if self._centroids is None:
+                    self._centroids = {
+                        route: await self._centroid(examples) for route, examples in ROUTE_EXAMPLES.items()
+                    }
+        return self._centroids
+
+    async def route(self, text: str) -> Optional[str]:
+        """Return the response type, or None when the message is ambiguous."""
+        text = IMAGE_ANALYSIS_PATTERN.sub("", text)
+        if not MEDIA_PATTERN.search(text):
+            self.counters["local_keyword"] += 1
+            return "conversation"
+
+        centroids = await self._get_centroids()
+        embedding = np.asarray(await self.vector_store.aembed(text))
+        embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        scores = sorted(((float(embedding @ c), route) for route, c in centroids.items()), reverse=True)
+        (best_score, best_route), (second_score, _) = scores[0], scores[1]
+
+        if best_score - second_score >= settings.ROUTER_CONFIDENCE_MARGIN:
+            self.counters["local_embedding"] += 1
+            return best_route
+
+        self.counters["llm_fallback"] += 1
+        self.logger.debug(f"Ambiguous route for {text!r}: {scores}")
+        return None
+
+    @property
+    def stats(self) -> dict:
+        return dict(self.counters)
+
+
+@lru_cache()
+def get_local_router() -> LocalRouter:
+    return LocalRouter()
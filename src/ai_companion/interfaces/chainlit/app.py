@@ -1,12 +1,21 @@
+import uuid
 from io import BytesIO
 
 import chainlit as cl
+from chainlit.config import config as chainlit_config
 from langchain_core.messages import AIMessageChunk, HumanMessage
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
-from ai_companion.graph import graph_builder
+from ai_companion.core.llm_registry import close_http_clients
+from ai_companion.graph.runtime import get_graph_runtime
 from ai_companion.modules.image import ImageToText
+from ai_companion.modules.memory.long_term.extraction_queue import (
+    enqueue_memory_extraction,
+    get_memory_extraction_queue,
+    shutdown_memory_extraction,
+)
+from ai_companion.modules.memory.long_term.vector_store import get_vector_store
 from ai_companion.modules.speech import SpeechToText, TextToSpeech
+from ai_companion.modules.speech.audio_segments import pcm16_to_wav
 from ai_companion.settings import settings
 
 # Global module instances
@@ -15,11 +24,45 @@ text_to_speech = TextToSpeech()
 image_to_text = ImageToText()
 
 
+async def play_audio_chunk(data: bytes, track: str):
+    await cl.context.emitter.send_audio_chunk(cl.OutputAudioChunk(mimeType="pcm16", data=data, track=track))
+
+
+async def stream_speech(text: str):
+    """Play the synthesized reply progressively as ElevenLabs streams PCM16 audio"""
+    track = str(uuid.uuid4())
+    remainder = b""
+    async for chunk in text_to_speech.synthesize_stream(text, output_format=settings.TTS_STREAM_OUTPUT_FORMAT):
+        # PCM16 samples are two bytes wide; keep an odd trailing byte for the next chunk
+        data = remainder + chunk
+        cut = len(data) - len(data) % 2
+        data, remainder = data[:cut], data[cut:]
+        if data:
+            await play_audio_chunk(data, track)
+
+
+@cl.on_app_startup
+async def on_app_startup():
+    """Open the shared checkpointer, compile the graph and connect to Qdrant once"""
+    await get_graph_runtime().start()
+    await get_vector_store().initialize()
+    await get_memory_extraction_queue().start()
+
+
+@cl.on_app_shutdown
+async def on_app_shutdown():
+    """Drain pending memory extraction, then close the shared checkpointer and Qdrant client"""
+    await shutdown_memory_extraction(timeout=settings.MEMORY_EXTRACTION_DRAIN_TIMEOUT)
+    await get_vector_store().close()
+    await get_graph_runtime().stop()
+    await close_http_clients()
+
+
 @cl.on_chat_start
 async def on_chat_start():
     """Initialize the chat session"""
-    # thread_id = cl.user_session.get("id")
-    cl.user_session.set("thread_id", 1)
+    # One id per Chainlit conversation partitions both the checkpointer and long-term memory
+    cl.user_session.set("thread_id", cl.context.session.thread_id)
 
 
 @cl.on_message
@@ -32,15 +75,11 @@ async def on_message(message: cl.Message):
     if message.elements:
         for elem in message.elements:
             if isinstance(elem, cl.Image):
-                # Read image file content
-                with open(elem.path, "rb") as f:
-                    image_bytes = f.read()
-
                 # Analyze image and add to message content
                 try:
-                    # Use global ImageToText instance
+                    # Use global ImageToText instance; it reads the file off the event loop
                     description = await image_to_text.analyze_image(
-                        image_bytes,
+                        elem.path,
                         "Please describe what you see in this image in the context of our conversation.",
                     )
                     content += f"\n[Image Analysis: {description}]"
@@ -49,80 +88,97 @@ async def on_message(message: cl.Message):
 
     # Process through graph with enriched message content
     thread_id = cl.user_session.get("thread_id")
+    human_message = HumanMessage(content=content)
+
+    track = str(uuid.uuid4())
+    image_data = None
 
     async with cl.Step(type="run"):
-        async with AsyncSqliteSaver.from_conn_string(settings.SHORT_TERM_MEMORY_DB_PATH) as short_term_memory:
-            graph = graph_builder.compile(checkpointer=short_term_memory)
-            async for chunk in graph.astream(
-                {"messages": [HumanMessage(content=content)]},
-                {"configurable": {"thread_id": thread_id}},
-                stream_mode="messages",
-            ):
-                if chunk[1]["langgraph_node"] == "conversation_node" and isinstance(chunk[0], AIMessageChunk):
-                    await msg.stream_token(chunk[0].content)
-
-            output_state = await graph.aget_state(config={"configurable": {"thread_id": thread_id}})
+        graph = await get_graph_runtime().get_graph()
+        async for mode, chunk in graph.astream(
+            {"messages": [human_message]},
+            {"configurable": {"thread_id": thread_id, "stream_audio": True}},
+            stream_mode=["messages", "custom"],
+        ):
+            if mode == "custom" and "audio_chunk" in chunk:
+                await play_audio_chunk(chunk["audio_chunk"], track)
+            elif mode == "custom" and "image" in chunk:
+                image_data = chunk["image"]
+            elif mode == "messages" and chunk[1]["langgraph_node"] == "conversation_node" and isinstance(chunk[0], AIMessageChunk):
+                await msg.stream_token(chunk[0].content)
+
+        output_state = await graph.aget_state(config={"configurable": {"thread_id": thread_id}})
 
     if output_state.values.get("workflow") == "audio":
         response = output_state.values["messages"][-1].content
-        audio_buffer = output_state.values["audio_buffer"]
-        output_audio_el = cl.Audio(
-            name="Audio",
-            auto_play=True,
-            mime="audio/mpeg3",
-            content=audio_buffer,
-        )
-        await cl.Message(content=response, elements=[output_audio_el]).send()
+        await cl.Message(content=response).send()
+        if not settings.TTS_PIPELINE_ENABLED:
+            await stream_speech(response)
     elif output_state.values.get("workflow") == "image":
         response = output_state.values["messages"][-1].content
-        image = cl.Image(path=output_state.values["image_path"], display="inline")
+        image = cl.Image(content=image_data, display="inline")
         await cl.Message(content=response, elements=[image]).send()
     else:
         await msg.send()
 
+    enqueue_memory_extraction(human_message, user_id=str(thread_id))
+
+
+@cl.on_audio_start
+async def on_audio_start():
+    """Accept the microphone connection"""
+    return True
+
 
 @cl.on_audio_chunk
-async def on_audio_chunk(chunk: cl.AudioChunk):
+async def on_audio_chunk(chunk: cl.InputAudioChunk):
     """Handle incoming audio chunks"""
     if chunk.isStart:
         buffer = BytesIO()
-        buffer.name = f"input_audio.{chunk.mimeType.split('/')[1]}"
         cl.user_session.set("audio_buffer", buffer)
         cl.user_session.set("audio_mime_type", chunk.mimeType)
     cl.user_session.get("audio_buffer").write(chunk.data)
 
 
 @cl.on_audio_end
-async def on_audio_end(elements):
+async def on_audio_end():
     """Process completed audio input"""
     # Get audio data
     audio_buffer = cl.user_session.get("audio_buffer")
     audio_buffer.seek(0)
     audio_data = audio_buffer.read()
+    # The UI records headerless PCM16; a WAV header makes it playable and lets long recordings be split
+    if cl.user_session.get("audio_mime_type") == "pcm16":
+        audio_data = pcm16_to_wav(audio_data, chainlit_config.features.audio.sample_rate)
 
     # Show user's audio message
-    input_audio_el = cl.Audio(mime="audio/mpeg3", content=audio_data)
-    await cl.Message(author="You", content="", elements=[input_audio_el, *elements]).send()
+    input_audio_el = cl.Audio(mime="audio/wav", content=audio_data)
+    await cl.Message(author="You", content="", elements=[input_audio_el]).send()
 
     # Use global SpeechToText instance
     transcription = await speech_to_text.transcribe(audio_data)
 
     thread_id = cl.user_session.get("thread_id")
 
-    async with AsyncSqliteSaver.from_conn_string(settings.SHORT_TERM_MEMORY_DB_PATH) as short_term_memory:
-        graph = graph_builder.compile(checkpointer=short_term_memory)
-        output_state = await graph.ainvoke(
-            {"messages": [HumanMessage(content=transcription)]},
-            {"configurable": {"thread_id": thread_id}},
-        )
-
-    # Use global TextToSpeech instance
-    audio_buffer = await text_to_speech.synthesize(output_state["messages"][-1].content)
-
-    output_audio_el = cl.Audio(
-        name="Audio",
-        auto_play=True,
-        mime="audio/mpeg3",
-        content=audio_buffer,
-    )
-    await cl.Message(content=output_state["messages"][-1].content, elements=[output_audio_el]).send()
\ No newline at end of file
+    human_message = HumanMessage(content=transcription)
+    graph = await get_graph_runtime().get_graph()
+    track = str(uuid.uuid4())
+    spoken = False
+    async for chunk in graph.astream(
+        {"messages": [human_message]},
+        {"configurable": {"thread_id": thread_id, "stream_audio": True}},
+        stream_mode="custom",
+    ):
+        if "audio_chunk" in chunk:
+            spoken = True
+            await play_audio_chunk(chunk["audio_chunk"], track)
+
+    output_state = await graph.aget_state(config={"configurable": {"thread_id": thread_id}})
+    response = output_state.values["messages"][-1].content
+    await cl.Message(content=response).send()
+
+    # Voice input always gets a spoken reply, even when the graph answered in text
+    if not spoken:
+        await stream_speech(response)
+
+    enqueue_memory_extraction(human_message, user_id=str(thread_id))
\ No newline at end of file
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from ai_companion.settings import settings
+
+
+class MessageDeduplicator:
+    """Remembers WhatsApp message ids so redelivered webhooks are processed only once.
+
+    Recently seen ids live in a bounded in-memory TTL set. Claims are confirmed against a SQLite
+    table (WAL mode), so they survive restarts and hold across uvicorn workers sharing the file.
+    """
+
+    PRUNE_EVERY = 500
+
+    def __init__(self, path: str, ttl_seconds: float, max_size: int):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self.logger = logging.getLogger(__name__)
+        self.accepted = 0
+        self.duplicates = 0
+        self._recent: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS processed_messages (id TEXT PRIMARY KEY, seen_at REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS processed_messages_seen_at ON processed_messages (seen_at)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _remember(self, message_id: str, now: float):
+        self._recent[message_id] = now + self.ttl_seconds
+        self._recent.move_to_end(message_id)
+        while len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+
+    def _claim_many(self, message_ids: list[str]) -> list[bool]:
+        now = time.time()
+        results = []
+        with self._lock:
+            db = self._connect()
+            for message_id in message_ids:
+                expires_at = self._recent.get(message_id)
+                if expires_at is not None and expires_at > now:
+                    self.duplicates += 1
+                    results.append(False)
+                    continue
+
+                # Inserts a new id or takes over an expired one; a live row from another worker wins
+                cursor = db.execute(
+                    "INSERT INTO processed_messages (id, seen_at) VALUES (?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET seen_at = excluded.seen_at WHERE processed_messages.seen_at < ?",
+                    (message_id, now, now - self.ttl_seconds),
+                )
+                claimed = cursor.rowcount == 1
+                if claimed:
+                    self.accepted += 1
+                    # Only our own claims are cached; another worker's claim may still be released
+                    self._remember(message_id, now)
+                    if self.accepted % self.PRUNE_EVERY == 0:
+                        db.execute("DELETE FROM processed_messages WHERE seen_at < ?", (now - self.ttl_seconds,))
+                else:
+                    self.duplicates += 1
+                results.append(claimed)
+            db.commit()
+        return results
+
+    def _release_many(self, message_ids: list[str]):
+        with self._lock:
+            for message_id in message_ids:
+                self._recent.pop(message_id, None)
+            db = self._connect()
+            db.executemany("DELETE FROM processed_messages WHERE id = ?", [(message_id,) for message_id in message_ids])
+            db.commit()
+
+    async def claim(self, message_id: str) -> bool:
+        """Return True the first time ``message_id`` is seen within the TTL, False for duplicates."""
+        return (await self.claim_many([message_id]))[0]
+
+    async def claim_many(self, message_ids: list[str]) -> list[bool]:
+        """Claim a whole webhook batch in one transaction."""
+        return await asyncio.to_thread(self._claim_many, message_ids)
+
+    async def release(self, message_id: str):
+        """Forget a claim whose message was not processed, so Meta's redelivery is accepted."""
+        await self.release_many([message_id])
+
+    async def release_many(self, message_ids: list[str]):
+        await asyncio.to_thread(self._release_many, message_ids)
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    @property
+    def stats(self) -> dict:
+        return {
+            "accepted": self.accepted,
+            "duplicates_suppressed": self.duplicates,
+            "recent": len(self._recent),
+        }
+
+
+@lru_cache()
+def get_message_deduplicator() -> MessageDeduplicator:
+    return MessageDeduplicator(
+        path=settings.WHATSAPP_DEDUP_DB_PATH,
+        ttl_seconds=settings.WHATSAPP_DEDUP_TTL,
+        max_size=settings.WHATSAPP_DEDUP_MEMORY_SIZE,
+    )
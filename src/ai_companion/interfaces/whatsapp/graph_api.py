@@ -0,0 +1,76 @@
+import asyncio
+import importlib.util
+import logging
+from functools import lru_cache
+
+import httpx
+
+from ai_companion.settings import settings
+
+logger = logging.getLogger(__name__)
+
+GRAPH_API_URL = "https://graph.facebook.com/v21.0"
+
+# One keep-alive pool to graph.facebook.com (and its media CDN) for the app lifetime
+HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=120)
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0, pool=10.0)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# A 5xx on a send may arrive after Meta accepted it, so non-idempotent calls only retry throttling
+RETRY_STATUS_CODES_NON_IDEMPOTENT = {429}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Errors raised before the request reached the server, so retrying never sends anything twice
+RETRY_EXCEPTIONS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+@lru_cache()
+def get_graph_api_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        base_url=GRAPH_API_URL,
+        headers={"Authorization": f"Bearer {settings.WHATSAPP_TOKEN}"},
+        limits=HTTP_LIMITS,
+        timeout=HTTP_TIMEOUT,
+        # HTTP/2 needs the optional h2 package; fall back to pooled HTTP/1.1 without it
+        http2=importlib.util.find_spec("h2") is not None,
+    )
+
+
+def _retry_delay(response: httpx.Response | None, attempt: int) -> float:
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), 30.0)
+    return settings.WHATSAPP_HTTP_RETRY_BACKOFF * 2 ** attempt
+
+
+async def graph_api_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request through the shared client, retrying failed connects and retryable responses.
+
+    GET requests retry 429 and 5xx responses; POSTs such as message sends and media uploads only
+    retry 429, so a send Meta already accepted is never repeated.
+    """
+    client = get_graph_api_client()
+    max_retries = settings.WHATSAPP_HTTP_MAX_RETRIES
+    retry_status_codes = (
+        RETRY_STATUS_CODES if method.upper() in IDEMPOTENT_METHODS else RETRY_STATUS_CODES_NON_IDEMPOTENT
+    )
+    for attempt in range(max_retries + 1):
+        try:
+            response = await client.request(method, url, **kwargs)
+        except RETRY_EXCEPTIONS as e:
+            if attempt == max_retries:
+                raise
+            logger.warning(f"Graph API {method} {url} failed to connect, retrying: {e}")
+            await asyncio.sleep(_retry_delay(None, attempt))
+            continue
+
+        if response.status_code not in retry_status_codes or attempt == max_retries:
+            return response
+        logger.warning(f"Graph API {method} {url} returned {response.status_code}, retrying")
+        await asyncio.sleep(_retry_delay(response, attempt))
+
+
+async def close_graph_api_client():
+    if get_graph_api_client.cache_info().currsize:
+        await get_graph_api_client().aclose()
+        get_graph_api_client.cache_clear()
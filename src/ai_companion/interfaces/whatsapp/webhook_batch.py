@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from collections import Counter
+from functools import partial
+from typing import Awaitable, Callable, Dict, Protocol
+
+from ai_companion.core.work_queue import KeyedWorkQueue
+
+logger = logging.getLogger(__name__)
+
+
+class Deduplicator(Protocol):
+    async def claim_many(self, message_ids: list[str]) -> list[bool]: ...
+
+    async def release_many(self, message_ids: list[str]): ...
+
+
+def parse_webhook(data: Dict) -> tuple[list[Dict], list[Dict]]:
+    """Collect the messages and statuses of every entry and change in a webhook delivery.
+
+    Raises ``ValueError`` when the envelope itself is malformed. Messages without an id or a
+    sender cannot be deduplicated or answered, so they are logged and dropped.
+    """
+    try:
+        change_values = [change["value"] for entry in data["entry"] for change in entry["changes"]]
+        messages = [message for value in change_values for message in value.get("messages", [])]
+        statuses = [status for value in change_values for status in value.get("statuses", [])]
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ValueError(f"Malformed webhook payload: {e}") from e
+
+    valid_messages = [m for m in messages if isinstance(m, dict) and m.get("id") and m.get("from")]
+    if len(valid_messages) < len(messages):
+        logger.warning(f"Dropping {len(messages) - len(valid_messages)} messages without an id or sender")
+    return valid_messages, statuses
+
+
+def handle_statuses(statuses: list[Dict]):
+    """Record delivery status updates for a whole webhook batch at once."""
+    if not statuses:
+        return
+    counts = Counter(status.get("status", "unknown") if isinstance(status, dict) else "unknown" for status in statuses)
+    logger.debug(f"Received {len(statuses)} status updates: {dict(counts)}")
+
+
+async def queue_messages(
+    messages: list[Dict],
+    queue: KeyedWorkQueue,
+    deduplicator: Deduplicator,
+    process: Callable[[Dict], Awaitable[None]],
+) -> int:
+    """Queue new messages in delivery order, keyed by sender, and return how many were queued.
+
+    Raises ``asyncio.QueueFull`` when the queue fills up; the claims of messages not queued yet
+    are released first so Meta's redelivery is accepted for them.
+    """
+    claims = await deduplicator.claim_many([message["id"] for message in messages])
+    new_messages = [message for message, claimed in zip(messages, claims) if claimed]
+    if len(new_messages) < len(messages):
+        logger.info(f"Ignoring {len(messages) - len(new_messages)} redelivered messages")
+
+    for i, message in enumerate(new_messages):
+        try:
+            queue.submit_nowait(message["from"], partial(process, message))
+        except asyncio.QueueFull:
+            await deduplicator.release_many([m["id"] for m in new_messages[i:]])
+            raise
+    return len(new_messages)
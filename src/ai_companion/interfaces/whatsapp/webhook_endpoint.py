@@ -1,6 +1,43 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from ai_companion.interfaces.whatsapp.whatsapp_response import whatsapp_router
+from ai_companion.core.llm_registry import close_http_clients
+from ai_companion.graph.runtime import get_graph_runtime
+from ai_companion.interfaces.whatsapp.deduplication import get_message_deduplicator
+from ai_companion.interfaces.whatsapp.graph_api import close_graph_api_client
+from ai_companion.interfaces.whatsapp.whatsapp_response import get_message_queue, whatsapp_router
+from ai_companion.modules.memory.long_term.extraction_queue import (
+    get_memory_extraction_queue,
+    shutdown_memory_extraction,
+)
+from ai_companion.modules.memory.long_term.vector_store import get_vector_store
+from ai_companion.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared checkpointer, compile the graph and connect to Qdrant once for the app lifetime."""
+    graph_runtime = get_graph_runtime()
+    vector_store = get_vector_store()
+    extraction_queue = get_memory_extraction_queue()
+    message_queue = get_message_queue()
+    await graph_runtime.start()
+    await vector_store.initialize()
+    await extraction_queue.start()
+    await message_queue.start()
+    try:
+        yield
+    finally:
+        # Finish queued replies first; they enqueue memory extraction as they complete
+        await message_queue.stop(timeout=settings.WHATSAPP_DRAIN_TIMEOUT)
+        await shutdown_memory_extraction(timeout=settings.MEMORY_EXTRACTION_DRAIN_TIMEOUT)
+        await vector_store.close()
+        await graph_runtime.stop()
+        await close_http_clients()
+        await close_graph_api_client()
+        get_message_deduplicator().close()
+
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 app.include_router(whatsapp_router)
\ No newline at end of file
@@ -1,15 +1,19 @@
+import asyncio
 import logging
 import os
-from io import BytesIO
+from functools import lru_cache
 from typing import Dict
 
-import httpx
 from fastapi import APIRouter, Request, Response
 from langchain_core.messages import HumanMessage
-from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
-from ai_companion.graph import graph_builder
+from ai_companion.core.work_queue import KeyedWorkQueue
+from ai_companion.graph.runtime import get_graph_runtime
+from ai_companion.interfaces.whatsapp.deduplication import get_message_deduplicator
+from ai_companion.interfaces.whatsapp.graph_api import graph_api_request
+from ai_companion.interfaces.whatsapp.webhook_batch import handle_statuses, parse_webhook, queue_messages
 from ai_companion.modules.image import ImageToText
+from ai_companion.modules.memory.long_term.extraction_queue import enqueue_memory_extraction
 from ai_companion.modules.speech import SpeechToText, TextToSpeech
 from ai_companion.settings import settings
 
@@ -24,13 +28,27 @@ image_to_text = ImageToText()
 whatsapp_router = APIRouter()
 
 # WhatsApp API credentials
-WHATSAPP_TOKEN = os.getenv("WHATSAPP_TOKEN")
 WHATSAPP_PHONE_NUMBER_ID = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
 
 
+@lru_cache()
+def get_message_queue() -> KeyedWorkQueue:
+    # Replies are not idempotent, so failed turns are logged rather than retried
+    return KeyedWorkQueue(
+        name="whatsapp-messages",
+        num_workers=settings.WHATSAPP_WORKERS,
+        max_size=settings.WHATSAPP_QUEUE_SIZE,
+        max_retries=0,
+    )
+
+
 @whatsapp_router.api_route("/whatsapp_response", methods=["GET", "POST"])
 async def whatsapp_handler(request: Request) -> Response:
-    """Handles incoming messages and status updates from the WhatsApp Cloud API."""
+    """Handles incoming messages and status updates from the WhatsApp Cloud API.
+
+    Messages are only queued here so Meta gets its 200 straight away; the replies are produced
+    by the message queue workers, in order for each sender.
+    """
 
     if request.method == "GET":
         params = request.query_params
@@ -40,112 +58,103 @@ async def whatsapp_handler(request: Request) -> Response:
 
     try:
         data = await request.json()
-        change_value = data["entry"][0]["changes"][0]["value"]
-        if "messages" in change_value:
-            message = change_value["messages"][0]
-            from_number = message["from"]
-            session_id = from_number
-
-            # Get user message and handle different message types
-            content = ""
-            if message["type"] == "audio":
-                content = await process_audio_message(message)
-            elif message["type"] == "image":
-                # Get image caption if any
-                content = message.get("image", {}).get("caption", "")
-                # Download and analyze image
-                image_bytes = await download_media(message["image"]["id"])
-                try:
-                    description = await image_to_text.analyze_image(
-                        image_bytes,
-                        "Please describe what you see in this image in the context of our conversation.",
-                    )
-                    content += f"\n[Image Analysis: {description}]"
-                except Exception as e:
-                    logger.warning(f"Failed to analyze image: {e}")
-            else:
-                content = message["text"]["body"]
-
-            # Process message through the graph agent
-            async with AsyncSqliteSaver.from_conn_string(settings.SHORT_TERM_MEMORY_DB_PATH) as short_term_memory:
-                graph = graph_builder.compile(checkpointer=short_term_memory)
-                await graph.ainvoke(
-                    {"messages": [HumanMessage(content=content)]},
-                    {"configurable": {"thread_id": session_id}},
-                )
-
-                # Get the workflow type and response from the state
-                output_state = await graph.aget_state(config={"configurable": {"thread_id": session_id}})
-
-            workflow = output_state.values.get("workflow", "conversation")
-            response_message = output_state.values["messages"][-1].content
-
-            # Handle different response types based on workflow
-            if workflow == "audio":
-                audio_buffer = output_state.values["audio_buffer"]
-                success = await send_response(from_number, response_message, "audio", audio_buffer)
-            elif workflow == "image":
-                image_path = output_state.values["image_path"]
-                with open(image_path, "rb") as f:
-                    image_data = f.read()
-                success = await send_response(from_number, response_message, "image", image_data)
-            else:
-                success = await send_response(from_number, response_message, "text")
-
-            if not success:
-                return Response(content="Failed to send message", status_code=500)
-
-            return Response(content="Message processed", status_code=200)
-
-        elif "statuses" in change_value:
-            return Response(content="Status update received", status_code=200)
-
-        else:
-            return Response(content="Unknown event type", status_code=400)
-
-    except Exception as e:
-        logger.error(f"Error processing message: {e}", exc_info=True)
-        return Response(content="Internal server error", status_code=500)
+        # WhatsApp may batch several entries, changes and messages into one delivery
+        messages, statuses = parse_webhook(data)
+    except ValueError:
+        return Response(content="Malformed webhook payload", status_code=400)
+
+    if not messages and not statuses:
+        # Dropped messages or another event type; a non-2xx would only make Meta redeliver it
+        return Response(content="No actionable events", status_code=200)
+
+    handle_statuses(statuses)
+
+    if not messages:
+        return Response(content="Status update received", status_code=200)
+
+    try:
+        queued = await queue_messages(messages, get_message_queue(), get_message_deduplicator(), process_message)
+    except asyncio.QueueFull:
+        # Meta retries on non-2xx; messages queued already are deduplicated on redelivery
+        logger.warning("WhatsApp message queue is full, asking Meta to retry later")
+        return Response(content="Busy", status_code=503)
+
+    return Response(content=f"Queued {queued} messages", status_code=200)
+
+
+async def process_message(message: Dict):
+    """Run one incoming message through the graph and send the reply."""
+    from_number = message["from"]
+    session_id = from_number
+
+    # Get user message and handle different message types
+    content = ""
+    if message["type"] == "audio":
+        content = await process_audio_message(message)
+    elif message["type"] == "image":
+        # Get image caption if any
+        content = message.get("image", {}).get("caption", "")
+        # Download and analyze image
+        image_bytes = await download_media(message["image"]["id"])
+        try:
+            description = await image_to_text.analyze_image(
+                image_bytes,
+                "Please describe what you see in this image in the context of our conversation.",
+            )
+            content += f"\n[Image Analysis: {description}]"
+        except Exception as e:
+            logger.warning(f"Failed to analyze image: {e}")
+    else:
+        content = message["text"]["body"]
+
+    # Process message through the graph agent
+    human_message = HumanMessage(content=content)
+    graph = await get_graph_runtime().get_graph()
+    image_data = None
+    async for chunk in graph.astream(
+        {"messages": [human_message]},
+        {"configurable": {"thread_id": session_id}},
+        stream_mode="custom",
+    ):
+        if "image" in chunk:
+            image_data = chunk["image"]
+
+    # Get the workflow type and response from the state
+    output_state = await graph.aget_state(config={"configurable": {"thread_id": session_id}})
+
+    workflow = output_state.values.get("workflow", "conversation")
+    response_message = output_state.values["messages"][-1].content
+
+    # Handle different response types based on workflow
+    if workflow == "audio":
+        audio_buffer = output_state.values["audio_buffer"]
+        success = await send_response(from_number, response_message, "audio", audio_buffer)
+    elif workflow == "image":
+        success = await send_response(from_number, response_message, "image", image_data)
+    else:
+        success = await send_response(from_number, response_message, "text")
+
+    # The reply never depends on extraction, so it runs after the reply is sent
+    enqueue_memory_extraction(human_message, user_id=session_id)
+
+    if not success:
+        logger.error(f"Failed to send reply to {from_number}")
 
 
 async def download_media(media_id: str) -> bytes:
     """Download media from WhatsApp."""
-    media_metadata_url = f"https://graph.facebook.com/v21.0/{media_id}"
-    headers = {"Authorization": f"Bearer {WHATSAPP_TOKEN}"}
-
-    async with httpx.AsyncClient() as client:
-        metadata_response = await client.get(media_metadata_url, headers=headers)
-        metadata_response.raise_for_status()
-        metadata = metadata_response.json()
-        download_url = metadata.get("url")
+    metadata_response = await graph_api_request("GET", f"/{media_id}")
+    metadata_response.raise_for_status()
+    download_url = metadata_response.json().get("url")
 
-        media_response = await client.get(download_url, headers=headers)
-        media_response.raise_for_status()
-        return media_response.content
+    media_response = await graph_api_request("GET", download_url)
+    media_response.raise_for_status()
+    return media_response.content
 
 
 async def process_audio_message(message: Dict) -> str:
     """Download and transcribe audio message."""
-    audio_id = message["audio"]["id"]
-    media_metadata_url = f"https://graph.facebook.com/v21.0/{audio_id}"
-    headers = {"Authorization": f"Bearer {WHATSAPP_TOKEN}"}
-
-    async with httpx.AsyncClient() as client:
-        metadata_response = await client.get(media_metadata_url, headers=headers)
-        metadata_response.raise_for_status()
-        metadata = metadata_response.json()
-        download_url = metadata.get("url")
-
-    # Download the audio file
-    async with httpx.AsyncClient() as client:
-        audio_response = await client.get(download_url, headers=headers)
-        audio_response.raise_for_status()
-
-    # Prepare for transcription
-    audio_buffer = BytesIO(audio_response.content)
-    audio_buffer.seek(0)
-    audio_data = audio_buffer.read()
-
+    audio_data = await download_media(message["audio"]["id"])
     return await speech_to_text.transcribe(audio_data)
 
 
@@ -156,16 +165,10 @@ async def send_response(
     media_content: bytes = None,
 ) -> bool:
     """Send response to user via WhatsApp API."""
-    headers = {
-        "Authorization": f"Bearer {WHATSAPP_TOKEN}",
-        "Content-Type": "application/json",
-    }
-
     if message_type in ["audio", "image"]:
         try:
             mime_type = "audio/mpeg" if message_type == "audio" else "image/png"
-            media_buffer = BytesIO(media_content)
-            media_id = await upload_media(media_buffer, mime_type)
+            media_id = await upload_media(media_content, mime_type)
             json_data = {
                 "messaging_product": "whatsapp",
                 "to": from_number,
@@ -188,34 +191,21 @@ async def send_response(
             "text": {"body": response_text},
         }
 
-    print(headers)
-    print(json_data)
-
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"https://graph.facebook.com/v21.0/{WHATSAPP_PHONE_NUMBER_ID}/messages",
-            headers=headers,
-            json=json_data,
-        )
+    response = await graph_api_request("POST", f"/{WHATSAPP_PHONE_NUMBER_ID}/messages", json=json_data)
 
     return response.status_code == 200
 
 
-async def upload_media(media_content: BytesIO, mime_type: str) -> str:
+async def upload_media(media_content: bytes, mime_type: str) -> str:
     """Upload media to WhatsApp servers."""
-    headers = {"Authorization": f"Bearer {WHATSAPP_TOKEN}"}
-    files = {"file": ("response.mp3", media_content, mime_type)}
+    # Raw bytes rather than a file object, so a retried upload sends the whole body again
+    filename = "response.mp3" if mime_type.startswith("audio") else "response.png"
+    files = {"file": (filename, media_content, mime_type)}
     data = {"messaging_product": "whatsapp", "type": mime_type}
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"https://graph.facebook.com/v21.0/{WHATSAPP_PHONE_NUMBER_ID}/media",
-            headers=headers,
-            files=files,
-            data=data,
-        )
-        result = response.json()
+    response = await graph_api_request("POST", f"/{WHATSAPP_PHONE_NUMBER_ID}/media", files=files, data=data)
+    result = response.json()
 
     if "id" not in result:
         raise Exception("Failed to upload media")
-    return result["id"]
\ No newline at end of file
+    return result["id"]
@@ -0,0 +1,110 @@
+import asyncio
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from functools import lru_cache
+
+from ai_companion.settings import settings
+
+
+class ImageArtifactStore:
+    """Content-addressed store for generated images on local disk.
+
+    Files are named by the SHA-256 of their bytes, so keys are unique and storing the same image
+    twice is a no-op. Files older than ``ttl_seconds`` are removed, and when the directory exceeds
+    ``max_bytes`` the oldest files go first.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: int, extension: str = "png"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.extension = extension
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.{self.extension}")
+
+    def _put(self, data: bytes) -> str:
+        file_path = self._file_path(self.key(data))
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            if os.path.exists(file_path):
+                # Refresh the timestamp so TTL and eviction treat it as recent
+                os.utime(file_path)
+            else:
+                # Write to a temp file and rename so readers never see a partial image
+                fd, tmp_path = tempfile.mkstemp(dir=self.path)
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, file_path)
+            self._evict()
+        return file_path
+
+    @staticmethod
+    def _remove(file_path: str):
+        # Another worker sharing the directory may have removed it already
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        now = time.time()
+        entries = []
+        expired = 0
+        for entry in os.scandir(self.path):
+            if not entry.name.endswith(f".{self.extension}"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl_seconds:
+                self._remove(entry.path)
+                expired += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, file_path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(file_path)
+            total -= size
+            evicted += 1
+
+        if expired or evicted:
+            self.logger.info(f"Removed {expired} expired and {evicted} evicted images")
+
+    def _get(self, key: str) -> bytes | None:
+        try:
+            with open(self._file_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    async def put(self, data: bytes) -> str:
+        """Store ``data`` and return its file path."""
+        return await asyncio.to_thread(self._put, data)
+
+    async def get(self, key: str) -> bytes | None:
+        return await asyncio.to_thread(self._get, key)
+
+
+@lru_cache()
+def get_image_artifact_store() -> ImageArtifactStore:
+    return ImageArtifactStore(
+        path=settings.IMAGE_STORE_DIR,
+        max_bytes=settings.IMAGE_STORE_MAX_BYTES,
+        ttl_seconds=settings.IMAGE_STORE_TTL,
+    )
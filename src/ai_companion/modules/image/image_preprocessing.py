@@ -0,0 +1,103 @@
+import asyncio
+import hashlib
+import io
+import math
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+from ai_companion.settings import settings
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    mime_type: str
+    original_bytes: int
+
+
+def image_digest(image_bytes: bytes) -> str:
+    return hashlib.sha256(image_bytes).hexdigest()
+
+
+def prepare_image(image_bytes: bytes, max_pixels: int, quality: int) -> PreparedImage:
+    """Downscale to at most ``max_pixels`` and recompress as JPEG for upload."""
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        image = ImageOps.exif_transpose(image)
+
+        width, height = image.size
+        if width * height > max_pixels:
+            scale = math.sqrt(max_pixels / (width * height))
+            image = image.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.Resampling.LANCZOS)
+
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True)
+
+    return PreparedImage(data=buffer.getvalue(), mime_type="image/jpeg", original_bytes=len(image_bytes))
+
+
+class ImageDescriptionCache:
+    """Bounded LRU cache of image descriptions keyed by the SHA-256 of the original image and the prompt.
+
+    Only byte-identical images share a description. Perceptual hashes also match memes that share
+    a template and screenshots with the same layout, so they would return another image's
+    description; forwarded WhatsApp media keeps its bytes and still hits.
+    """
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, digest: str, prompt: str) -> Optional[str]:
+        with self._lock:
+            description = self._entries.get((digest, prompt))
+            if description is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((digest, prompt))
+            self.hits += 1
+            return description
+
+    def put(self, digest: str, prompt: str, description: str):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[(digest, prompt)] = description
+            self._entries.move_to_end((digest, prompt))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    @property
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+
+@lru_cache()
+def get_image_executor() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=settings.IMAGE_PREPROCESS_WORKERS, thread_name_prefix="image-preprocess")
+
+
+async def aprepare_image(image_bytes: bytes) -> PreparedImage:
+    """Run ``prepare_image`` on the shared worker pool so decoding never blocks the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_image_executor(),
+        prepare_image,
+        image_bytes,
+        settings.IMAGE_PREPROCESS_MAX_PIXELS,
+        settings.IMAGE_PREPROCESS_JPEG_QUALITY,
+    )
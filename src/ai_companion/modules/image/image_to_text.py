@@ -1,18 +1,23 @@
 import os
+import asyncio
 import base64
-from groq import Groq
+import time
+from groq import AsyncGroq
 import logging
+from pathlib import Path
 from typing import Optional, Union
 
 from ai_companion.core.exceptions import ImageToTextError
-from settings import settings
+from ai_companion.modules.image.image_preprocessing import ImageDescriptionCache, aprepare_image, image_digest
+from ai_companion.settings import settings
 
 class ImageToText:
     REQUIRED_ENV_VARS = ["GROQ_API_KEY"]
 
     def __init__(self):
         self._validate_env_vars()
-        self._client: Optional[Groq] = None
+        self._client: Optional[AsyncGroq] = None
+        self.description_cache = ImageDescriptionCache(max_size=settings.IMAGE_DESCRIPTION_CACHE_SIZE)
         self.logger = logging.getLogger(__name__)
 
     def _validate_env_vars(self):
@@ -21,39 +26,46 @@ class ImageToText:
             raise ValueError(f"Missing env variables: {', '.join(missing_vars)}")
         
     @property
-    def client(self):
+    def client(self) -> AsyncGroq:
         if self._client is None:
-            self._client = Groq(api_key=settings.GROQ_API_KEY)
+            self._client = AsyncGroq(api_key=settings.GROQ_API_KEY)
         return self._client
-        
-    def analyze_image(self, image_data: Union[str, bytes], prompt:str = "") -> str:
+
+    async def analyze_image(self, image_data: Union[str, bytes], prompt:str = "") -> str:
         try:
             if isinstance(image_data, str):
                 if not os.path.exists(image_data):
                     raise ValueError(f"Image file path does not exist at {image_data}")
                 else:
-                    with open(image_data, "rb") as img_file:
-                        image_bytes = img_file.read()
+                    image_bytes = await asyncio.to_thread(Path(image_data).read_bytes)
 
             elif isinstance(image_data, bytes):
                 image_bytes = image_data
 
             if not image_bytes:
                 raise ValueError("Image data cannot be empty")
-            
-            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
 
             if not prompt:
                 prompt = "Describe the content of the image in detail."
 
+            started = time.perf_counter()
+            digest = await asyncio.to_thread(image_digest, image_bytes)
+            description = self.description_cache.get(digest, prompt)
+            if description is not None:
+                self.logger.info(f"Reusing cached description for image {digest[:12]}")
+                return description
+
+            image = await aprepare_image(image_bytes)
+            image_base64 = base64.b64encode(image.data).decode('utf-8')
+
             messages = [
                 {"role":"user", "content": [
                     {"type":"text", "text": prompt},
-                    {"type":"image_base64", "image_base64": image_base64}
+                    {"type":"image_url", "image_url": {"url": f"data:{image.mime_type};base64,{image_base64}"}}
                 ]}
             ]
 
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=settings.ITT_MODEL_NAME,
                 messages=messages,
                 max_tokens=1000,
@@ -63,9 +75,14 @@ class ImageToText:
                 raise ImageToTextError("No content returned from image analysis")
             
             description = response.choices[0].message.content
-            self.logger.info(f"Generated image description: {description}")
+            self.description_cache.put(digest, prompt, description)
+            self.logger.info(
+                f"Analyzed image {digest[:12]}: sent {len(image.data)} of {image.original_bytes} bytes "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+            self.logger.debug(f"Generated image description: {description}")
 
             return description
         
         except Exception as e:
-            raise ImageToTextError(f"Image to text conversion failed: {str(e)}") from e
\ No newline at end of file
+            raise ImageToTextError(f"Image to text conversion failed: {str(e)}") from e
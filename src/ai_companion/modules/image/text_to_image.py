@@ -1,16 +1,15 @@
 import os
 import base64
-from groq import Groq
 import logging
 from typing import Optional, Union
 
 from ai_companion.core.exceptions import TextToImageError
 from ai_companion.core.prompts import IMAGE_ENHANCEMENT_PROMPT, IMAGE_SCENARIO_PROMPT
-from langchain.prompts import PromptTemplate
-from langchain_groq import ChatGroq
+from ai_companion.core.llm_registry import get_structured_groq_model
+from langchain_core.prompts import PromptTemplate
 from pydantic import BaseModel, Field
-from settings import settings
-from together import Together
+from ai_companion.settings import settings
+from together import AsyncTogether
 
 class ScenarioPrompt(BaseModel):
     narrative: str = Field(..., description="The AI's narrative response to the question")
@@ -25,7 +24,9 @@ class TextToImage:
 
     def __init__(self):
         self._validate_env_vars()
-        self._together_client: Optional[Together] = None
+        self._together_client: Optional[AsyncTogether] = None
+        self._scenario_chain = None
+        self._enhancement_chain = None
         self.logger = logging.getLogger(__name__)
 
     def _validate_env_vars(self):
@@ -34,18 +35,42 @@ class TextToImage:
             raise ValueError(f"Missing env variables: {', '.join(missing_vars)}")
         
     @property
-    def client(self):
+    def together_client(self) -> AsyncTogether:
         if self._together_client is None:
-            self._together_client = Groq(api_key=settings.GROQ_API_KEY)
+            self._together_client = AsyncTogether(api_key=settings.TOGETHER_API_KEY)
         return self._together_client
+
+    @property
+    def scenario_chain(self):
+        if self._scenario_chain is None:
+            self._scenario_chain = (
+                    PromptTemplate(
+                        input_variables=["chat_history"],
+                        template=IMAGE_SCENARIO_PROMPT
+                    )
+                | get_structured_groq_model(settings.TEXT_MODEL_NAME, 0.4, ScenarioPrompt)
+            )
+        return self._scenario_chain
+
+    @property
+    def enhancement_chain(self):
+        if self._enhancement_chain is None:
+            self._enhancement_chain = (
+                    PromptTemplate(
+                        input_variables=["prompt"],
+                        template=IMAGE_ENHANCEMENT_PROMPT
+                    )
+                | get_structured_groq_model(settings.TEXT_MODEL_NAME, 0.4, EnhancedPrompt)
+            )
+        return self._enhancement_chain
     
-    async def generate_image(self, prompt:str, output_path:str)->bytes:
+    async def generate_image(self, prompt:str)->bytes:
         if not prompt.strip():
             raise ValueError("Input prompt cannot be empty")
         
         try:
             self.logger.info(f"Generating image for prompt: {prompt}")
-            response = self.together_client.images.generate(
+            response = await self.together_client.images.generate(
                 model=settings.TTI_MODEL_NAME,
                 prompt=prompt,
                 width=1024,
@@ -55,14 +80,7 @@ class TextToImage:
                 response_format="b64_json",
             )
 
-            image_data = base64.b64decode(response['data'][0].b64_json)
-
-            if output_path:
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                with open(output_path, "wb") as img_file:
-                    img_file.write(image_data)
-                self.logger.info(f"Image saved to {output_path}")
-            return image_data
+            return base64.b64decode(response.data[0].b64_json)
         except Exception as e:
             raise TextToImageError(f"Text-to-image generation failed: {str(e)}") from e
         
@@ -71,24 +89,7 @@ class TextToImage:
             formatted_history = "\n".join([f"{msg.type.title()}:{msg.content}" for msg in chat_history])
             self.logger.info(f"Creating scenario with chat history")
 
-            llm = ChatGroq(
-                api_key=settings.GROQ_API_KEY,
-                model=settings.TEXT_MODEL_NAME,
-                temperature=0.4,
-                max_retries=2
-                )
-            
-            structured_llm = llm.with_structured_output(ScenarioPrompt)
-
-            chain = (
-                    PromptTemplate(
-                        input_variables=["chat_history"],
-                        template=IMAGE_SCENARIO_PROMPT
-                    )
-                | structured_llm
-            )
-
-            scenario = chain.invoke({"chat_history": formatted_history})
+            scenario = await self.scenario_chain.ainvoke({"chat_history": formatted_history})
             self.logger.info(f"Created scenario: {scenario}")
 
             return scenario
@@ -100,24 +101,7 @@ class TextToImage:
         try:
             self.logger.info(f"Enhancing prompt: {base_prompt}")
 
-            llm = ChatGroq(
-                api_key=settings.GROQ_API_KEY,
-                model=settings.TEXT_MODEL_NAME,
-                temperature=0.4,
-                max_retries=2
-                )
-            
-            structured_llm = llm.with_structured_output(EnhancedPrompt)
-
-            chain = (
-                    PromptTemplate(
-                        input_variables=["base_prompt"],
-                        template=IMAGE_ENHANCEMENT_PROMPT
-                    )
-                | structured_llm
-            )
-
-            enhanced_prompt = chain.invoke({"base_prompt": base_prompt})
+            enhanced_prompt = await self.enhancement_chain.ainvoke({"prompt": base_prompt})
             self.logger.info(f"Enhanced prompt: {enhanced_prompt}")
 
             return enhanced_prompt
@@ -0,0 +1,35 @@
+"""Backfill the user id on long-term memories stored before per-user partitioning.
+
+Usage: python -m ai_companion.modules.memory.long_term.backfill_user_ids <user_id>
+"""
+
+import argparse
+import asyncio
+import logging
+
+from ai_companion.modules.memory.long_term.vector_store import get_vector_store
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill_user_ids(user_id: str) -> int:
+    vector_store = get_vector_store()
+    try:
+        await vector_store.initialize()
+        return await vector_store.backfill_user_id(user_id)
+    finally:
+        await vector_store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Assign untagged long-term memories to a user")
+    parser.add_argument("user_id", help="Thread id (WhatsApp number or Chainlit thread) that owns the memories")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    updated = asyncio.run(backfill_user_ids(args.user_id))
+    logger.info(f"Tagged {updated} memories with user id {args.user_id}")
+
+
+if __name__ == "__main__":
+    main()
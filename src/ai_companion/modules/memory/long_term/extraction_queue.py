@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from langchain_core.messages import BaseMessage
+
+from ai_companion.core.work_queue import KeyedWorkQueue
+from ai_companion.modules.memory.long_term.memory_manager import get_memory_manager
+from ai_companion.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def get_memory_extraction_queue() -> KeyedWorkQueue:
+    return KeyedWorkQueue(
+        name="memory-extraction",
+        num_workers=settings.MEMORY_EXTRACTION_WORKERS,
+        max_size=settings.MEMORY_EXTRACTION_QUEUE_SIZE,
+        max_retries=settings.MEMORY_EXTRACTION_MAX_RETRIES,
+    )
+
+
+class MemoryExtractionBuffer:
+    """Per-user buffer of human messages analysed together once full or after an interval."""
+
+    def __init__(self, queue: KeyedWorkQueue, flush_size: int, flush_interval: float):
+        self.queue = queue
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffers: dict[Optional[str], list[BaseMessage]] = {}
+        self._timers: dict[Optional[str], asyncio.TimerHandle] = {}
+        self._closed = False
+
+    def add(self, message: BaseMessage, user_id: Optional[str] = None):
+        if self._closed:
+            logger.debug(f"Memory extraction is shut down, skipping message for {user_id}")
+            return
+        buffer = self._buffers.setdefault(user_id, [])
+        buffer.append(message)
+        if len(buffer) >= self.flush_size:
+            self.flush(user_id)
+        elif user_id not in self._timers:
+            loop = asyncio.get_running_loop()
+            self._timers[user_id] = loop.call_later(self.flush_interval, self.flush, user_id)
+
+    def flush(self, user_id: Optional[str] = None):
+        timer = self._timers.pop(user_id, None)
+        if timer is not None:
+            timer.cancel()
+
+        messages = self._buffers.pop(user_id, [])
+        if not messages:
+            return
+
+        memory_manager = get_memory_manager()
+
+        async def job():
+            await memory_manager.extract_and_store_memories_batch(messages, user_id=user_id)
+
+        try:
+            self.queue.submit_nowait(user_id, job)
+        except asyncio.QueueFull:
+            logger.warning(f"Memory extraction queue full, dropping {len(messages)} messages for {user_id}")
+        except RuntimeError:
+            # The queue is shutting down; this runs from timer callbacks, so never raise
+            logger.warning(f"Memory extraction queue closed, dropping {len(messages)} messages for {user_id}")
+
+    def flush_all(self):
+        for user_id in list(self._buffers):
+            self.flush(user_id)
+
+    def close(self):
+        """Flush every buffer and cancel pending timers; later messages are ignored."""
+        self.flush_all()
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        self._closed = True
+
+
+@lru_cache()
+def get_memory_extraction_buffer() -> MemoryExtractionBuffer:
+    return MemoryExtractionBuffer(
+        queue=get_memory_extraction_queue(),
+        flush_size=settings.MEMORY_BATCH_FLUSH_SIZE,
+        flush_interval=settings.MEMORY_BATCH_FLUSH_INTERVAL,
+    )
+
+
+def enqueue_memory_extraction(message: BaseMessage, user_id: Optional[str] = None):
+    """Schedule memory extraction for ``message`` without waiting for it.
+
+    Jobs for the same user run in order; when the queue is full the message is dropped
+    rather than delaying the reply. With batching enabled the message is buffered and
+    analysed together with the user's next few messages.
+    """
+    if settings.MEMORY_BATCH_ENABLED:
+        get_memory_extraction_buffer().add(message, user_id=user_id)
+        return
+
+    queue = get_memory_extraction_queue()
+    if queue.closing:
+        logger.debug(f"Memory extraction is shut down, skipping message for {user_id}")
+        return
+
+    memory_manager = get_memory_manager()
+
+    async def job():
+        await memory_manager.extract_and_store_memories(message, user_id=user_id)
+
+    try:
+        queue.submit_nowait(user_id, job)
+    except asyncio.QueueFull:
+        logger.warning(f"Memory extraction queue full, skipping message for {user_id}")
+
+
+async def shutdown_memory_extraction(timeout: Optional[float] = None):
+    """Flush buffered messages and drain the extraction queue."""
+    get_memory_extraction_buffer().close()
+    await get_memory_extraction_queue().stop(timeout=timeout)
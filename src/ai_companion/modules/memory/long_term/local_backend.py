@@ -0,0 +1,303 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Optional
+
+import numpy as np
+
+
+class IVFIndex:
+    """Inverted-file ANN index: rows are bucketed by their nearest k-means centroid."""
+
+    def __init__(self, centroids: np.ndarray, lists: list[np.ndarray], size: int):
+        self.centroids = centroids
+        self.lists = lists
+        self.size = size
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, iterations: int = 10, seed: int = 0) -> "IVFIndex":
+        size = len(vectors)
+        n_lists = max(1, int(np.sqrt(size)))
+        rng = np.random.default_rng(seed)
+
+        # Spherical k-means on a sample; vectors are unit length so dot product is cosine
+        sample = vectors[rng.choice(size, size=min(size, n_lists * 64), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            for i in range(n_lists):
+                members = sample[assignments == i]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[i] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        assignments = np.concatenate([
+            np.argmax(vectors[start:start + 65536] @ centroids.T, axis=1)
+            for start in range(0, size, 65536)
+        ])
+        lists = [np.flatnonzero(assignments == i) for i in range(n_lists)]
+        return cls(centroids, lists, size)
+
+    def candidates(self, query: np.ndarray, n_probe: int, count: int) -> np.ndarray:
+        probes = np.argsort(self.centroids @ query)[::-1][:n_probe]
+        # Rows appended after the last build are not bucketed yet, so scan them directly
+        tail = np.arange(self.size, count)
+        return np.concatenate([*(self.lists[i] for i in probes), tail])
+
+
+class LocalBackend:
+    """In-process long-term memory storage for single-node deployments.
+
+    Unit-normalised float32 vectors live in a memory-mapped file, one row per memory, and
+    payloads live in a SQLite side table that maps point ids to rows. Small collections are
+    searched by brute force; past ``ann_threshold`` rows an IVF index, built on a background
+    thread, narrows the scan. Searches filtered by user use the index too once that user alone
+    has ``ann_threshold`` memories, keeping only the candidates that belong to them.
+
+    Several processes may share one path: rows are allocated inside a SQLite write transaction
+    and each process remaps the vectors file when another one has grown it.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    PAYLOADS_FILE = "payloads.db"
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path: str, vector_size: int, ann_threshold: int = 50_000, ann_probes: int = 8):
+        self.path = path
+        self.vector_size = vector_size
+        self.ann_threshold = ann_threshold
+        self.ann_probes = ann_probes
+        self.logger = logging.getLogger(__name__)
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._vectors: Optional[np.memmap] = None
+        self._ann: Optional[IVFIndex] = None
+        self._ann_building = False
+        # Sorted rows of users past ann_threshold, valid until another process commits a write
+        self._user_rows_cache: dict[str, np.ndarray] = {}
+        self._data_version: Optional[int] = None
+
+    @property
+    def _vectors_path(self) -> str:
+        return os.path.join(self.path, self.VECTORS_FILE)
+
+    def _map_vectors(self, capacity: int):
+        """Map at least ``capacity`` rows, growing the file if needed; only call inside a write transaction."""
+        row_bytes = self.vector_size * np.dtype(np.float32).itemsize
+        with open(self._vectors_path, "ab") as f:
+            existing = f.tell() // row_bytes
+            if existing < capacity:
+                f.truncate(capacity * row_bytes)
+            else:
+                capacity = existing
+
+        if self._vectors is not None:
+            self._vectors.flush()
+        self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.vector_size))
+
+    def _ensure_mapped(self, count: int):
+        """Remap when rows past the current mapping exist, e.g. written by another process."""
+        if count > len(self._vectors):
+            row_bytes = self.vector_size * np.dtype(np.float32).itemsize
+            capacity = os.path.getsize(self._vectors_path) // row_bytes
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.vector_size))
+
+    @contextmanager
+    def _write_transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _row_count(self) -> int:
+        return self._db.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM memories").fetchone()[0]
+
+    def _open(self):
+        with self._lock:
+            if self._db is not None:
+                return
+
+            os.makedirs(self.path, exist_ok=True)
+            # Autocommit mode, so write transactions can be opened explicitly with BEGIN IMMEDIATE
+            self._db = sqlite3.connect(
+                os.path.join(self.path, self.PAYLOADS_FILE), timeout=30, isolation_level=None, check_same_thread=False
+            )
+            self._db.execute("PRAGMA journal_mode=WAL")
+            with self._write_transaction():
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS memories ("
+                    "id TEXT PRIMARY KEY, row INTEGER NOT NULL UNIQUE, payload TEXT NOT NULL, user_id TEXT)"
+                )
+                columns = {column[1] for column in self._db.execute("PRAGMA table_info(memories)")}
+                if "user_id" not in columns:
+                    self._db.execute("ALTER TABLE memories ADD COLUMN user_id TEXT")
+                # Covering index: a user's rows are read without touching the table
+                self._db.execute("CREATE INDEX IF NOT EXISTS memories_user_row ON memories (user_id, row)")
+                self._db.execute("DROP INDEX IF EXISTS memories_user_id")
+                self._map_vectors(max(self.INITIAL_CAPACITY, self._row_count()))
+
+    def _close(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            self._ann = None
+            self._user_rows_cache.clear()
+
+    def _normalize(self, embedding: list[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if vector.shape != (self.vector_size,):
+            raise ValueError(f"Expected a vector of size {self.vector_size}, got {vector.shape}")
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _build_ann(self, vectors: np.ndarray):
+        try:
+            self.logger.info(f"Building IVF index over {len(vectors)} memories")
+            index = IVFIndex.build(vectors)
+            with self._lock:
+                self._ann = index
+        finally:
+            self._ann_building = False
+        # Sorted rows of users past ann_threshold, valid until another process commits a write
+        self._user_rows_cache: dict[str, np.ndarray] = {}
+        self._data_version: Optional[int] = None
+
+    def _maybe_rebuild_ann(self, vectors: np.ndarray):
+        """Start a background build when there is no index or it covers less than half the rows."""
+        if self._ann_building or (self._ann is not None and len(vectors) < 2 * self._ann.size):
+            return
+        self._ann_building = True
+        threading.Thread(target=self._build_ann, args=(vectors,), name="ivf-index-build", daemon=True).start()
+
+    def _user_rows(self, user_id: str, count: int) -> np.ndarray:
+        """Sorted rows of one user's memories below ``count``; large users are cached."""
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._data_version = version
+            self._user_rows_cache.clear()
+
+        rows = self._user_rows_cache.get(user_id)
+        if rows is None:
+            rows = np.fromiter(
+                (row for (row,) in self._db.execute("SELECT row FROM memories WHERE user_id = ? ORDER BY row", (user_id,))),
+                dtype=np.int64,
+            )
+            if len(rows) >= self.ann_threshold:
+                self._user_rows_cache[user_id] = rows
+        # Rows committed by another process after the count was read are picked up next time
+        return rows[: np.searchsorted(rows, count)]
+
+    def _search(self, embedding: list[float], top_k: int, user_id: Optional[str] = None) -> list[tuple[dict, float]]:
+        query = self._normalize(embedding)
+        with self._lock:
+            count = self._row_count()
+            if count == 0:
+                return []
+
+            self._ensure_mapped(count)
+            vectors = self._vectors[:count]
+            if user_id is not None:
+                rows = self._user_rows(user_id, count)
+                # Most users have few memories, and an exact scan over their rows is cheap
+                if len(rows) >= self.ann_threshold:
+                    self._maybe_rebuild_ann(vectors)
+                    if self._ann is not None:
+                        candidates = self._ann.candidates(query, self.ann_probes, count)
+                        positions = np.minimum(np.searchsorted(rows, candidates), len(rows) - 1)
+                        own = candidates[rows[positions] == candidates]
+                        if len(own) >= top_k:
+                            rows = own
+                scores = vectors[rows] @ query
+            elif count >= self.ann_threshold and self._ann is not None:
+                self._maybe_rebuild_ann(vectors)
+                rows = self._ann.candidates(query, self.ann_probes, count)
+                scores = vectors[rows] @ query
+            else:
+                # Exact scan, also used while the first index is still being built
+                if count >= self.ann_threshold:
+                    self._maybe_rebuild_ann(vectors)
+                rows = np.arange(count)
+                scores = vectors @ query
+
+            k = min(top_k, len(rows))
+            if k == 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best])]
+            hits = [(int(rows[i]), float(scores[i])) for i in best]
+
+            placeholders = ",".join("?" for _ in hits)
+            payloads = dict(self._db.execute(
+                f"SELECT row, payload FROM memories WHERE row IN ({placeholders})",
+                [row for row, _ in hits],
+            ).fetchall())
+
+        return [(json.loads(payloads[row]), score) for row, score in hits if row in payloads]
+
+    def _upsert(self, point_id: str, embedding: list[float], payload: dict):
+        vector = self._normalize(embedding)
+        with self._lock:
+            # The write lock serialises row allocation and file growth across processes
+            with self._write_transaction():
+                existing = self._db.execute("SELECT row FROM memories WHERE id = ?", (point_id,)).fetchone()
+                row = existing[0] if existing else self._row_count()
+                if row >= len(self._vectors):
+                    self._map_vectors(max(2 * len(self._vectors), row + 1))
+
+                self._vectors[row] = vector
+                self._vectors.flush()
+                self._db.execute(
+                    "INSERT INTO memories (id, row, payload, user_id) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET payload = excluded.payload, user_id = excluded.user_id",
+                    (point_id, row, json.dumps(payload), payload.get("user_id")),
+                )
+
+            # Our own commits do not change data_version, so keep the cached rows current here
+            cached = self._user_rows_cache.get(payload.get("user_id"))
+            if existing:
+                # An update may move the row to another user
+                self._user_rows_cache.clear()
+            elif cached is not None:
+                self._user_rows_cache[payload["user_id"]] = np.append(cached, row)
+
+    async def initialize(self):
+        await asyncio.to_thread(self._open)
+
+    async def close(self):
+        await asyncio.to_thread(self._close)
+
+    def _backfill_user_id(self, user_id: str) -> int:
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE memories SET user_id = ?, payload = json_set(payload, '$.user_id', ?) WHERE user_id IS NULL",
+                (user_id, user_id),
+            )
+            self._db.commit()
+            self._user_rows_cache.clear()
+            return cursor.rowcount
+
+    async def search(self, embedding: list[float], top_k: int, user_id: Optional[str] = None) -> list[tuple[dict, float]]:
+        if self._db is None:
+            await self.initialize()
+        return await asyncio.to_thread(self._search, embedding, top_k, user_id)
+
+    async def upsert(self, point_id: str, embedding: list[float], payload: dict):
+        if self._db is None:
+            await self.initialize()
+        await asyncio.to_thread(self._upsert, point_id, embedding, payload)
+
+    async def backfill_user_id(self, user_id: str) -> int:
+        if self._db is None:
+            await self.initialize()
+        return await asyncio.to_thread(self._backfill_user_id, user_id)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Optional
+
+import numpy as np
+
+from ai_companion.modules.memory.long_term.vector_store import VectorStore, get_vector_store
+from ai_companion.settings import settings
+
+FILLER_WORDS = {
+    "ok", "okay", "k", "kk", "lol", "lmao", "haha", "hahaha", "hehe", "yes", "yeah", "yep", "yup", "no",
+    "nope", "nah", "thanks", "thank", "you", "thx", "ty", "cool", "nice", "great", "sure", "hi", "hey",
+    "hello", "bye", "good", "night", "morning", "hmm", "hm", "oh", "ah", "wow", "omg", "right", "alright",
+}
+
+SELF_DISCLOSURE_PATTERN = re.compile(
+    r"\b(i am|i'm|im|i was|i've|i have|i live|i work|i study|i studied|i love|i like|i hate|i prefer"
+    r"|my|mine|remember)\b",
+    re.IGNORECASE,
+)
+
+# Letters in any script, keeping contractions like "i'm" whole
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)*")
+
+# Scripts written without spaces, where a single "word" can be a whole sentence
+UNSPACED_SCRIPT_PATTERN = re.compile(r"[\u0e00-\u0e7f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff]")
+
+IMPORTANT_EXAMPLES = [
+    "My name is Sarah and I'm 29 years old",
+    "I work as a software engineer at a startup",
+    "I live in Madrid with my girlfriend",
+    "I studied computer science at MIT",
+    "I love Star Wars and sci-fi books",
+    "My sister just had a baby",
+    "I'm training for a marathon next spring",
+    "I hate coriander, it tastes like soap",
+]
+
+TRIVIAL_EXAMPLES = [
+    "ok",
+    "lol that's funny",
+    "haha yeah",
+    "how are you today?",
+    "what are you doing?",
+    "good night",
+    "thanks!",
+    "that sounds cool",
+]
+
+
+class MemoryGate:
+    """Cheap local check that rejects messages clearly not worth a memory-analysis LLM call.
+
+    Messages pass straight through when they contain first-person disclosure cues. Very short,
+    emoji-only or filler-only messages are rejected, and anything left is compared against
+    centroids of important and trivial example messages using the memory embedding model.
+    """
+
+    def __init__(self, vector_store: Optional[VectorStore] = None):
+        self.vector_store = vector_store or get_vector_store()
+        self.logger = logging.getLogger(__name__)
+        self.counters: Counter = Counter()
+        self._centroids: Optional[tuple[np.ndarray, np.ndarray]] = None
+        self._centroids_lock = asyncio.Lock()
+
+    async def _centroid(self, examples: list[str]) -> np.ndarray:
+        embeddings = np.asarray(await asyncio.gather(*(self.vector_store.aembed(e) for e in examples)))
+        centroid = embeddings.mean(axis=0)
+        return centroid / np.linalg.norm(centroid)
+
+    async def _get_centroids(self) -> tuple[np.ndarray, np.ndarray]:
+        if self._centroids is None:
+            async with self._centroids_lock:
+                if self._centroids is None:
+                    self._centroids = (
+                        await self._centroid(IMPORTANT_EXAMPLES),
+                        await self._centroid(TRIVIAL_EXAMPLES),
+                    )
+        return self._centroids
+
+    def _lexical_decision(self, text: str) -> Optional[str]:
+        """Return a skip/pass reason, or None when the heuristics are not confident."""
+        if not any(char.isalnum() for char in text):
+            return "skip_no_words"
+        words = WORD_PATTERN.findall(text.lower())
+        if SELF_DISCLOSURE_PATTERN.search(text):
+            return "pass_self_disclosure"
+        too_short = len(text.strip()) < settings.MEMORY_GATE_MIN_CHARS or len(words) < settings.MEMORY_GATE_MIN_WORDS
+        if too_short and not UNSPACED_SCRIPT_PATTERN.search(text):
+            return "skip_too_short"
+        if all(word in FILLER_WORDS for word in words):
+            return "skip_filler"
+        return None
+
+    async def _embedding_decision(self, text: str) -> str:
+        important, trivial = await self._get_centroids()
+        embedding = np.asarray(await self.vector_store.aembed(text))
+        embedding = embedding / (np.linalg.norm(embedding) or 1.0)
+        if float(embedding @ trivial) - float(embedding @ important) > settings.MEMORY_GATE_MARGIN:
+            return "skip_embedding"
+        return "pass_embedding"
+
+    async def should_analyze(self, text: str) -> bool:
+        if not settings.MEMORY_GATE_ENABLED:
+            return True
+
+        reason = self._lexical_decision(text) or await self._embedding_decision(text)
+        self.counters[reason] += 1
+        self.logger.debug(f"Memory gate {reason}: {text!r}")
+        return reason.startswith("pass")
+
+    @property
+    def stats(self) -> dict:
+        skipped = sum(n for reason, n in self.counters.items() if reason.startswith("skip"))
+        passed = sum(n for reason, n in self.counters.items() if reason.startswith("pass"))
+        return {"skipped": skipped, "passed": passed, **self.counters}
+
+
+@lru_cache()
+def get_memory_gate() -> MemoryGate:
+    return MemoryGate()
@@ -2,13 +2,16 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 import logging
+import math
 import uuid
 from datetime import datetime
-from langchain_groq import ChatGroq
+from functools import lru_cache
 
-from settings import settings
+from ai_companion.settings import settings
 from ai_companion.modules.memory.long_term.vector_store import get_vector_store, VectorStore
-from ai_companion.core.prompts import MEMORY_ANALYSIS_PROMPT
+from ai_companion.modules.memory.long_term.memory_gate import get_memory_gate
+from ai_companion.core.llm_registry import clears_with_http_clients, get_structured_groq_model
+from ai_companion.core.prompts import MEMORY_ANALYSIS_PROMPT, MEMORY_BATCH_ANALYSIS_PROMPT
 from langchain_core.messages import HumanMessage, BaseMessage
 
 
@@ -20,45 +23,102 @@ class MemoryAnalysis(BaseModel):
     formatted_memory: Optional[str] = Field(..., description="The formatted memory to be stored")
 
 
+class MemoryAnalysisBatch(BaseModel):
+    memories: List[MemoryAnalysis] = Field(..., description="One analysis per message, in message order")
+
+
 class MemoryManager:
     def __init__(self):
         self.vector_store = get_vector_store()
+        self.gate = get_memory_gate()
         self.logger = logging.getLogger(__name__)
-        self.llm = ChatGroq(
-            model = settings.SMALL_TEXT_MODEL_NAME,
-            api_key = settings.GROQ_API_KEY,
-            temperature=0.2,
-            max_retries=2
-        ).with_structured_output(MemoryAnalysis)
+        self.llm = get_structured_groq_model(settings.SMALL_TEXT_MODEL_NAME, 0.2, MemoryAnalysis)
+        self.batch_llm = get_structured_groq_model(settings.SMALL_TEXT_MODEL_NAME, 0.2, MemoryAnalysisBatch)
 
     async def _analyze_memory(self, message):
-        prompt = MEMORY_ANALYSIS_PROMPT.format(message)
+        prompt = MEMORY_ANALYSIS_PROMPT.format(message=message)
         return await self.llm.ainvoke(prompt)
 
-    async def extract_and_store_memories(self, message:BaseMessage):
+    async def _analyze_memories(self, messages: List[str]) -> List[MemoryAnalysis]:
+        numbered = "\n".join(f"{i}. {message}" for i, message in enumerate(messages, start=1))
+        prompt = MEMORY_BATCH_ANALYSIS_PROMPT.format(messages=numbered)
+        result = await self.batch_llm.ainvoke(prompt)
+        return result.memories
+
+    async def extract_and_store_memories(self, message:BaseMessage, user_id: Optional[str] = None):
         if message.type != "human":
             return 
 
-        analysis = await self.analyze_memory(message.content)
+        if not await self.gate.should_analyze(message.content):
+            return
+
+        analysis = await self._analyze_memory(message.content)
 
         if analysis.is_important and analysis.formatted_memory:
-            similar = self.vector_store.find_similar_memory(analysis.formatted_memory)
+            embedding = await self.vector_store.aembed(analysis.formatted_memory)
+            similar = await self.vector_store.find_similar_memory(
+                analysis.formatted_memory, embedding=embedding, user_id=user_id
+            )
 
             if similar:
                 self.logger.info(f"Similar memory already exists: {analysis.formatted_memory}")
                 return 
 
             self.logger.info(f"Storing memory : {analysis.formatted_memory}")
-            self.vector_store.store_memory(
+            await self.vector_store.store_memory(
                 text = analysis.formatted_memory,
                 metadata = {
                     "id": str(uuid.uuid4()),
                     "timestamp": datetime.now().isoformat()
-                }
+                },
+                embedding = embedding,
+                user_id = user_id
             )
 
-    def get_relevant_memories(self, context):
-        memories = self.vector_store.search_memories(context, top_k=settings.MEMORY_TOP_K)
+    async def extract_and_store_memories_batch(self, messages: List[BaseMessage], user_id: Optional[str] = None):
+        """Analyse several buffered messages with one LLM call and store the new facts."""
+        contents = [message.content for message in messages if message.type == "human"]
+        contents = [content for content in contents if await self.gate.should_analyze(content)]
+        if not contents:
+            return
+
+        analyses = await self._analyze_memories(contents)
+
+        # Deduplicate within the batch before paying for any similar-memory search
+        unique_memories = {}
+        for analysis in analyses:
+            if analysis.is_important and analysis.formatted_memory:
+                unique_memories.setdefault(analysis.formatted_memory.strip().casefold(), analysis.formatted_memory.strip())
+
+        stored = []
+        for memory in unique_memories.values():
+            embedding = await self.vector_store.aembed(memory)
+            if any(cosine_similarity(embedding, other) >= self.vector_store.SIMILARITY_THRESHOLD for other in stored):
+                self.logger.info(f"Similar memory already in batch: {memory}")
+                continue
+
+            similar = await self.vector_store.find_similar_memory(memory, embedding=embedding, user_id=user_id)
+            if similar:
+                self.logger.info(f"Similar memory already exists: {memory}")
+                continue
+
+            self.logger.info(f"Storing memory : {memory}")
+            await self.vector_store.store_memory(
+                text = memory,
+                metadata = {
+                    "id": str(uuid.uuid4()),
+                    "timestamp": datetime.now().isoformat()
+                },
+                embedding = embedding,
+                user_id = user_id
+            )
+            stored.append(embedding)
+
+    async def get_relevant_memories(self, context, user_id: Optional[str] = None):
+        embedding = await self.vector_store.aembed(context)
+        memories = await self.vector_store.search_memories(
+            context, top_k=settings.MEMORY_TOP_K, embedding=embedding, user_id=user_id
+        )
         if memories:
             for memory in memories:
                 self.logger.debug(f"Memory: {memory.text}, Score: {memory.score:.2f}")
@@ -71,6 +131,13 @@ class MemoryManager:
 
         return "\n".join(f"- {memory}" for memory in memories)
 
+def cosine_similarity(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+@clears_with_http_clients
+@lru_cache()
 def get_memory_manager() -> MemoryManager:
     return MemoryManager()
     
@@ -0,0 +1,185 @@
+import asyncio
+import os
+from typing import Optional
+
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http.exceptions import UnexpectedResponse
+from qdrant_client.models import (
+    Distance,
+    FieldCondition,
+    Filter,
+    IsEmptyCondition,
+    MatchValue,
+    PayloadField,
+    PayloadSchemaType,
+    PointStruct,
+    VectorParams,
+)
+
+from ai_companion.settings import settings
+
+
+class QdrantBackend:
+    """Long-term memory storage in a Qdrant collection."""
+
+    REQUIRED_ENV_VARS = ["QDRANT_URL", "QDRANT_API_KEY"]
+    COLLECTION_NAME = "long_term_memory"
+    USER_ID_FIELD = "user_id"
+
+    def __init__(self, vector_size: int):
+        self.vector_size = vector_size
+        self._client = self._create_client()
+        self._collection_params: Optional[VectorParams] = None
+        self._collection_lock = asyncio.Lock()
+
+    def _validate_env_vars(self):
+        missing_vars = [var for var in self.REQUIRED_ENV_VARS if not os.getenv(var)]
+        if missing_vars:
+            raise ValueError(f"Missing env variables: {', '.join(missing_vars)}")
+
+    def _create_client(self) -> AsyncQdrantClient:
+        # QDRANT_LOCATION=":memory:" (or a local path) runs Qdrant in-process, e.g. for tests
+        if settings.QDRANT_LOCATION:
+            return AsyncQdrantClient(location=settings.QDRANT_LOCATION)
+
+        self._validate_env_vars()
+        return AsyncQdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+
+    def _collection_exists(self) -> bool:
+        return self._collection_params is not None
+
+    def _invalidate_collection(self):
+        self._collection_params = None
+
+    @staticmethod
+    def _is_not_found(error: UnexpectedResponse) -> bool:
+        return error.status_code == 404
+
+    async def _load_collection(self) -> bool:
+        try:
+            info = await self._client.get_collection(self.COLLECTION_NAME)
+        except UnexpectedResponse as e:
+            if not self._is_not_found(e):
+                raise
+            return False
+        except ValueError:
+            # The in-process client (QDRANT_LOCATION) reports a missing collection this way
+            if not settings.QDRANT_LOCATION:
+                raise
+            return False
+
+        params = info.config.params.vectors
+        if params.size != self.vector_size:
+            raise ValueError(
+                f"Collection {self.COLLECTION_NAME} has vector size {params.size}, "
+                f"expected {self.vector_size}"
+            )
+        if params.distance != Distance.COSINE:
+            raise ValueError(
+                f"Collection {self.COLLECTION_NAME} uses {params.distance} distance, "
+                f"expected {Distance.COSINE}"
+            )
+        if self.USER_ID_FIELD not in (info.payload_schema or {}):
+            await self._create_user_index()
+        self._collection_params = params
+        return True
+
+    async def _create_user_index(self):
+        await self._client.create_payload_index(
+            collection_name=self.COLLECTION_NAME,
+            field_name=self.USER_ID_FIELD,
+            field_schema=PayloadSchemaType.KEYWORD,
+        )
+
+    def _user_filter(self, user_id: Optional[str]) -> Optional[Filter]:
+        if user_id is None:
+            return None
+        return Filter(must=[FieldCondition(key=self.USER_ID_FIELD, match=MatchValue(value=user_id))])
+
+    async def _create_collection(self):
+        params = VectorParams(size=self.vector_size, distance=Distance.COSINE)
+        try:
+            await self._client.create_collection(
+                collection_name=self.COLLECTION_NAME,
+                vectors_config=params
+            )
+        except UnexpectedResponse as e:
+            # Another worker created it first
+            if e.status_code != 409:
+                raise
+            await self._load_collection()
+            return
+        await self._create_user_index()
+        self._collection_params = params
+
+    async def _ensure_collection(self):
+        if self._collection_exists():
+            return
+
+        async with self._collection_lock:
+            if self._collection_exists() or await self._load_collection():
+                return
+            await self._create_collection()
+
+    async def initialize(self):
+        await self._ensure_collection()
+
+    async def close(self):
+        await self._client.close()
+
+    async def search(self, embedding: list[float], top_k: int, user_id: Optional[str] = None) -> list[tuple[dict, float]]:
+        await self._ensure_collection()
+
+        try:
+            response = await self._client.query_points(
+                collection_name=self.COLLECTION_NAME,
+                query=embedding,
+                query_filter=self._user_filter(user_id),
+                limit=top_k
+            )
+        except UnexpectedResponse as e:
+            if not self._is_not_found(e):
+                raise
+            self._invalidate_collection()
+            return []
+
+        return [(hit.payload, hit.score) for hit in response.points]
+
+    async def upsert(self, point_id: str, embedding: list[float], payload: dict):
+        await self._ensure_collection()
+
+        point = PointStruct(id=point_id, vector=embedding, payload=payload)
+        try:
+            await self._client.upsert(
+                collection_name=self.COLLECTION_NAME,
+                points=[point]
+            )
+        except UnexpectedResponse as e:
+            if not self._is_not_found(e):
+                raise
+            # The collection was dropped behind our back: recreate it once and retry
+            self._invalidate_collection()
+            await self._ensure_collection()
+            await self._client.upsert(
+                collection_name=self.COLLECTION_NAME,
+                points=[point]
+            )
+
+    async def backfill_user_id(self, user_id: str) -> int:
+        """Tag every point that has no user id with ``user_id`` in one server-side update."""
+        await self._ensure_collection()
+
+        untagged = Filter(must=[IsEmptyCondition(is_empty=PayloadField(key=self.USER_ID_FIELD))])
+        result = await self._client.count(
+            collection_name=self.COLLECTION_NAME,
+            count_filter=untagged,
+            exact=True
+        )
+        if result.count:
+            await self._client.set_payload(
+                collection_name=self.COLLECTION_NAME,
+                payload={self.USER_ID_FIELD: user_id},
+                points=untagged,
+                wait=True
+            )
+        return result.count
@@ -1,14 +1,17 @@
 
-import os
-from typing import Optional
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional, Union
 from datetime import datetime
 from dataclasses import dataclass
 from functools import lru_cache
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
 from sentence_transformers import SentenceTransformer
 
-from settings import settings
+from ai_companion.modules.memory.long_term.embedding_batcher import EmbeddingBatcher
+from ai_companion.modules.memory.long_term.local_backend import LocalBackend
+from ai_companion.modules.memory.long_term.qdrant_backend import QdrantBackend
+from ai_companion.settings import settings
 
 @dataclass
 class Memory:
@@ -20,16 +23,79 @@ class Memory:
     def id(self) -> Optional[str]:
         return self.metadata.get("id")
     
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.metadata.get("user_id")
+
     @property
     def timestamp(self) -> Optional[str]:
         ts = self.metadata.get("timestamp")
         return datetime.fromisoformat(ts) if ts else None
     
 
+class EmbeddingCache:
+    """Bounded LRU cache of embeddings keyed by the SHA-256 of the embedded text."""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[list[float]]:
+        key = self.key(text)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(embedding)
+
+    def put(self, text: str, embedding: list[float]):
+        if self.max_size <= 0:
+            return
+        key = self.key(text)
+        with self._lock:
+            self._entries[key] = tuple(embedding)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, text: str, compute: Callable[[str], list[float]]) -> list[float]:
+        embedding = self.get(text)
+        if embedding is None:
+            embedding = compute(text)
+            self.put(text, embedding)
+        return embedding
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+
 class VectorStore:
-    REQUIRED_ENV_VARS = ["QDRANT_URL", "QDRANT_API_KEY"]
     EMBEDDING_MODEL = "all-miniLM-L6-v2"
-    COLLECTION_NAME = "long_term_memory"
     SIMILARITY_THRESHOLD = 0.9
 
     _instance: Optional["VectorStore"] = None
@@ -42,82 +108,95 @@ class VectorStore:
 
     def __init__(self):
         if not self._initialized:
-            self._validate_env_vars()
             self.model = SentenceTransformer(self.EMBEDDING_MODEL)
-            self._client = QdrantClient(url=settings.QDRANT_URL, api_key=settings.QDRANT_API_KEY)
+            self.embedding_cache = EmbeddingCache(max_size=settings.EMBEDDING_CACHE_SIZE)
+            self.embedding_batcher = EmbeddingBatcher(
+                encode=lambda texts: self.model.encode(texts).tolist(),
+                max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+                max_wait_ms=settings.EMBEDDING_BATCH_MAX_WAIT_MS,
+            )
+            self._backend = self._create_backend()
             self._initialized = True
 
-    def _validate_env_vars(self):
-        missing_vars = [var for var in self.REQUIRED_ENV_VARS if not os.getenv(var)]
-        if missing_vars:
-            raise ValueError(f"Missing env variables: {', '.join(missing_vars)}")
-        
-    def _collection_exists(self) -> bool:
-        collections = self.client.get_collections().collections
-        return any(col.name == self.COLLECTION_NAME for col in collections)
-    
-    def _create_collection(self):
-        sample_embedding = self.model.encode("sample text")
-        self._client.create_collection(
-            collection_name=self.COLLECTION_NAME,
-            vectors_config=VectorParams(
-                size=len(sample_embedding),
-                distance=Distance.COSINE
+    def _create_backend(self) -> Union[QdrantBackend, LocalBackend]:
+        vector_size = self.model.get_sentence_embedding_dimension()
+        if settings.MEMORY_BACKEND == "qdrant":
+            return QdrantBackend(vector_size=vector_size)
+        if settings.MEMORY_BACKEND == "local":
+            return LocalBackend(
+                path=settings.LOCAL_VECTOR_INDEX_PATH,
+                vector_size=vector_size,
+                ann_threshold=settings.LOCAL_VECTOR_INDEX_ANN_THRESHOLD,
+                ann_probes=settings.LOCAL_VECTOR_INDEX_ANN_PROBES,
             )
-        )
+        raise ValueError(f"Unknown memory backend: {settings.MEMORY_BACKEND}")
 
+    async def initialize(self):
+        await self._backend.initialize()
 
-    def find_similar_memory(self, text:str) -> Optional[Memory]:
-        if not self._collection_exists():
-            return None
-        
-        results = self.search_memories(text, top_k=1)
+    async def close(self):
+        await self.embedding_batcher.close()
+        await self._backend.close()
+    
+    def embed(self, text: str) -> list[float]:
+        return self.embedding_cache.get_or_compute(text, lambda t: self.model.encode(t).tolist())
+
+    async def aembed(self, text: str) -> list[float]:
+        embedding = self.embedding_cache.get(text)
+        if embedding is None:
+            embedding = await self.embedding_batcher.embed(text)
+            self.embedding_cache.put(text, embedding)
+        return embedding
+
+    async def find_similar_memory(
+        self, text:str, embedding: Optional[list[float]] = None, user_id: Optional[str] = None
+    ) -> Optional[Memory]:
+        results = await self.search_memories(text, top_k=1, embedding=embedding, user_id=user_id)
         if results and results[0].score >= self.SIMILARITY_THRESHOLD:
             return results[0]
         return None
     
-    def store_memory(self, text: str, metadata: dict):
-        if not self._collection_exists():
-            self._create_collection()
+    async def store_memory(
+        self, text: str, metadata: dict, embedding: Optional[list[float]] = None, user_id: Optional[str] = None
+    ):
+        if embedding is None:
+            embedding = await self.aembed(text)
 
-        similar_memory = self.find_similar_memory(text)
+        similar_memory = await self.find_similar_memory(text, embedding=embedding, user_id=user_id)
         if similar_memory and similar_memory.id:
             metadata["id"] = similar_memory.id
 
-        
-        embedding = self.model.encode(text).tolist()
-        point = PointStruct(
-            id=metadata["id"],
-            vector=embedding,
+        if user_id is not None:
+            metadata["user_id"] = user_id
+
+        await self._backend.upsert(
+            point_id=metadata["id"],
+            embedding=embedding,
             payload={
                 'text': text,
                 **metadata
             }
         )
-        self._client.upsert(
-            collection_name=self.COLLECTION_NAME,
-            points=[point]
-        )
 
-    def search_memories(self, text: str, top_k: int = 5) -> list[Memory]:
-        if not self._collection_exists():
-            return []
-        
-        embedding = self.model.encode(text).tolist()
-        search_result = self._client.search(
-            collection_name=self.COLLECTION_NAME,
-            query_vector=embedding,
-            limit=top_k
-        )
+    async def search_memories(
+        self, text: str, top_k: int = 5, embedding: Optional[list[float]] = None, user_id: Optional[str] = None
+    ) -> list[Memory]:
+        if embedding is None:
+            embedding = await self.aembed(text)
+
+        hits = await self._backend.search(embedding, top_k, user_id=user_id)
 
         return [
             Memory(
-                text=hit.payload['text'],
-                metadata={k: v for k, v in hit.payload.items() if k != 'text'},
-                score=hit.score  # Convert cosine distance to similarity
+                text=payload['text'],
+                metadata={k: v for k, v in payload.items() if k != 'text'},
+                score=score  # Cosine similarity
             )
-            for hit in search_result
+            for payload, score in hits
         ]
+
+    async def backfill_user_id(self, user_id: str) -> int:
+        return await self._backend.backfill_user_id(user_id)
     
 
 @lru_cache()
@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Dict, Optional
+from zoneinfo import ZoneInfo
 
 from ai_companion.core.schedules import (
     FRIDAY_SCHEDULE,
@@ -10,6 +11,44 @@ from ai_companion.core.schedules import (
     TUESDAY_SCHEDULE,
     WEDNESDAY_SCHEDULE,
 )
+from ai_companion.settings import settings
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+def parse_minutes(hhmm: str) -> int:
+    hours, minutes = hhmm.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def compile_weekly_schedule(schedules: Dict[int, Dict[str, str]]) -> tuple[str, ...]:
+    """Expand per-day schedules into one activity per minute of the week (Monday 00:00 first).
+
+    Overnight ranges such as "23:00-06:00" continue into the next day, wrapping from Sunday
+    to Monday. Raises ValueError if any minute is covered twice or not at all.
+    """
+    slots: list[Optional[str]] = [None] * MINUTES_PER_WEEK
+    for weekday, daily_schedule in schedules.items():
+        for time_range, activity in daily_schedule.items():
+            start_str, end_str = time_range.split("-")
+            start, end = parse_minutes(start_str), parse_minutes(end_str)
+            duration = (end - start) % MINUTES_PER_DAY or MINUTES_PER_DAY
+            day_start = weekday * MINUTES_PER_DAY
+            for offset in range(start, start + duration):
+                slot = (day_start + offset) % MINUTES_PER_WEEK
+                if slots[slot] is not None:
+                    raise ValueError(f"Schedule overlap on weekday {weekday} at {time_range}")
+                slots[slot] = activity
+
+    gaps = [slot for slot, activity in enumerate(slots) if activity is None]
+    if gaps:
+        day, minute = divmod(gaps[0], MINUTES_PER_DAY)
+        raise ValueError(
+            f"Schedule has {len(gaps)} uncovered minutes, first on weekday {day} at {minute // 60:02d}:{minute % 60:02d}"
+        )
+    return tuple(slots)
+
 
 class ScheduleContextGenerator:
     SCHEDULES = {
@@ -21,6 +60,10 @@ class ScheduleContextGenerator:
         5: SATURDAY_SCHEDULE,  # Saturday
         6: SUNDAY_SCHEDULE,  # Sunday
     }
+
+    # Built once at import so lookups are a single index
+    ACTIVITY_BY_MINUTE = compile_weekly_schedule(SCHEDULES)
+    TIMEZONE = ZoneInfo(settings.SCHEDULE_TIMEZONE) if settings.SCHEDULE_TIMEZONE else None
     
     @staticmethod
     def parse_time_range(time_range: str) -> tuple[datetime.time, datetime.time]:
@@ -28,28 +71,17 @@ class ScheduleContextGenerator:
         start_time = datetime.strptime(start_str, "%H:%M").time()
         end_time = datetime.strptime(end_str, "%H:%M").time()
         return start_time, end_time
+
+    @classmethod
+    def get_activity_at(cls, moment: datetime) -> Optional[str]:
+        if cls.TIMEZONE is not None and moment.tzinfo is not None:
+            moment = moment.astimezone(cls.TIMEZONE)
+        minute_of_week = moment.weekday() * MINUTES_PER_DAY + moment.hour * 60 + moment.minute
+        return cls.ACTIVITY_BY_MINUTE[minute_of_week]
     
     @classmethod
     def get_current_activity(cls) -> Optional[str]:
-        now = datetime.now()
-        weekday = now.weekday()
-        current_time = now.time()
-        
-        daily_schedule = cls.SCHEDULES.get(weekday, {})
-        
-        for time_range, activity in daily_schedule.items():
-            start_time, end_time = cls.parse_time_range(time_range)
-
-            # handle overnight time ranges
-            if start_time > end_time:
-                if current_time >= start_time or current_time < end_time:
-                    return activity
-            else:
-                if start_time <= current_time < end_time:
-                    return activity
-            return None
-        
-        return None
+        return cls.get_activity_at(datetime.now(cls.TIMEZONE))
     
     @classmethod
     def get_schedule_for_day(cls, weekday: int) -> Dict[str, str]:
@@ -0,0 +1,4 @@
+from .speech_to_text import SpeechToText
+from .text_to_speech import TextToSpeech
+
+__all__ = ["SpeechToText", "TextToSpeech"]
\ No newline at end of file
@@ -0,0 +1,187 @@
+import asyncio
+import io
+import shutil
+import wave
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import numpy as np
+
+FRAME_MS = 30
+# Whisper resamples to 16 kHz mono anyway, so decoding straight to it keeps segment uploads small
+DECODE_SAMPLE_RATE = 16000
+
+
+@dataclass
+class PCMAudio:
+    samples: np.ndarray
+    sample_rate: int
+    channels: int
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+def is_wav(data: bytes) -> bool:
+    return data[:4] == b"RIFF" and data[8:12] == b"WAVE"
+
+
+def is_ogg(data: bytes) -> bool:
+    return data[:4] == b"OggS"
+
+
+def ogg_duration(data: bytes) -> Optional[float]:
+    """Read the duration of an Ogg Opus or Vorbis stream from the granule position of its last page.
+
+    Returns ``None`` when the stream is truncated or uses another codec.
+    """
+    last_page = data.rfind(b"OggS")
+    if last_page < 0 or len(data) < last_page + 14 or data[last_page + 4] != 0:
+        return None
+    granule = int.from_bytes(data[last_page + 6 : last_page + 14], "little")
+    if granule == 2**64 - 1:
+        return None
+
+    opus_head = data.find(b"OpusHead")
+    if opus_head >= 0 and len(data) >= opus_head + 12:
+        # Opus granules always count 48 kHz samples, including the encoder's pre-skip
+        pre_skip = int.from_bytes(data[opus_head + 10 : opus_head + 12], "little")
+        return max(0, granule - pre_skip) / 48000
+    vorbis_head = data.find(b"\x01vorbis")
+    if vorbis_head >= 0 and len(data) >= vorbis_head + 16:
+        sample_rate = int.from_bytes(data[vorbis_head + 12 : vorbis_head + 16], "little")
+        return granule / sample_rate if sample_rate else None
+    return None
+
+
+async def decode_audio_stream(
+    data: bytes, ffmpeg_path: str = "ffmpeg", sample_rate: int = DECODE_SAMPLE_RATE, block_seconds: float = 1.0
+) -> AsyncIterator[np.ndarray]:
+    """Decode any container ffmpeg understands (OGG/Opus voice notes, MP3, M4A) into mono PCM16.
+
+    Sample blocks of shape (frames, 1) are yielded while ffmpeg is still decoding, so callers can
+    start work on the beginning of a long recording early. Raises ``FileNotFoundError`` when ffmpeg
+    is not installed and ``ValueError`` when it cannot decode the data.
+    """
+    ffmpeg = shutil.which(ffmpeg_path)
+    if ffmpeg is None:
+        raise FileNotFoundError(f"ffmpeg not found: {ffmpeg_path}")
+    # Raw s16le output avoids the unseekable-pipe WAV header ffmpeg would write
+    process = await asyncio.create_subprocess_exec(
+        ffmpeg, "-nostdin", "-loglevel", "error", "-i", "pipe:0",
+        "-ac", "1", "-ar", str(sample_rate), "-f", "s16le", "pipe:1",
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+
+    async def write_input():
+        try:
+            process.stdin.write(data)
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            process.stdin.close()
+
+    writer = asyncio.create_task(write_input())
+    block_bytes = 2 * max(1, int(block_seconds * sample_rate))
+    pending = b""
+    try:
+        while chunk := await process.stdout.read(block_bytes):
+            pending += chunk
+            usable = len(pending) // 2 * 2
+            if usable:
+                yield np.frombuffer(pending[:usable], dtype="<i2").reshape(-1, 1)
+                pending = pending[usable:]
+        await writer
+        errors = await process.stderr.read()
+        if await process.wait() != 0:
+            raise ValueError(f"ffmpeg could not decode the audio: {errors.decode(errors='replace').strip()}")
+    finally:
+        writer.cancel()
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+def pcm16_to_wav(data: bytes, sample_rate: int, channels: int = 1) -> bytes:
+    """Wrap headerless little-endian PCM16 (as recorded by the Chainlit UI) in a WAV container."""
+    frame_bytes = 2 * channels
+    samples = np.frombuffer(data[: len(data) // frame_bytes * frame_bytes], dtype="<i2").reshape(-1, channels)
+    return write_wav(PCMAudio(samples=samples, sample_rate=sample_rate, channels=channels))
+
+
+def read_wav(data: bytes) -> PCMAudio:
+    """Decode 16-bit PCM WAV bytes into an array of shape (frames, channels)."""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"Unsupported sample width: {wav.getsampwidth() * 8} bits")
+        channels = wav.getnchannels()
+        samples = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2").reshape(-1, channels)
+        return PCMAudio(samples=samples, sample_rate=wav.getframerate(), channels=channels)
+
+
+def write_wav(audio: PCMAudio) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(audio.channels)
+        wav.setsampwidth(2)
+        wav.setframerate(audio.sample_rate)
+        wav.writeframes(audio.samples.astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def _frame_energy(samples: np.ndarray, frame_size: int) -> np.ndarray:
+    mono = samples.astype(np.float32).mean(axis=1)
+    n_frames = len(mono) // frame_size
+    frames = mono[: n_frames * frame_size].reshape(n_frames, frame_size)
+    return np.sqrt((frames ** 2).mean(axis=1))
+
+
+class SilenceSplitter:
+    """Cut a stream of PCM blocks into segments of roughly ``target_seconds``, at the quietest frame.
+
+    Each cut is placed at the lowest-energy frame within ``search_seconds`` before the target
+    length, so words are not chopped in half when there is a pause nearby. A segment is returned
+    from ``feed`` as soon as enough audio has arrived to place its cut.
+    """
+
+    def __init__(self, sample_rate: int, channels: int, target_seconds: float, search_seconds: float):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frame_size = max(1, sample_rate * FRAME_MS // 1000)
+        self.target_frames = max(1, int(target_seconds * 1000 / FRAME_MS))
+        self.search_frames = min(self.target_frames - 1, int(search_seconds * 1000 / FRAME_MS))
+        self._blocks: list[np.ndarray] = []
+        self._buffered = 0
+
+    def _segment(self, samples: np.ndarray) -> PCMAudio:
+        return PCMAudio(samples=samples, sample_rate=self.sample_rate, channels=self.channels)
+
+    def feed(self, samples: np.ndarray) -> list[PCMAudio]:
+        self._blocks.append(samples)
+        self._buffered += len(samples)
+        segments = []
+        while self._buffered // self.frame_size > self.target_frames:
+            buffer = np.concatenate(self._blocks) if len(self._blocks) > 1 else self._blocks[0]
+            energy = _frame_energy(buffer[: (self.target_frames + 1) * self.frame_size], self.frame_size)
+            window_start = self.target_frames - self.search_frames
+            cut = (window_start + int(np.argmin(energy[window_start:]))) * self.frame_size
+            segments.append(self._segment(buffer[:cut]))
+            self._blocks = [buffer[cut:]]
+            self._buffered = len(buffer) - cut
+        return segments
+
+    def finish(self) -> list[PCMAudio]:
+        remainder = [self._segment(np.concatenate(self._blocks))] if self._buffered else []
+        self._blocks = []
+        self._buffered = 0
+        return remainder
+
+
+def split_on_silence(audio: PCMAudio, target_seconds: float, search_seconds: float) -> list[PCMAudio]:
+    """Split in-memory audio into segments of roughly ``target_seconds``; see ``SilenceSplitter``."""
+    splitter = SilenceSplitter(audio.sample_rate, audio.channels, target_seconds, search_seconds)
+    return splitter.feed(audio.samples) + splitter.finish()
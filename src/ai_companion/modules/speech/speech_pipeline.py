@@ -0,0 +1,62 @@
+import asyncio
+import re
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+")
+
+
+async def iter_sentences(tokens: AsyncIterator[str], min_chars: int = 40) -> AsyncIterator[str]:
+    """Group a token stream into sentences as soon as each one is complete.
+
+    Sentences shorter than ``min_chars`` are merged with the next one so TTS is not called
+    for fragments like "Oh!" on their own.
+    """
+    buffer = ""
+    pending = ""
+    async for token in tokens:
+        buffer += token
+        *complete, buffer = SENTENCE_BOUNDARY.split(buffer)
+        for sentence in complete:
+            pending = f"{pending} {sentence}".strip()
+            if len(pending) >= min_chars:
+                yield pending
+                pending = ""
+
+    tail = f"{pending} {buffer}".strip()
+    if tail:
+        yield tail
+
+
+async def synthesize_in_order(
+    sentences: AsyncIterator[str],
+    synthesize: Callable[[str], Awaitable[bytes]],
+    max_concurrency: int = 3,
+) -> AsyncIterator[bytes]:
+    """Synthesize sentences concurrently while they are still being generated, yielding audio in order."""
+    semaphore = asyncio.Semaphore(max_concurrency)
+    tasks: asyncio.Queue[Optional[asyncio.Task]] = asyncio.Queue()
+    started: list[asyncio.Task] = []
+
+    async def run(sentence: str) -> bytes:
+        async with semaphore:
+            return await synthesize(sentence)
+
+    async def produce():
+        try:
+            async for sentence in sentences:
+                task = asyncio.create_task(run(sentence))
+                started.append(task)
+                await tasks.put(task)
+        finally:
+            await tasks.put(None)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (task := await tasks.get()) is not None:
+            yield await task
+        # Surface errors from the token stream itself
+        await producer
+    finally:
+        producer.cancel()
+        for task in started:
+            task.cancel()
@@ -1,52 +1,125 @@
 from ai_companion.settings import settings
 from ai_companion.core.exceptions import SpeechToTextError
-from groq import Groq
+from ai_companion.modules.speech.audio_segments import (
+    DECODE_SAMPLE_RATE,
+    PCMAudio,
+    SilenceSplitter,
+    decode_audio_stream,
+    is_ogg,
+    is_wav,
+    ogg_duration,
+    read_wav,
+    write_wav,
+)
+from groq import AsyncGroq
+import asyncio
+import logging
 import os
-from typing import Optional
-import tempfile
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
 
 class SpeechToText:
     REQUIRED_ENV_VARS = ["GROQ_API_KEY"]
 
     def __init__(self):
         self._validate_env_vars()
-        self._client: Optional[Groq] = None
+        self._client: Optional[AsyncGroq] = None
+        self.logger = logging.getLogger(__name__)
 
-    def validate_env_vars(self):
+    def _validate_env_vars(self):
         missing_vars = [var for var in self.REQUIRED_ENV_VARS if not os.getenv(var)]
         if missing_vars:
-            raise ValueError(f"Missing required environment variables: {','.joint(missing_vars)}")
-        
+            raise ValueError(f"Missing required environment variables: {','.join(missing_vars)}")
+
     @property
-    def client(self) -> Groq:
+    def client(self) -> AsyncGroq:
         if self._client is None:
-            self._client = Groq(api_key=settings.GROQ_API_KEY)
+            self._client = AsyncGroq(api_key=settings.GROQ_API_KEY)
         return self._client
-    
 
-    def transcribe(self, audio_data: str) -> str:
+    async def _transcribe_file(self, audio_data: bytes, filename: str) -> str:
+        # Upload straight from memory; the SDK accepts a (filename, bytes) tuple
+        transcription = await self.client.audio.transcriptions.create(
+            file=(filename, audio_data),
+            model=settings.STT_MODEL_NAME,
+            language="en",
+            response_format="text",
+        )
+        return str(getattr(transcription, "text", transcription)).strip()
+
+    def _should_split(self, audio_data: bytes) -> bool:
+        if not settings.STT_CHUNKING_ENABLED:
+            return False
+        # Voice notes are mostly short; read the Ogg duration from the last page before paying for ffmpeg
+        if is_ogg(audio_data):
+            duration = ogg_duration(audio_data)
+            return duration is None or duration > settings.STT_SEGMENT_SECONDS
+        return True
+
+    async def _audio_blocks(self, audio_data: bytes) -> AsyncIterator[PCMAudio]:
+        """Yield the audio as PCM: WAV is read directly, anything else is decoded by ffmpeg as it streams."""
+        if is_wav(audio_data):
+            yield await asyncio.to_thread(read_wav, audio_data)
+            return
+        async with aclosing(decode_audio_stream(audio_data, settings.STT_FFMPEG_PATH)) as blocks:
+            async for samples in blocks:
+                yield PCMAudio(samples=samples, sample_rate=DECODE_SAMPLE_RATE, channels=1)
+
+    async def _transcribe_split(self, audio_data: bytes) -> Optional[str]:
+        """Transcribe segments concurrently as soon as they are cut, so uploads overlap decoding.
+
+        Returns ``None`` when the audio is no longer than one segment.
+        """
+        semaphore = asyncio.Semaphore(settings.STT_MAX_CONCURRENCY)
+        tasks: list[asyncio.Task] = []
+
+        async def transcribe_segment(i: int, segment: PCMAudio) -> str:
+            async with semaphore:
+                return await self._transcribe_file(write_wav(segment), f"segment_{i}.wav")
+
+        def submit(segments: list[PCMAudio]):
+            for segment in segments:
+                tasks.append(asyncio.create_task(transcribe_segment(len(tasks), segment)))
+
+        splitter: Optional[SilenceSplitter] = None
+        try:
+            # aclosing stops ffmpeg promptly if a segment upload fails mid-stream
+            async with aclosing(self._audio_blocks(audio_data)) as blocks:
+                async for audio in blocks:
+                    if splitter is None:
+                        splitter = SilenceSplitter(
+                            audio.sample_rate, audio.channels, settings.STT_SEGMENT_SECONDS, settings.STT_SEGMENT_SEARCH_SECONDS
+                        )
+                    submit(await asyncio.to_thread(splitter.feed, audio.samples))
+            if not tasks:
+                return None
+            submit(splitter.finish())
+            self.logger.info(f"Transcribing {len(tasks)} audio segments concurrently")
+            # gather keeps results in segment order regardless of completion order
+            parts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return " ".join(part for part in parts if part)
+
+    async def transcribe(self, audio_data: bytes, filename: str = "audio.wav") -> str:
         if not audio_data:
             raise ValueError("Audio data cannot be empty.")
         try:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_file_path = temp_file.name
-
-            try:
-                with open(temp_file_path, "rb") as audio_file:
-                    transcription = self.client.audio.transcriptions.create(
-                        file = audio_file,
-                        model=settings.STT_MODEL_NAME,
-                        language="en",
-                        response_format="text",
-                    )
-                if not transcription:
-                    raise SpeechToTextError("Transcription result is empty.")
-                
-                return transcription
-
-            finally:
-                os.unlink(temp_file_path)
-        
+            transcription = None
+            if self._should_split(audio_data):
+                try:
+                    transcription = await self._transcribe_split(audio_data)
+                except (FileNotFoundError, ValueError) as e:
+                    self.logger.warning(f"Could not split audio ({e}); sending it as a single file")
+            if transcription is None:
+                transcription = await self._transcribe_file(audio_data, filename)
+
+            if not transcription:
+                raise SpeechToTextError("Transcription result is empty.")
+
+            return transcription
+
         except Exception as e:
             raise SpeechToTextError(f"Speech to text conversion failed: {str(e)}") from e
@@ -1,52 +1,80 @@
 import os
-from typing import Optional
-from groq import Groq
-from settings import settings
+from typing import AsyncIterator, Optional
+from ai_companion.settings import settings
 from ai_companion.core.exceptions import TextToSpeechError
-from elevenlabs import ElevenLabs, Voice, VoiceSettings
+from ai_companion.modules.speech.tts_cache import get_speech_cache
+from elevenlabs import AsyncElevenLabs, VoiceSettings
 
 class TextToSpeech:
     REQUIRED_ENV_VARS = ["ELEVENLABS_API_KEY", "ELEVENLABS_VOICE_ID"]
+    VOICE_SETTINGS = {"stability": 0.5, "similarity_boost": 0.5}
 
     def __init__(self):
         self._validate_env_vars()
-        self._client: Optional[ElevenLabs] = None 
+        self._client: Optional[AsyncElevenLabs] = None 
 
     def _validate_env_vars(self):
-        missing_vars = [var for var in vars if not os.getenv(var)]
+        missing_vars = [var for var in self.REQUIRED_ENV_VARS if not os.getenv(var)]
         if missing_vars:
-            raise ValueError(f"Missing env variables: {''.join(missing_vars)}")
+            raise ValueError(f"Missing env variables: {', '.join(missing_vars)}")
         
     @property
-    def client(self):
+    def client(self) -> AsyncElevenLabs:
         if self._client is None:
-            self._client = ElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
+            self._client = AsyncElevenLabs(api_key=settings.ELEVENLABS_API_KEY)
         return self._client
-    
-    def synthesize(self, text:str) -> bytes:
+
+    @staticmethod
+    def _validate_text(text: str):
         if not text.strip():
             raise ValueError("Input text cannot be empty")
         
         if len(text)>5000:
             raise ValueError("Input text exceeds maximum length of 5000 characters")
-        
+
+    async def synthesize_stream(self, text: str, output_format: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Yield audio chunks as ElevenLabs produces them."""
+        self._validate_text(text)
+
+        cache = get_speech_cache() if settings.TTS_CACHE_ENABLED else None
+        cache_key = None
+        if cache is not None:
+            cache_key = cache.key(
+                text,
+                voice_id=settings.ELEVENLABS_VOICE_ID,
+                model_id=settings.TTS_MODEL_NAME,
+                voice_settings=self.VOICE_SETTINGS,
+                output_format=output_format,
+            )
+            cached_audio = await cache.get(cache_key)
+            if cached_audio:
+                yield cached_audio
+                return
+
+        options = {"output_format": output_format} if output_format else {}
+        chunks = []
         try:
-            audio_generator = self.client.text_to_speech.convert(
+            audio_stream = self.client.text_to_speech.stream(
                 voice_id= settings.ELEVENLABS_VOICE_ID,
                 text = text,
                 model_id= settings.TTS_MODEL_NAME,
-                voice_settings = VoiceSettings(
-                    stability=0.5,
-                    similarity_boost=0.5
-                )
+                voice_settings = VoiceSettings(**self.VOICE_SETTINGS),
+                **options
             )
-
-            # Convert generator to bytes
-            audio_bytes = b"".join(audio_generator)
-            if not audio_bytes:
-                raise TextToSpeechError("Generated audio is empty")
-
-            return audio_bytes
+            async for chunk in audio_stream:
+                if chunk:
+                    chunks.append(chunk)
+                    yield chunk
 
         except Exception as e:
             raise TextToSpeechError(f"Text-to-speech conversion failed: {str(e)}") from e
+
+        if cache is not None and chunks:
+            await cache.put(cache_key, b"".join(chunks))
+    
+    async def synthesize(self, text:str, output_format: Optional[str] = None) -> bytes:
+        audio_bytes = b"".join([chunk async for chunk in self.synthesize_stream(text, output_format)])
+        if not audio_bytes:
+            raise TextToSpeechError("Generated audio is empty")
+
+        return audio_bytes
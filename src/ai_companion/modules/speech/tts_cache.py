@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional
+
+from ai_companion.settings import settings
+
+
+class SpeechCache:
+    """Content-addressed cache of synthesized speech on local disk with an in-memory hot tier.
+
+    Audio files are written atomically and tracked in a SQLite index (WAL mode), so several
+    uvicorn workers can share one cache directory. When the files exceed ``max_bytes`` the
+    least recently used entries are evicted.
+    """
+
+    INDEX_FILE = "index.db"
+
+    def __init__(self, path: str, max_bytes: int, memory_max_bytes: int = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.memory_max_bytes = memory_max_bytes
+        self.logger = logging.getLogger(__name__)
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def key(text: str, **params) -> str:
+        normalized = " ".join(text.split())
+        material = json.dumps({"text": normalized, **params}, sort_keys=True)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._db is None:
+            os.makedirs(self.path, exist_ok=True)
+            db = sqlite3.connect(os.path.join(self.path, self.INDEX_FILE), timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _file_path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], f"{key}.bin")
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.memory_max_bytes:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_max_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                self.bytes_saved += len(audio)
+                return audio
+
+            db = self._connect()
+            try:
+                with open(self._file_path(key), "rb") as f:
+                    audio = f.read()
+            except FileNotFoundError:
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                db.commit()
+                self.misses += 1
+                return None
+
+            db.execute("UPDATE entries SET last_access = ? WHERE key = ?", (time.time(), key))
+            db.commit()
+            self._remember(key, audio)
+            self.disk_hits += 1
+            self.bytes_saved += len(audio)
+            return audio
+
+    def _put(self, key: str, audio: bytes):
+        with self._lock:
+            db = self._connect()
+            file_path = self._file_path(key)
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            # Write to a temp file and rename so other workers never read a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.replace(tmp_path, file_path)
+
+            db.execute(
+                "INSERT INTO entries (key, size, last_access) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET size = excluded.size, last_access = excluded.last_access",
+                (key, len(audio), time.time()),
+            )
+            db.commit()
+            self._remember(key, audio)
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection):
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            evicted.append(key)
+            total -= size
+
+        for key in evicted:
+            try:
+                os.remove(self._file_path(key))
+            except FileNotFoundError:
+                pass
+        db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in evicted])
+        db.commit()
+        self.logger.info(f"Evicted {len(evicted)} cached speech files")
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def put(self, key: str, audio: bytes):
+        await asyncio.to_thread(self._put, key, audio)
+
+    @property
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / total if total else 0.0,
+            "bytes_saved": self.bytes_saved,
+        }
+
+
+@lru_cache()
+def get_speech_cache() -> SpeechCache:
+    return SpeechCache(
+        path=settings.TTS_CACHE_DIR,
+        max_bytes=settings.TTS_CACHE_MAX_BYTES,
+        memory_max_bytes=settings.TTS_CACHE_MEMORY_BYTES,
+    )
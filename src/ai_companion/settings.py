@@ -13,6 +13,7 @@ class Settings(BaseSettings):
     QDRANT_API_KEY: str
     QDRANT_PORT: int = "6333"
     QDRANT_HOST: str | None = None
+    QDRANT_LOCATION: str | None = None
 
     WHATSAPP_PHONE_NUMBER_ID: str
     WHATSAPP_TOKEN: str
@@ -22,14 +23,70 @@ class Settings(BaseSettings):
     SMALL_TEXT_MODEL_NAME: str = "gemma2-9b-it"
     STT_MODEL_NAME: str = "whisper-large-v3-turbo"
     TTS_MODEL_NAME: str = "eleven_flash_v2_5"
+    TTS_STREAM_OUTPUT_FORMAT: str = "pcm_24000"
+    TTS_PIPELINE_ENABLED: bool = True
+    TTS_PIPELINE_CONCURRENCY: int = 3
+    TTS_PIPELINE_MIN_SENTENCE_CHARS: int = 40
+    TTS_CACHE_ENABLED: bool = True
+    TTS_CACHE_DIR: str = "/app/data/tts_cache"
+    TTS_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    TTS_CACHE_MEMORY_BYTES: int = 16 * 1024 * 1024
+
+    STT_CHUNKING_ENABLED: bool = True
+    STT_SEGMENT_SECONDS: float = 30
+    STT_SEGMENT_SEARCH_SECONDS: float = 5
+    STT_MAX_CONCURRENCY: int = 4
+    STT_FFMPEG_PATH: str = "ffmpeg"
+
+    IMAGE_STORE_ENABLED: bool = False
+    IMAGE_STORE_DIR: str = "/app/data/generated_images"
+    IMAGE_STORE_MAX_BYTES: int = 512 * 1024 * 1024
+    IMAGE_STORE_TTL: int = 7 * 24 * 60 * 60
+    IMAGE_PREPROCESS_MAX_PIXELS: int = 1024 * 1024
+    IMAGE_PREPROCESS_JPEG_QUALITY: int = 85
+    IMAGE_PREPROCESS_WORKERS: int = 2
+    IMAGE_DESCRIPTION_CACHE_SIZE: int = 256
+
     TTI_MODEL_NAME: str = "black-forest-labs/FLUX.1-schnell-Free"
     ITT_MODEL_NAME: str = "llama-3.2-90b-vision-preview"
 
+    MEMORY_BACKEND: str = "qdrant"
+    LOCAL_VECTOR_INDEX_PATH: str = "/app/data/long_term_memory"
+    LOCAL_VECTOR_INDEX_ANN_THRESHOLD: int = 50_000
+    LOCAL_VECTOR_INDEX_ANN_PROBES: int = 8
+
     MEMORY_TOP_K: int = 3
+    MEMORY_GATE_ENABLED: bool = True
+    MEMORY_GATE_MIN_CHARS: int = 8
+    MEMORY_GATE_MIN_WORDS: int = 3
+    MEMORY_GATE_MARGIN: float = 0.05
+    MEMORY_EXTRACTION_WORKERS: int = 2
+    MEMORY_EXTRACTION_QUEUE_SIZE: int = 1000
+    MEMORY_EXTRACTION_MAX_RETRIES: int = 2
+    MEMORY_EXTRACTION_DRAIN_TIMEOUT: float = 30
+    MEMORY_BATCH_ENABLED: bool = True
+    MEMORY_BATCH_FLUSH_SIZE: int = 5
+    MEMORY_BATCH_FLUSH_INTERVAL: float = 60
+    EMBEDDING_CACHE_SIZE: int = 1024
+    EMBEDDING_BATCH_MAX_SIZE: int = 32
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = 0
     ROUTER_MESSAGES_TO_ANALYZE: int = 3
+    ROUTER_LOCAL_ENABLED: bool = True
+    ROUTER_CONFIDENCE_MARGIN: float = 0.08
     TOTAL_MESSAGES_SUMMARY_TRIGGER: int = 20
     TOTAL_MESSAGES_AFTER_SUMMARY: int = 5
 
     SHORT_TERM_MEMORY_DB_PATH: str = "/app/data/memory.db"
 
+    SCHEDULE_TIMEZONE: str | None = None
+
+    WHATSAPP_WORKERS: int = 8
+    WHATSAPP_QUEUE_SIZE: int = 500
+    WHATSAPP_DRAIN_TIMEOUT: float = 60
+    WHATSAPP_HTTP_MAX_RETRIES: int = 3
+    WHATSAPP_HTTP_RETRY_BACKOFF: float = 0.5
+    WHATSAPP_DEDUP_DB_PATH: str = "/app/data/whatsapp_dedup.db"
+    WHATSAPP_DEDUP_TTL: float = 7 * 24 * 60 * 60
+    WHATSAPP_DEDUP_MEMORY_SIZE: int = 10_000
+
 settings = Settings()
\ No newline at end of file
@@ -0,0 +1,15 @@
+import os
+
+# Settings requires these at import time; tests never call the real services
+for name in (
+    "GROQ_API_KEY",
+    "ELEVENLABS_API_KEY",
+    "ELEVENLABS_VOICE_ID",
+    "TOGETHER_API_KEY",
+    "QDRANT_URL",
+    "QDRANT_API_KEY",
+    "WHATSAPP_PHONE_NUMBER_ID",
+    "WHATSAPP_TOKEN",
+    "WHATSAPP_VERIFY_TOKEN",
+):
+    os.environ.setdefault(name, "test")
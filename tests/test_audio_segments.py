@@ -0,0 +1,74 @@
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ai_companion.modules.speech.audio_segments import (  # noqa: E402
+    PCMAudio,
+    SilenceSplitter,
+    is_wav,
+    ogg_duration,
+    pcm16_to_wav,
+    read_wav,
+    split_on_silence,
+)
+
+
+def ogg_page(payload: bytes, granule: int, sequence: int) -> bytes:
+    header = b"OggS" + struct.pack("<BBqIII", 0, 0, granule, 1, sequence, 0)
+    return header + bytes([1, len(payload)]) + payload
+
+
+def opus_stream(seconds: float, pre_skip: int = 312) -> bytes:
+    opus_head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, pre_skip, 48000, 0, 0)
+    pages = [ogg_page(opus_head, 0, 0), ogg_page(b"OpusTags", 0, 1)]
+    pages.append(ogg_page(b"\x00" * 32, int(seconds * 48000) + pre_skip, 2))
+    return b"".join(pages)
+
+
+def test_ogg_duration_reads_last_opus_granule():
+    assert ogg_duration(opus_stream(45)) == pytest.approx(45)
+
+
+def test_ogg_duration_of_truncated_or_unknown_stream_is_none():
+    assert ogg_duration(b"OggS") is None
+    assert ogg_duration(ogg_page(b"\x00" * 16, 1000, 0)) is None
+
+
+def test_pcm16_to_wav_round_trips_and_drops_odd_byte():
+    samples = np.arange(-500, 500, dtype="<i2")
+    wav = pcm16_to_wav(samples.tobytes() + b"\x01", sample_rate=44100)
+    assert is_wav(wav)
+    audio = read_wav(wav)
+    assert audio.sample_rate == 44100
+    assert np.array_equal(audio.samples[:, 0], samples)
+
+
+def test_split_on_silence_cuts_at_the_pause():
+    rate = 16000
+    tone = (np.sin(np.linspace(0, 2000 * np.pi, rate * 8)) * 8000).astype("<i2")
+    silence = np.zeros(rate // 2, dtype="<i2")
+    samples = np.concatenate([tone, silence, tone]).reshape(-1, 1)
+    segments = split_on_silence(PCMAudio(samples=samples, sample_rate=rate, channels=1), 10, 4)
+
+    assert len(segments) == 2
+    assert sum(len(s.samples) for s in segments) == len(samples)
+    cut = len(segments[0].samples) / rate
+    assert 8 <= cut <= 8.5
+
+
+def test_splitter_fed_in_blocks_matches_one_shot_split():
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(16000 * 75) * 3000 * np.repeat(rng.uniform(0, 1, 750), 1600)).astype("<i2")
+    samples = samples.reshape(-1, 1)
+    expected = split_on_silence(PCMAudio(samples=samples, sample_rate=16000, channels=1), 20, 5)
+
+    splitter = SilenceSplitter(16000, 1, 20, 5)
+    segments = []
+    for start in range(0, len(samples), 12345):
+        segments += splitter.feed(samples[start : start + 12345])
+    segments += splitter.finish()
+
+    assert [len(s.samples) for s in segments] == [len(s.samples) for s in expected]
+    assert np.array_equal(np.concatenate([s.samples for s in segments]), samples)
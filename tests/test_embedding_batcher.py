@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+from ai_companion.modules.memory.long_term.embedding_batcher import EmbeddingBatcher
+
+
+def test_concurrent_requests_queued_during_an_encode_share_the_next_batch():
+    batches: list[list[str]] = []
+    release = threading.Event()
+
+    def encode(texts: list[str]) -> list[list[float]]:
+        batches.append(texts)
+        if len(batches) == 1:
+            release.wait(1)
+        return [[float(len(text))] for text in texts]
+
+    async def run():
+        batcher = EmbeddingBatcher(encode, max_batch_size=8)
+        first = asyncio.create_task(batcher.embed("a"))
+        await asyncio.sleep(0.05)
+        rest = [asyncio.create_task(batcher.embed(text)) for text in ["bb", "ccc", "bb"]]
+        await asyncio.sleep(0.05)
+        release.set()
+        results = await asyncio.gather(first, *rest)
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    assert results == [[1.0], [2.0], [3.0], [2.0]]
+    # The lone first request is not held back; the rest are deduplicated into one encode
+    assert batches == [["a"], ["bb", "ccc"]]
@@ -0,0 +1,72 @@
+import asyncio
+import io
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("PIL")
+pytest.importorskip("groq")
+
+from PIL import Image, ImageDraw  # noqa: E402
+
+from ai_companion.modules.image.image_preprocessing import prepare_image  # noqa: E402
+from ai_companion.modules.image.image_to_text import ImageToText  # noqa: E402
+
+
+def meme(caption: str, size: tuple[int, int] = (800, 800)) -> bytes:
+    image = Image.new("RGB", size, (40, 120, 200))
+    draw = ImageDraw.Draw(image)
+    draw.ellipse((200, 200, 600, 600), fill=(250, 200, 40))
+    draw.text((40, 20), caption, fill="white")
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        content = SimpleNamespace(content=f"description {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=content)])
+
+
+def image_to_text() -> tuple[ImageToText, FakeCompletions]:
+    completions = FakeCompletions()
+    itt = ImageToText()
+    itt._client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    return itt, completions
+
+
+def test_prepare_image_downscales_to_pixel_budget():
+    prepared = prepare_image(meme("hello", size=(4000, 3000)), max_pixels=1024 * 1024, quality=85)
+    with Image.open(io.BytesIO(prepared.data)) as image:
+        assert image.format == "JPEG"
+        assert image.width * image.height <= 1024 * 1024
+    assert len(prepared.data) < prepared.original_bytes
+
+
+def test_identical_image_reuses_description():
+    itt, completions = image_to_text()
+    image = meme("when the code works")
+
+    async def run():
+        return [await itt.analyze_image(image, "describe") for _ in range(2)]
+
+    assert asyncio.run(run()) == ["description 1", "description 1"]
+    assert completions.calls == 1
+
+
+def test_same_template_with_another_caption_is_analyzed_again():
+    itt, completions = image_to_text()
+
+    async def run():
+        return [
+            await itt.analyze_image(meme("when the code works"), "describe"),
+            await itt.analyze_image(meme("when the code breaks"), "describe"),
+        ]
+
+    assert asyncio.run(run()) == ["description 1", "description 2"]
+    assert completions.calls == 2
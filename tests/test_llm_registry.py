@@ -0,0 +1,26 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("langchain_groq")
+pytest.importorskip("elevenlabs")
+pytest.importorskip("together")
+
+from ai_companion.core.llm_registry import close_http_clients, get_async_http_client  # noqa: E402
+from ai_companion.graph.utils.chains import get_character_response_chain, get_router_chain  # noqa: E402
+from ai_companion.graph.utils.helpers import get_chat_model  # noqa: E402
+
+
+def test_closing_clients_drops_chains_bound_to_them():
+    chain = get_character_response_chain()
+    router = get_router_chain()
+    closed_client = get_async_http_client()
+
+    asyncio.run(close_http_clients())
+
+    assert closed_client.is_closed
+    assert get_character_response_chain() is not chain
+    assert get_router_chain() is not router
+    # The rebuilt chain uses the model bound to the reopened clients
+    assert get_character_response_chain().steps[1] is get_chat_model()
+    assert not get_async_http_client().is_closed
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ai_companion.modules.memory.long_term.local_backend import IVFIndex, LocalBackend  # noqa: E402
+
+
+def unit(vector: np.ndarray) -> list[float]:
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+def test_filtered_search_uses_index_and_only_returns_own_rows(tmp_path):
+    rng = np.random.default_rng(0)
+    backend = LocalBackend(str(tmp_path), vector_size=16, ann_threshold=50, ann_probes=4)
+    vectors = rng.standard_normal((400, 16))
+
+    async def run():
+        for i, vector in enumerate(vectors):
+            await backend.upsert(f"p{i}", unit(vector), {"text": str(i), "user_id": "heavy" if i % 2 else f"u{i}"})
+        backend._ann = IVFIndex.build(np.asarray(backend._vectors[:400]))
+        backend._ann_building = True  # keep the test deterministic: no background rebuild
+
+        heavy = await backend.search(unit(vectors[7]), top_k=3, user_id="heavy")
+        light = await backend.search(unit(vectors[8]), top_k=3, user_id="u8")
+        assert set(backend._user_rows_cache) == {"heavy"}
+
+        # A row appended after the rows were cached is found without a rebuild
+        await backend.upsert("new", unit(-vectors[7]), {"text": "new", "user_id": "heavy"})
+        newest = await backend.search(unit(-vectors[7]), top_k=1, user_id="heavy")
+        await backend.close()
+        return heavy, light, newest
+
+    heavy, light, newest = asyncio.run(run())
+    assert heavy[0][0]["text"] == "7"
+    assert all(int(payload["text"]) % 2 for payload, _ in heavy)
+    assert [payload["text"] for payload, _ in light] == ["8"]
+    assert newest[0][0]["text"] == "new"
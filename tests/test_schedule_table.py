@@ -0,0 +1,74 @@
+from datetime import datetime, time, timedelta
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from ai_companion.modules.schedules.context_generation import (  # noqa: E402
+    MINUTES_PER_WEEK,
+    ScheduleContextGenerator,
+    compile_weekly_schedule,
+)
+
+# 2024-01-01 is a Monday
+WEEK_START = datetime(2024, 1, 1)
+
+
+def reference_activities(moment: datetime) -> list[str]:
+    """Every source range covering ``moment``, read straight from the per-day definitions."""
+    current = moment.time()
+    weekday = moment.weekday()
+    previous_day = (weekday - 1) % 7
+    matches = []
+    for time_range, activity in ScheduleContextGenerator.SCHEDULES[weekday].items():
+        start, end = (time.fromisoformat(part) for part in time_range.split("-"))
+        if start < end and start <= current < end:
+            matches.append(activity)
+        elif start >= end and current >= start:
+            matches.append(activity)
+    # Overnight ranges started the day before (Sunday's carries over into Monday)
+    for time_range, activity in ScheduleContextGenerator.SCHEDULES[previous_day].items():
+        start, end = (time.fromisoformat(part) for part in time_range.split("-"))
+        if start >= end and current < end:
+            matches.append(activity)
+    return matches
+
+
+def test_every_minute_of_the_week_matches_the_source_ranges():
+    assert len(ScheduleContextGenerator.ACTIVITY_BY_MINUTE) == MINUTES_PER_WEEK
+    for minute in range(MINUTES_PER_WEEK):
+        moment = WEEK_START + timedelta(minutes=minute)
+        expected = reference_activities(moment)
+        assert len(expected) == 1, f"{moment:%A %H:%M} is covered by {len(expected)} ranges"
+        assert ScheduleContextGenerator.get_activity_at(moment) == expected[0], f"{moment:%A %H:%M}"
+
+
+def test_sunday_overnight_range_wraps_into_monday():
+    sunday_night = datetime(2024, 1, 7, 23, 30)
+    monday_early = datetime(2024, 1, 8, 3, 0)
+    assert sunday_night.weekday() == 6 and monday_early.weekday() == 0
+    sunday_overnight = next(
+        activity
+        for time_range, activity in ScheduleContextGenerator.SCHEDULES[6].items()
+        if time.fromisoformat(time_range.split("-")[0]) >= time.fromisoformat(time_range.split("-")[1])
+    )
+    assert ScheduleContextGenerator.get_activity_at(sunday_night) == sunday_overnight
+    assert ScheduleContextGenerator.get_activity_at(monday_early) == sunday_overnight
+
+
+def full_day(activity: str) -> dict[str, str]:
+    return {"00:00-12:00": f"{activity} morning", "12:00-00:00": f"{activity} afternoon"}
+
+
+def test_compile_rejects_gaps():
+    schedules = {day: full_day(str(day)) for day in range(7)}
+    schedules[3] = {"00:00-12:00": "morning"}
+    with pytest.raises(ValueError, match="uncovered"):
+        compile_weekly_schedule(schedules)
+
+
+def test_compile_rejects_overlaps():
+    schedules = {day: full_day(str(day)) for day in range(7)}
+    schedules[6] = {"00:00-23:00": "day", "23:00-01:00": "night"}
+    with pytest.raises(ValueError, match="overlap"):
+        compile_weekly_schedule(schedules)
@@ -0,0 +1,125 @@
+import asyncio
+
+import pytest
+
+from ai_companion.core.work_queue import KeyedWorkQueue
+from ai_companion.interfaces.whatsapp.webhook_batch import parse_webhook, queue_messages
+
+
+class InMemoryDeduplicator:
+    def __init__(self):
+        self.seen: set[str] = set()
+
+    async def claim_many(self, message_ids: list[str]) -> list[bool]:
+        claims = []
+        for message_id in message_ids:
+            claims.append(message_id not in self.seen)
+            self.seen.add(message_id)
+        return claims
+
+    async def release_many(self, message_ids: list[str]):
+        self.seen.difference_update(message_ids)
+
+
+def text_message(message_id: str, sender: str, body: str = "hi") -> dict:
+    return {"id": message_id, "from": sender, "type": "text", "text": {"body": body}}
+
+
+def webhook(*changes: dict, entries: int = 1) -> dict:
+    """Spread the change values round-robin over ``entries`` entries."""
+    payload = {"entry": [{"changes": []} for _ in range(entries)]}
+    for i, value in enumerate(changes):
+        payload["entry"][i % entries]["changes"].append({"value": value})
+    return payload
+
+
+def test_parse_collects_every_entry_change_and_message():
+    data = webhook(
+        {"messages": [text_message("m1", "a"), text_message("m2", "b")]},
+        {"messages": [text_message("m3", "a")], "statuses": [{"status": "read"}]},
+        {"statuses": [{"status": "delivered"}, {"status": "sent"}]},
+        entries=2,
+    )
+    messages, statuses = parse_webhook(data)
+    assert sorted(m["id"] for m in messages) == ["m1", "m2", "m3"]
+    assert len(statuses) == 3
+
+
+def test_parse_drops_messages_without_id_or_sender():
+    data = webhook({"messages": [text_message("m1", "a"), {"from": "b", "type": "text"}, {"id": "m3"}]})
+    messages, _ = parse_webhook(data)
+    assert [m["id"] for m in messages] == ["m1"]
+
+
+@pytest.mark.parametrize("data", [{}, {"entry": [{}]}, {"entry": [{"changes": [{}]}]}, {"entry": None}])
+def test_parse_rejects_malformed_envelopes(data):
+    with pytest.raises(ValueError):
+        parse_webhook(data)
+
+
+def test_queue_keeps_order_per_sender_and_runs_senders_concurrently():
+    async def run():
+        queue = KeyedWorkQueue("test", num_workers=4)
+        processed: dict[str, list[str]] = {}
+        active = 0
+        peak = 0
+
+        async def process(message: dict):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            processed.setdefault(message["from"], []).append(message["id"])
+            active -= 1
+
+        messages = [text_message(f"{sender}-{i}", sender) for i in range(5) for sender in "abcd"]
+        queued = await queue_messages(messages, queue, InMemoryDeduplicator(), process)
+        await queue.join()
+        await queue.stop()
+        return queued, processed, peak
+
+    queued, processed, peak = asyncio.run(run())
+    assert queued == 20
+    assert processed == {sender: [f"{sender}-{i}" for i in range(5)] for sender in "abcd"}
+    assert peak > 1
+
+
+def test_queue_skips_redelivered_messages():
+    async def run():
+        queue = KeyedWorkQueue("test", num_workers=2)
+        deduplicator = InMemoryDeduplicator()
+        processed = []
+
+        async def process(message: dict):
+            processed.append(message["id"])
+
+        batch = [text_message("m1", "a"), text_message("m2", "b")]
+        first = await queue_messages(batch, queue, deduplicator, process)
+        second = await queue_messages(batch + [text_message("m3", "a")], queue, deduplicator, process)
+        await queue.join()
+        await queue.stop()
+        return first, second, processed
+
+    first, second, processed = asyncio.run(run())
+    assert (first, second) == (2, 1)
+    assert sorted(processed) == ["m1", "m2", "m3"]
+
+
+def test_queue_full_releases_unqueued_claims():
+    async def run():
+        queue = KeyedWorkQueue("test", num_workers=1, max_size=2)
+        deduplicator = InMemoryDeduplicator()
+        release = asyncio.Event()
+
+        async def process(message: dict):
+            await release.wait()
+
+        batch = [text_message(f"m{i}", "a") for i in range(4)]
+        with pytest.raises(asyncio.QueueFull):
+            await queue_messages(batch, queue, deduplicator, process)
+        seen = set(deduplicator.seen)
+        release.set()
+        await queue.stop(timeout=1)
+        return seen
+
+    assert asyncio.run(run()) == {"m0", "m1"}
@@ -0,0 +1,29 @@
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("langgraph")
+pytest.importorskip("elevenlabs")
+pytest.importorskip("together")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from ai_companion.interfaces.whatsapp.whatsapp_response import whatsapp_router  # noqa: E402
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(whatsapp_router)
+    return TestClient(app)
+
+
+def test_delivery_whose_messages_were_all_dropped_is_acknowledged(client):
+    value = {"messages": [{"type": "text", "text": {"body": "no id or sender"}}]}
+    response = client.post("/whatsapp_response", json={"entry": [{"changes": [{"value": value}]}]})
+    assert response.status_code == 200
+
+
+def test_malformed_envelope_is_rejected(client):
+    response = client.post("/whatsapp_response", json={"entry": [{"no_changes": []}]})
+    assert response.status_code == 400